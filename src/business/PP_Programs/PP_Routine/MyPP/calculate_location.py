@@ -35,7 +35,6 @@ class CalculatePosition(ParallelProgram):
             col_spacing = get_global_var("ColSpacing")
             layer_spacing = get_global_var("LayerSpacing")
             reference_pose = get_global_var("ReferencePose")
-            reference_pose_list = join_list(reference_pose, ",")
 
             confirm = (row >= 1 and col >= 1 and layer >= 1)
             if not confirm:
@@ -44,6 +43,14 @@ class CalculatePosition(ParallelProgram):
                 modbus_tcp_close(1)
                 return False
 
+            # 输入参数没变就沿用方案里已有的 ArrData（方案中需有字符串变量 ArrDataKey）
+            key = concat_string(base_x, ",", base_y, ",", base_z, ",", row, ",", col, ",", layer, ",",
+                                row_spacing, ",", col_spacing, ",", layer_spacing, ",", join_list(reference_pose, ","))
+            if get_global_var("ArrDataKey") == key:
+                print("点位参数未变，沿用 ArrData")
+                modbus_tcp_close(1)
+                return True
+
             arr_row_data = self.func_calculate_position(
                 base_x,
                 base_y,
@@ -57,7 +64,7 @@ class CalculatePosition(ParallelProgram):
                 row_spacing,
                 col_spacing,
                 layer_spacing,
-                reference_pose_list,
+                reference_pose,
             )
 
             if len(arr_row_data) == 0:
@@ -68,30 +75,46 @@ class CalculatePosition(ParallelProgram):
                 set_global_var("ArrData", arr_coord)
                 print("程序异常--终止")
                 modbus_tcp_close(1)
-            else:
-                pass
+                return False
 
             set_global_var("ArrData", arr_row_data)
+            set_global_var("ArrDataKey", key)
             modbus_tcp_close(1)
 
     def func_calculate_position(self, base_x, base_y, base_z, base_rx,base_ry, base_rz, rows, cols, layers,x_offset, y_offset, z_offset, reference_pose):
         """
         根据基坐标、行列层数和三维偏移量计算所有点位坐标（空间点阵）
+        直接用数值生成每个点，不再拼字符串再拆开；用 while 计数，Python 和 Lua 下标一致
+        reference_pose 为 7 个参考关节角 + 6 个外部轴，循环外取出，每个点一次构造完整的 21 项
         """
         points = []
+        j1 = get_list(reference_pose, 0)
+        j2 = get_list(reference_pose, 1)
+        j3 = get_list(reference_pose, 2)
+        j4 = get_list(reference_pose, 3)
+        j5 = get_list(reference_pose, 4)
+        j6 = get_list(reference_pose, 5)
+        j7 = get_list(reference_pose, 6)
+        e1 = get_list(reference_pose, 7)
+        e2 = get_list(reference_pose, 8)
+        e3 = get_list(reference_pose, 9)
+        e4 = get_list(reference_pose, 10)
+        e5 = get_list(reference_pose, 11)
+        e6 = get_list(reference_pose, 12)
 
         # 三重循环：层 -> 行 -> 列，生成空间点阵
-        for k in range(layers):
-            for i in range(rows):
-                for j in range(cols):
-                    x = base_x + (j - 1) * x_offset
-                    y = base_y + (i - 1) * y_offset
-                    z = base_z + (k - 1) * z_offset  # 新增：z方向偏移计算
-                    rx = base_rx
-                    ry = base_ry
-                    rz = base_rz
-
-                    str_pose = split_string(concat_string(x, ",", y, ",", z, ",", rx, ",", ry, ",", rz, ",",
-                                                          "WORLD", ",", "WORLD_ORIGIN", ",", reference_pose), ",")
-                    append_list(points, str_pose)
-        return points
\ No newline at end of file
+        k = 0
+        while k < layers:
+            z = base_z + k * z_offset  # 新增：z方向偏移计算
+            i = 0
+            while i < rows:
+                y = base_y + i * y_offset
+                j = 0
+                while j < cols:
+                    x = base_x + j * x_offset
+                    append_list(points, [x, y, z, base_rx, base_ry, base_rz, "WORLD", "WORLD_ORIGIN",
+                                         j1, j2, j3, j4, j5, j6, j7, e1, e2, e3, e4, e5, e6])
+                    j += 1
+                i += 1
+            k += 1
+        return points
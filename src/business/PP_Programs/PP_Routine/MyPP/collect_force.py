@@ -14,7 +14,7 @@ from pp.core.robot import (
 from pp.core.basic import (
     concat_string,
     get_list,
-
+    wait_ms,
 )
 
 
@@ -22,18 +22,29 @@ class CollectForce(ParallelProgram):
 
     def __init__(self, setting: RobotSetting = RobotSetting()):
         super().__init__(setting=setting)
+        # 定频采样周期 (ms)，0 为旧的尽快发送模式
+        # pp_loop_cost_ms 是一次采样 + 发送本身的耗时，从 wait_ms 里扣掉；按接收端报的实际周期 (period=) 校准
+        self.pp_sample_period_ms = 4
+        self.pp_loop_cost_ms = 1
 
     def pp_collect_force(self):
 
         if socket_open(1, "192.168.3.220", 20000):
             # 打开TCP客户端连接
-            print(socket_send(1, "Hi, Sunseed!"))  # 发送初始消息
+            if self.pp_sample_period_ms > 0:
+                # 定频模式每行是 "seq,t_ms,Fz,posZ"，问候行带上字段名，接收端据此解析
+                print(socket_send(1, "Hi, Sunseed! seq,t_ms,force_z,pose_z"))
+            else:
+                print(socket_send(1, "Hi, Sunseed!"))  # 发送初始消息
             # print(join_string(["Hi", "Flexiv"], "_"))
+            wait_cycle = self.pp_sample_period_ms - self.pp_loop_cost_ms
             # 持续数据采集循环
             while True:
                 Force_Flag = get_global_var("starForce")
                 if Force_Flag:
                     print("开始采集")
+                    # 每轮采集 seq 从 0 开始，t_ms 是该样本的排程时刻（控制器上没有时钟可读）
+                    seq = 0
                     while Force_Flag:
                         # 从系统中获取以下参数（例如：get_system_state）
                         # 追加数据到列表（假设每次采集追加新值）
@@ -48,12 +59,21 @@ class CollectForce(ParallelProgram):
                         # Mz = get_system_state(SystemStateEnum.CARTESIAN_MOMENT_Z)
                         # data_text = join_list(tcpPose, ",")  # 对应PDF的 make text from list
                         # all_data = concat_string(data_text, ",", Fx, ",", Fy, ",", Fz, ",", Mx, ",", My, ",", Mz)
-                        all_data = concat_string(Fz,",", posZ)
+                        # 先在这一层赋值：ppdk 给第一次赋值加 local，放在 if 里出了 if 就是 nil
+                        all_data = ""
+                        if self.pp_sample_period_ms > 0:
+                            all_data = concat_string(seq, ",", seq * self.pp_sample_period_ms, ",", Fz, ",", posZ)
+                            seq += 1
+                        else:
+                            all_data = concat_string(Fz,",", posZ)
                         socket_send(1, all_data)  # 发送数据
-                        if not get_global_var("starForce"):
+                        Force_Flag = get_global_var("starForce")
+                        if not Force_Flag:
                             print("停止采集")
                             break                       # 等待6毫秒（PDF的 wait 6 ms）
                         # set_global_var(COLLECT_FLAG, False)
+                        if wait_cycle > 0:
+                            wait_ms(wait_cycle)
                     # wait_ms(1)
                 if not socket_connected(1):
                     print("socket connected field")
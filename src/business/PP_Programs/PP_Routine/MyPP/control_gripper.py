@@ -23,92 +23,97 @@ from pp.core.communication import (
 )
 
 
-class ControlGripper(ParallelProgram):
+class GripperTask(ParallelProgram):
+    """
+    夹爪跟随 ToolState，一拍的活在 func_gripper_step 里，ControlGripper 和 Supervisor 共用
+
+    ToolState 变成 1 / 2 的那一拍开 / 关夹爪（GPIO_OUT_0），保持期间不再读写 IO
+    全局变量 GripperPollGap：[次数, 最近一次, 最大]（ms），看到变化的那次读 ToolState 之前等过的名义间隔
+      这不是延迟，也不是延迟的上界：只算 wait_ms，读系统状态、set_io 这些调用本身的耗时看不到，控制器忙的时候真实延迟会更长
+      ControlGripper 里就是 pp_poll_ms；Supervisor 里是按 tick 排的间隔，被别的任务拖慢时会变大
+      真实的 ToolState 变化到 IO 的延迟用 simulator/scenarios/control_gripper.py 量
+    """
 
     def __init__(self, setting: RobotSetting = RobotSetting()):
         super().__init__(setting=setting)
+        # ToolState 轮询周期 (ms)
+        self.pp_poll_ms = 2
+        self.pp_grip_events = 0
+        self.pp_grip_max_gap_ms = 0
+        self.pp_grip_state = 0
+        self.pp_grip_running = False
 
-    def pp_control_gripper(self):
-        """主控制循环"""
-        error_code = 0
-        while True:
-            while get_system_state(SystemStateEnum.PROJECT_RUNNING):
-                if get_global_var("ToolState") == 1:
-                    self.func_open_gripper()
-                    # print("open the gripper")
-                    while not get_global_var("ToolState") != 1:
-                        # print("Drop into loop OPenning!")
-                        if not get_system_state(SystemStateEnum.PROJECT_RUNNING):
-                            error_code = self.func_handle_system_status()
-                            wait_ms(1)
-                            break
-                    # print(error_code)
-                    # self.func_handle_error_code(error_code)
-
-                elif get_global_var("ToolState") == 2:
-                    self.func_close_gripper()
-                    # print("close the gripper")
-                    while not get_global_var("ToolState") != 2:
-                        # print("Drop into loop closing!")
-                        if not get_system_state(SystemStateEnum.PROJECT_RUNNING):
-                            error_code = self.func_handle_system_status()
-                            wait_ms(1)
-                            break
-                    # print(error_code)
-                else:
-                    error_code = 0
-            # wait_ms(1)
-            # print(error_code)
-            # if error_code == 1:
-            #     print("Pausing !")
-            #     set_global_var('ToolState', 0)
-            # elif error_code == 2:
-            #     print("a fault!")
-            # error_code = 0
-            self.func_handle_error_code(error_code)
-            self.func_enter_silent_mode()
-
-    def func_handle_error_code(self, error_code):
-        """
-        :param error_code:
-        :return:
-                 1：暂停
-                 2：报错
-                 0：正常
+    def func_gripper_step(self, running, is_fault, gap_ms):
         """
-        if error_code == 1:
-            print("Pausing !")
-            set_global_var('ToolState', 0)
-        elif error_code == 2:
-            print("a fault!")
-        error_code = 0
-    def func_handle_system_status(self):
-        """统一处理系统状态并返回状态码
-        1：暂停
-        2：报错
-        0：正常
+        :param running: 这一拍的 PROJECT_RUNNING
+        :param is_fault: 这一拍的 IS_FAULT，只在运行中刚停下来的那一拍用到，其余时候传 False 就行
+        :param gap_ms: 距上一次调用等过的名义时间（ms），只记进 GripperPollGap
+        :return: 这一拍写了夹爪 IO 返回 True（ppdk 转 Lua 不支持不带值的 return）
         """
-        if not get_system_state(SystemStateEnum.PROJECT_RUNNING) and not get_system_state(SystemStateEnum.IS_FAULT):
-            error_code = 1
-            return error_code
-        elif get_system_state(SystemStateEnum.IS_FAULT):
-            error_code = 2
-            return error_code
+        if not running:
+            # 夹爪开 / 关保持中被暂停时清掉 ToolState，恢复后要主程序重新下发；报错时保持不动
+            if self.pp_grip_running and (self.pp_grip_state == 1 or self.pp_grip_state == 2):
+                if is_fault:
+                    print("a fault!")
+                else:
+                    print("Pausing !")
+                    set_global_var('ToolState', 0)
+                    self.pp_grip_state = 0
+            self.pp_grip_running = False
+            return False
+        # 刚进入运行时读到的是停机期间就有的值，不计入
+        poll_gap_ms = gap_ms
+        if not self.pp_grip_running:
+            poll_gap_ms = 0
+        self.pp_grip_running = True
+        tool_state = get_global_var("ToolState")
+        if tool_state == self.pp_grip_state:
+            return False
+        self.pp_grip_state = tool_state
+        if tool_state != 1 and tool_state != 2:
+            return False
+        set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_0, tool_state == 1)
+        if tool_state == 1:
+            print("open_gpio_out_0")
         else:
-            return 0
+            print("close_gpio_out_0")
+        if poll_gap_ms <= 0:
+            return True
+        self.pp_grip_events += 1
+        if poll_gap_ms > self.pp_grip_max_gap_ms:
+            self.pp_grip_max_gap_ms = poll_gap_ms
+        set_global_var("GripperPollGap", [self.pp_grip_events, poll_gap_ms, self.pp_grip_max_gap_ms])
+        return True
+
 
-    def func_enter_silent_mode(self):
-        """进入静默模式"""
-        print("the project is not running ")
-        while not get_system_state(SystemStateEnum.PROJECT_RUNNING):
-            if get_system_state(SystemStateEnum.IS_FAULT):
-                clear_fault()
-            wait_ms(30)
+class ControlGripper(GripperTask):
 
-    def func_open_gripper(self):
-        set_io(GPIOEnum.SYSTEM,GPIOOutPortEnum.GPIO_OUT_0, True)
-        print("open_gpio_out_0")
+    def __init__(self, setting: RobotSetting = RobotSetting()):
+        super().__init__(setting=setting)
+
+    def pp_control_gripper(self):
+        """主控制循环：每轮读一次 PROJECT_RUNNING，运行中每 pp_poll_ms 读一次 ToolState，没在运行时每 30ms 清一次报错"""
+        silent = False
+        while True:
+            # 每轮各读一次，夹爪和静默模式共用
+            running = get_system_state(SystemStateEnum.PROJECT_RUNNING)
+            is_fault = False
+            if not running:
+                is_fault = get_system_state(SystemStateEnum.IS_FAULT)
+            self.func_gripper_step(running, is_fault, self.pp_poll_ms)
+            if running:
+                silent = False
+                wait_ms(self.pp_poll_ms)
+            elif silent:
+                self.func_silent_tick(is_fault)
+            else:
+                print("the project is not running ")
+                silent = True
+                self.func_silent_tick(is_fault)
 
-    def func_close_gripper(self):
-        set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_0, False)
-        print("close_gpio_out_0")
+    def func_silent_tick(self, is_fault):
+        """静默模式的一拍：有报错就清掉，等 30ms"""
+        if is_fault:
+            clear_fault()
+        wait_ms(30)
+        return True
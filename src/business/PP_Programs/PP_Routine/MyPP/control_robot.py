@@ -1,4 +1,3 @@
-from pp.parallel_program import ParallelProgram
 from pp.settings import RobotSetting
 from pp.core.basic import wait_ms, get_list
 from pp.core.communication import (
@@ -7,7 +6,6 @@ from pp.core.communication import (
     write_flx_modbus_tcp_bit,
     write_flx_modbus_tcp_int,
     # write_flx_modbus_tcp_float,
-    read_flx_modbus_tcp_bit,
     read_flx_modbus_tcp_int,
 )
 from pp.enums import (
@@ -26,67 +24,76 @@ from pp.core.robot import (
     set_io,
     set_io_pulse_ms,
 )
+from MyPP.modbus_snapshot import ModbusSnapshot
 
 
-class ControlRobot(ParallelProgram):
+class ControlRobot(ModbusSnapshot):
     def __init__(self, setting: RobotSetting = RobotSetting()):
         super().__init__(setting=setting)
+        # 状态线圈 0~6，每个 tick 读一次
+        self.declare_bits(0, ["running", "paused", "", "motor_ready", "motor_on", "program_request", "fault"])
 
     def pp_control_main(self, auto_booted: bool = True, auto_looped: bool = False):
         # project_running = False
         while True:
             # print(project_running)
-            self.func_rizon_light_mode()
-            if get_io(GPIOEnum.SYSTEM, GPIOInPortEnum.GPIO_IN_1) == 1:
+            # 启动按钮每轮读一次，没按下时就是待机（静默模式），每 500ms 刷新一次三色灯
+            start_on = get_io(GPIOEnum.SYSTEM, GPIOInPortEnum.GPIO_IN_1) == 1
+            # 状态线圈每轮按快照解码一次，先在循环这一层赋值，ppdk 才不会把它们变成 if 里的 local
+            running = False
+            paused = False
+            motor_on = False
+            motor_ready = False
+            faulted = False
+            online = modbus_tcp_open(1, "192.168.2.100", 502)
+            if online:
+                # 这一轮的判断都用同一份状态线圈快照
+                self.func_snapshot()
+                running = self.func_bit("running")
+                paused = self.func_bit("paused")
+                motor_on = self.func_bit("motor_on")
+                motor_ready = self.func_bit("motor_ready")
+                faulted = self.func_bit("fault")
+                self.func_rizon_light_mode(running, paused, motor_ready, faulted, start_on)
+            if not start_on:
+                print("待机运行")
+                wait_ms(500)
+            else:
                 print("启动程序")
-                if modbus_tcp_open(1, "192.168.2.100", 502):
+                if online:
                     # 是否有错误
-                    if get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 4) == "1":
-                        if get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 6) == "1":
+                    if motor_on:
+                        if faulted:
                             # 清除错误
                             print("fault")
                             write_flx_modbus_tcp_bit(1, 1, 6, [False])
                             wait_ms(5)
                             write_flx_modbus_tcp_bit(1, 1, 6, [True])  # 置位线圈
                             wait_ms(100)  # 保持100ms
-                        # 电机打开，没有错误 并且启动按钮按下
-                        elif (
-                            get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 4) == "1"
-                            and get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 6) == "0"
-                            and get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 0) == "0"
-                            and get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 1) == "0"
-                            and get_io(GPIOEnum.SYSTEM, GPIOInPortEnum.GPIO_IN_2) == 1
-                        ):
-                            print("running")
-                            self.func_start_plan()
-                            # project_running = True
-                        # 程序运行并且启动按钮按下
-                        elif (
-                            get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 0) == "1"
-                            or get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 1) == "1"
-                        ) and get_io(GPIOEnum.SYSTEM, GPIOInPortEnum.GPIO_IN_2) == 1:
-                            print("pause")
-                            self.func_pause_plan()
-                            # project_running = False
-                        elif (
-                            get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 1) == "0"
-                            and get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 0) == "0"
-                        ):
-                            self.func_pause_plan()
-                            # project_running = False
+                        else:
+                            start_pressed = get_io(GPIOEnum.SYSTEM, GPIOInPortEnum.GPIO_IN_2) == 1
+                            # 电机打开，没有错误 并且启动按钮按下
+                            if not running and not paused and start_pressed:
+                                print("running")
+                                self.func_start_plan()
+                                # project_running = True
+                            # 程序运行并且启动按钮按下
+                            elif (running or paused) and start_pressed:
+                                print("pause")
+                                self.func_pause_plan()
+                                # project_running = False
+                            elif not paused and not running:
+                                self.func_pause_plan()
+                                # project_running = False
                         # 电机状态为 0 并且没有急停
-                    elif (
-                        get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 4) == "0"
-                        and get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 6) == "0"
-                        and get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 3) == "1"
-                    ):
+                    elif not faulted and motor_ready:
                         # 打开电机
                         self.func_motor_on()
                         print("motor_is_on")
-                    wait_ms(500)
                 else:
+                    # 连不上也隔 500ms 再试，不空转
                     print("Modbus is not connected")
-            self.func_enter_silent_mode()
+                wait_ms(500)
 
     def func_motor_on(self):
         while True:
@@ -105,7 +112,7 @@ class ControlRobot(ParallelProgram):
             print("running")
             # print(program_request)
             # 准备接收方案 ID  （程序请求 为 开）
-            if get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 5) == "1":
+            if self.func_bit("program_request"):
                 # 发送方案 至机器人  （方案ID 设定一个整型值）
                 write_flx_modbus_tcp_int(1, 1, 0, [1])
                 # 下发方案 （确认程序 设置上升沿）
@@ -125,12 +132,14 @@ class ControlRobot(ParallelProgram):
         while project_running:
             # 通知方案正在运行 （程序运行 为 开）
             # print("1111")
-            if get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 0) == "1":
+            if self.func_bit("running"):
                 # 暂停方案 （暂停程序 设置上升沿）
                 # print("2222")
                 self.func_pause_program()
+                # 刚写过暂停线圈，状态变了，重新取一次快照
+                self.func_snapshot()
                 # 通知方案已暂停（程序已暂停）
-                if get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 1) == "1":
+                if self.func_bit("paused"):
                     # 恢复方案（启动程序设置上升沿）
                     self.func_start_program()
                     # print("恢复方案")
@@ -138,7 +147,7 @@ class ControlRobot(ParallelProgram):
                     self.func_terminate_program()
                     # 通知方案已终止（程序运行为 关）
                 project_running = False
-            elif get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 1) == "1":
+            elif self.func_bit("paused"):
                 # 恢复方案（启动程序设置上升沿）
                 # print("3333")
                 self.func_start_program()
@@ -179,56 +188,35 @@ class ControlRobot(ParallelProgram):
         wait_ms(100)  # 保持100ms
         write_flx_modbus_tcp_bit(1, 1, 5, [False])
 
-    def func_enter_silent_mode(self):
-        """进入静默模式"""
-        # self.func_pause_program()
-        while not get_io(GPIOEnum.SYSTEM, GPIOInPortEnum.GPIO_IN_1) == 1:
-            print("待机运行")
-            self.func_rizon_light_mode()
-            wait_ms(500)
-
-    def func_rizon_light_mode(self):
-        if modbus_tcp_open(1, "192.168.2.100", 502):
-            if (
-                get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 1) == "0"
-                and get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 0) == "1"
-            ):
-                print("绿灯")
-                set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_0, False)
-                set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_1, False)
-                set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_2, True)
-                wait_ms(5)
-            elif (
-                get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 1) == "0"
-                and get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 0) == "0"
-                and get_io(GPIOEnum.SYSTEM, GPIOInPortEnum.GPIO_IN_1) == 1
-            ):
-                print("黄灯闪")
-                set_io_pulse_ms(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_1, True, 500)
-                # set_io_pulse_ms(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_3, True, 500)
-                set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_2, False)
-                set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_0, False)
-                wait_ms(5)
-            elif (
-                get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 1) == "1"
-                and get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 0) == "0"
-            ):
-                print("黄灯常亮")
-                set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_1, True)
-                set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_2, False)
-                set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_0, False)
-                wait_ms(5)
-            elif (
-                get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 3) == "0"
-                or get_list(read_flx_modbus_tcp_bit(1, 1, 0, 7), 6) == "1"
-            ):
-                print("红灯")
-                set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_0, True)
-                set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_1, False)
-                set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_2, False)
-                wait_ms(5)
-            elif get_io(GPIOEnum.SYSTEM, GPIOInPortEnum.GPIO_IN_1) == 0:
-                set_io_pulse_ms(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_0, True, 500)
-                set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_1, False)
-                set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_2, False)
-                wait_ms(5)
+    def func_rizon_light_mode(self, running, paused, motor_ready, faulted, start_on):
+        """按 pp_control_main 这一轮解码好的状态线圈和启动按钮点三色灯，这里不读 IO"""
+        if not paused and running:
+            print("绿灯")
+            set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_0, False)
+            set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_1, False)
+            set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_2, True)
+            wait_ms(5)
+        elif not paused and not running and start_on:
+            print("黄灯闪")
+            set_io_pulse_ms(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_1, True, 500)
+            # set_io_pulse_ms(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_3, True, 500)
+            set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_2, False)
+            set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_0, False)
+            wait_ms(5)
+        elif paused and not running:
+            print("黄灯常亮")
+            set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_1, True)
+            set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_2, False)
+            set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_0, False)
+            wait_ms(5)
+        elif not motor_ready or faulted:
+            print("红灯")
+            set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_0, True)
+            set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_1, False)
+            set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_2, False)
+            wait_ms(5)
+        elif not start_on:
+            set_io_pulse_ms(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_0, True, 500)
+            set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_1, False)
+            set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_2, False)
+            wait_ms(5)
@@ -13,6 +13,7 @@ from pp.core.communication import (
 )
 from pp.core.robot import (
     get_global_var,
+    set_global_var,
     update_object_pool,
     update_global_var_coord,
     get_system_state,
@@ -31,26 +32,78 @@ class ConvVisionTrigger(ParallelProgram):
 
     def __init__(self, setting: RobotSetting = RobotSetting()):
         super().__init__(setting=setting)
-
-    def pp_conv_vision_trigger(self):
+        # False：每个目标发一次 Trigger 等一次回复
+        # True：连上后发一次 Push，视觉端连续推送，每行若干个目标用 ';' 隔开：
+        #   "x y z rx ry rz;x y z rx ry rz;...\n"
+        self.pp_push_mode = False
+        # 推送模式下未成行的数据最多留这么多字符，超过说明没按行发，整段丢掉
+        self.pp_max_carry = 4096
         # ==================== 相机参数 ====================
-        cam_intr_params = (
+        self.pp_cam_intr_params = (
             '691.6986083984375, 691.6787109375, '
             '642.67529296875, 361.54461669921875, '
             '1280, 720, 0.001'
         )
-        cam_extr_params = (
+        self.pp_cam_extr_params = (
             '0.34559894 -0.41461863 0.83664676 '
             '-0.03670967 3.1249094 -0.00345758'
         )
+        self.pp_obj_name = 'Conveyor-SerialPort-1/Vision'
+        # 工作空间 WorkSpace1（左下角）/ WorkSpace2（右上角），每次连上视觉时读一次
+        self.pp_workspace = [0, 0, 0, 0, 0, 0]
+        # 全局变量 ConvVisionStats：[收到的消息, 目标数, 放进对象池, 超出工作空间]
+        self.pp_vision_messages = 0
+        self.pp_vision_objects = 0
+        self.pp_vision_queued = 0
+        self.pp_vision_rejected = 0
 
-        obj_name = 'Conveyor-SerialPort-1/Vision'
+    def pp_conv_vision_trigger(self):
         recv_text = ''
 
         while True:
             # ==================== 建立 socket 连接 ====================
             if socket_open(1, '192.168.2.50', 30000):
                 print('[Vision] is connected')
+                self.func_load_workspace()
+
+                if self.pp_push_mode:
+                    if not socket_send(1, 'Push'):
+                        print('[Vision] Send fail')
+                        continue
+                    carry = ''
+                    while True:
+                        # --------- 连接检测 ---------
+                        if not socket_connected(1):
+                            print('[Vision] Loss connection')
+                            break
+
+                        # --------- 接收数据：一次可能带多行，最后一段没收完留到下次 ---------
+                        recv_text = socket_recv(1)
+                        if recv_text == '':
+                            continue
+                        # '\\n' 原样写进 Lua 就是换行（ppdk 不转义字符串），Python 里写 '\n' 转出来的 Lua 不对
+                        lines = split_string(concat_string(carry, recv_text), '\\n')
+                        count = len(lines)
+                        carry = get_list(lines, count - 1)
+                        if len(carry) > self.pp_max_carry:
+                            print('[Vision] Drop unterminated data')
+                            carry = ''
+
+                        # --------- 解析并更新对象池 ---------
+                        index = 0
+                        while index < count - 1:
+                            objects = split_string(get_list(lines, index), ';')
+                            self.pp_vision_messages += 1
+                            n = 0
+                            while n < len(objects):
+                                obj_value = get_list(objects, n)
+                                if obj_value != '':
+                                    self.func_handle_object(obj_value)
+                                n += 1
+                            index += 1
+                        if count > 1:
+                            self.func_publish_stats()
+                    continue
 
                 while True:
                     # --------- 连接检测 ---------
@@ -71,43 +124,9 @@ class ConvVisionTrigger(ParallelProgram):
                     if recv_text != '':
                         obj_param = split_string(recv_text, ';')
                         obj_value = obj_param[1]
-                        obj_str = split_string(obj_value, " ")
-                        obj_x = to_number(get_list(obj_str, 0), 10)
-                        obj_y = to_number(get_list(obj_str, 1), 10)
-                        obj_z = to_number(get_list(obj_str, 2), 10)
-                        obj_rx = to_number(get_list(obj_str, 3), 10)
-                        obj_ry = to_number(get_list(obj_str, 4), 10)
-                        obj_rz = to_number(get_list(obj_str, 5), 10)
-
-
-                        obj_flag = self.func_determine_workspace(
-                            obj_x, obj_y, obj_z
-                        )
-
-                        if not obj_flag:
-                            update_object_pool(
-                                obj_name,
-                                8,
-                                obj_value,
-                                cam_intr_params,
-                                cam_extr_params,
-                                'flange',
-                            )
-
-                        else:
-                            print('[Vision] Out of workspace')
-                            vision_value = concat_string(
-                                "[Vision] Obj value: ", obj_value
-                            )
-                            print(vision_value)
-                            update_global_var_coord(
-                                "RecvCoord",
-                                [obj_x, obj_y, obj_z, obj_rx, obj_ry, obj_rz, ],
-                                [CoordinateSystemEnum.WORLD, CoordinateNameEnum.WORLD_ORIGIN],
-                                [0, -40, 0, 90, 0, 40, 0],
-                                [1, 2, 3, 4, 5, 6],
-                                MetricSystemEnum.METER,
-                            )
+                        self.pp_vision_messages += 1
+                        self.func_handle_object(obj_value)
+                        self.func_publish_stats()
             else:
                 # socket 打不开 -> 进入静默模式
                 self.func_enter_silent_mode()
@@ -121,27 +140,63 @@ class ConvVisionTrigger(ParallelProgram):
                 clear_fault()
             wait_ms(30)
 
-    def func_determine_workspace(self, obj_x, obj_y, obj_z):
-        """
-        判断目标是否在工作空间内
-        :return: True -> 超出工作空间, False -> 在工作空间内
-        """
+    def func_load_workspace(self):
+        """把工作空间的两个角读到 pp_workspace，判断目标时不再每次读全局变量"""
         cord1 = get_global_var("WorkSpace1")   # 左下角（单位：m）
         cord2 = get_global_var("WorkSpace2")   # 右上角
+        self.pp_workspace = [
+            get_list(cord1, 0), get_list(cord1, 1), get_list(cord1, 2),
+            get_list(cord2, 0), get_list(cord2, 1), get_list(cord2, 2),
+        ]
 
-        cord1_x = get_list(cord1, 0)
-        cord1_y = get_list(cord1, 1)
-        cord1_z = get_list(cord1, 2)
+    def func_publish_stats(self):
+        set_global_var("ConvVisionStats", [
+            self.pp_vision_messages, self.pp_vision_objects, self.pp_vision_queued, self.pp_vision_rejected
+        ])
 
-        cord2_x = get_list(cord2, 0)
-        cord2_y = get_list(cord2, 1)
-        cord2_z = get_list(cord2, 2)
+    def func_handle_object(self, obj_value):
+        """
+        一个目标 "x y z rx ry rz"：在工作空间内放进对象池，否则记到 RecvCoord
+        :return: True -> 放进了对象池
+        """
+        obj_str = split_string(obj_value, " ")
+        obj_x = to_number(get_list(obj_str, 0), 10)
+        obj_y = to_number(get_list(obj_str, 1), 10)
+        obj_z = to_number(get_list(obj_str, 2), 10)
+        self.pp_vision_objects += 1
 
+        workspace = self.pp_workspace
         if (
-            cord1_x <= obj_x <= cord2_x
-            and cord1_y <= obj_y <= cord2_y
-            and cord1_z <= obj_z <= cord2_z
+            get_list(workspace, 0) <= obj_x <= get_list(workspace, 3)
+            and get_list(workspace, 1) <= obj_y <= get_list(workspace, 4)
+            and get_list(workspace, 2) <= obj_z <= get_list(workspace, 5)
         ):
-            return False
-        else:
+            update_object_pool(
+                self.pp_obj_name,
+                8,
+                obj_value,
+                self.pp_cam_intr_params,
+                self.pp_cam_extr_params,
+                'flange',
+            )
+            self.pp_vision_queued += 1
             return True
+
+        self.pp_vision_rejected += 1
+        print('[Vision] Out of workspace')
+        vision_value = concat_string(
+            "[Vision] Obj value: ", obj_value
+        )
+        print(vision_value)
+        obj_rx = to_number(get_list(obj_str, 3), 10)
+        obj_ry = to_number(get_list(obj_str, 4), 10)
+        obj_rz = to_number(get_list(obj_str, 5), 10)
+        update_global_var_coord(
+            "RecvCoord",
+            [obj_x, obj_y, obj_z, obj_rx, obj_ry, obj_rz, ],
+            [CoordinateSystemEnum.WORLD, CoordinateNameEnum.WORLD_ORIGIN],
+            [0, -40, 0, 90, 0, 40, 0],
+            [1, 2, 3, 4, 5, 6],
+            MetricSystemEnum.METER,
+        )
+        return False
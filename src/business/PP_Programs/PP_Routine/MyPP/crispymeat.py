@@ -1,5 +1,4 @@
 from pp.core.basic import wait_ms, get_list
-from pp.parallel_program import ParallelProgram
 from pp.settings import RobotSetting
 from pp.core.communication import (
     write_flx_modbus_tcp_float,
@@ -11,7 +10,6 @@ from pp.core.communication import (
     socket_recv,
     socket_send,
     socket_close,
-    read_flx_modbus_tcp_bit
 )
 from pp.enums import (
     ModbusReadTypeEnum,
@@ -31,38 +29,83 @@ from pp.core.robot import (
     set_global_var,
     clear_fault
 )
+from MyPP.modbus_snapshot import ModbusSnapshot
 import time
 
-class CrispyMeat(ParallelProgram):
+class CrispyMeat(ModbusSnapshot):
 
     def __init__(self, setting: RobotSetting = RobotSetting()):
         super().__init__(setting=setting)
+        # 线圈 10~16 是机器人的流程状态，每个 tick 一次读完
+        self.declare_bits(10, ["init", "waitting", "capture_successful", "again_waitting",
+                               "move_start", "move_to_speace", "finish"])
+        # tick 周期；等视觉回复时每个 tick 调一次 socket_recv
+        # ppdk 的 socket_recv 没有超时参数：收不到数据时阻塞到控制器的接收超时（约 pp_recv_timeout_ms），
+        # 这期间整个循环停住，状态机不跑、线圈快照不刷新；pp_vision_timeout_ms = 2000 实际上就是两次空收
+        self.pp_tick_ms = 10
+        self.pp_recv_timeout_ms = 1000
+        self.pp_vision_timeout_ms = 2000
 
     def pp_crispy_meat(self):
         self.func_clear_fault()
         s = ""
         modbus_tcp_open(1, "192.168.2.100", 502)
         socket_open(1, "192.168.2.205", 20000)
+        # 视觉统计：请求次数、收到回复、超时、最近一次 / 最长一次等待（ms，按 tick 和空收的接收超时估算）
+        vision_requests = 0
+        vision_replies = 0
+        vision_timeouts = 0
+        last_wait_ms = 0
+        max_wait_ms = 0
+        pending = False
+        waited_ms = 0
         while True:
             program_running = get_system_state(SystemStateEnum.PROJECT_RUNNING)
             while program_running:
-                robot_init = get_list(read_flx_modbus_tcp_bit(1, 1, 10, 1), 1)
-                robot_waitting = get_list(read_flx_modbus_tcp_bit(1, 1, 11, 1), 1)
-                robot_capture_successful = get_list(read_flx_modbus_tcp_bit(1, 1, 12, 1), 1)
-                robot_again_waitting = get_list(read_flx_modbus_tcp_bit(1, 1, 13, 1), 1)
-                robot_move_start = get_list(read_flx_modbus_tcp_bit(1, 1, 14, 1), 1)
-                robot_move_to_speace = get_list(read_flx_modbus_tcp_bit(1, 1, 15, 1), 1)
-                robot_finish = get_list(read_flx_modbus_tcp_bit(1, 1, 16, 1), 1)
-                 
-                if robot_waitting != 0:
-                    socket_send(1, "1")
-                    # wait_ms(500)
+                self.func_snapshot()
+
+                # 等待位的上升沿才拍一次，等待期间不再重复触发
+                if self.func_rising("waitting") and not pending:
+                    if socket_send(1, "1"):
+                        vision_requests += 1
+                        pending = True
+                        waited_ms = 0
+                    else:
+                        print("[Vision] Send fail")
+                        socket_close(1)
+                        socket_open(1, "192.168.2.205", 20000)
+
+                # 一个 tick 只收一次；回复没到时这次 socket_recv 会把循环卡住最多 pp_recv_timeout_ms，
+                # 卡住期间线圈变了又变回去的边沿会漏掉；等够 pp_vision_timeout_ms 放弃这次请求
+                if pending:
                     data = socket_recv(1)
-                    # print(type(data))
+                    waited_ms += self.pp_tick_ms
                     if data != s:
+                        pending = False
+                        vision_replies += 1
+                        last_wait_ms = waited_ms
+                        if waited_ms > max_wait_ms:
+                            max_wait_ms = waited_ms
+                        # 结果缓存到方案的全局变量，方案里按需读取（需在方案中先建好 CrispyVision 字符串变量）
+                        set_global_var("CrispyVision", data)
+                        set_global_var("CrispyVisionStats", [vision_requests, vision_replies, vision_timeouts,
+                                                             last_wait_ms, max_wait_ms])
                         print(data)
                     else:
-                        print("数据为空")
+                        waited_ms += self.pp_recv_timeout_ms
+                    if pending and waited_ms >= self.pp_vision_timeout_ms:
+                        pending = False
+                        vision_timeouts += 1
+                        set_global_var("CrispyVision", "")
+                        set_global_var("CrispyVisionStats", [vision_requests, vision_replies, vision_timeouts,
+                                                             last_wait_ms, max_wait_ms])
+                        print("[Vision] Timeout")
+                        # 重连丢掉这次迟到的回复，免得被当成下一次请求的结果
+                        socket_close(1)
+                        socket_open(1, "192.168.2.205", 20000)
+                wait_ms(self.pp_tick_ms)
+                program_running = get_system_state(SystemStateEnum.PROJECT_RUNNING)
+            wait_ms(self.pp_tick_ms)
 
     def func_clear_fault(self):
         if get_system_state(SystemStateEnum.IS_FAULT):
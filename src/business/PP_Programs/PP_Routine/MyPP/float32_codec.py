@@ -0,0 +1,132 @@
+from pp.parallel_program import ParallelProgram
+from pp.settings import RobotSetting
+from pp.core.basic import append_list, get_list
+
+
+class Float32Codec(ParallelProgram):
+    """
+    IEEE-754 float32 和两个 16 位寄存器互转，整个数组一次转完，配合 Modbus 块读写：
+
+        registers = self.func_floats_to_registers([x, y, z], True)
+        modbus_tcp_write(1, 1, len(registers), 1, address, registers)
+        ...
+        values = self.func_registers_to_floats(modbus_tcp_read(1, 1, 6, 1, address), True)
+
+    high_first：True 为高字在前（ABCD），False 为低字在前（CDAB，flx 的 float 区就是这种）
+    只用四则运算和 //、%（非负数），不经过字符串，也不用 bit32
+    能处理非规格化数、±inf、NaN；-0.0 按 +0.0 编码；舍入和硬件一样是就近、平局取偶
+    func_* 会一起转成 Lua，两个 func 都不调别的 func（生成的 Lua 只展开两层 func 调用）
+    """
+
+    def __init__(self, setting: RobotSetting = RobotSetting()):
+        super().__init__(setting=setting)
+
+    def func_floats_to_registers(self, values, high_first):
+        """[f0, f1, ...] -> [r0, r1, r2, r3, ...]，每个数两个寄存器"""
+        registers = []
+        count = len(values)
+        index = 0
+        while index < count:
+            f = get_list(values, index)
+            sign = 0
+            # 分支里要赋值的先在循环这层赋一次，ppdk 给第一次赋值加 local，放在分支里出了分支就是 nil
+            bits = 0
+            mantissa = 0
+            whole = 0
+            rest = 0
+            exponent = 0
+            if f < 0:
+                sign = 2147483648
+                f = -f
+            if f != f:
+                # NaN
+                bits = 2143289344
+            elif f >= 2 ** 128:
+                bits = sign + 2139095040
+            elif f < 2 ** -126:
+                # 非规格化数（含 0）：尾数 = f / 2^-149，进位到 2^23 时正好变成最小的规格化数
+                mantissa = f * 2 ** 149
+                whole = mantissa // 1
+                rest = mantissa - whole
+                if rest > 0.5 or (rest == 0.5 and whole % 2 == 1):
+                    whole += 1
+                bits = sign + whole
+            else:
+                # 规格化到 [1, 2)，先大步再小步
+                while f >= 4294967296:
+                    f = f / 4294967296
+                    exponent += 32
+                while f >= 256:
+                    f = f / 256
+                    exponent += 8
+                while f >= 2:
+                    f = f / 2
+                    exponent += 1
+                while f < 2.3283064365386963e-10:
+                    f = f * 4294967296
+                    exponent -= 32
+                while f < 0.00390625:
+                    f = f * 256
+                    exponent -= 8
+                while f < 1:
+                    f = f * 2
+                    exponent -= 1
+                mantissa = (f - 1) * 8388608
+                whole = mantissa // 1
+                rest = mantissa - whole
+                if rest > 0.5 or (rest == 0.5 and whole % 2 == 1):
+                    whole += 1
+                # 尾数进位到 2^23 会自动进到指数；指数到 255 就是 inf
+                bits = (exponent + 127) * 8388608 + whole
+                if bits > 2139095040:
+                    bits = 2139095040
+                bits = sign + bits
+            high = bits // 65536
+            low = bits % 65536
+            if high_first:
+                append_list(registers, high)
+                append_list(registers, low)
+            else:
+                append_list(registers, low)
+                append_list(registers, high)
+            index += 1
+        return registers
+
+    def func_registers_to_floats(self, registers, high_first):
+        """[r0, r1, r2, r3, ...] -> [f0, f1, ...]，寄存器按无符号 0~65535"""
+        values = []
+        count = len(registers) // 2
+        index = 0
+        while index < count:
+            high = 0
+            low = 0
+            f = 0
+            if high_first:
+                high = get_list(registers, index * 2)
+                low = get_list(registers, index * 2 + 1)
+            else:
+                low = get_list(registers, index * 2)
+                high = get_list(registers, index * 2 + 1)
+            # 有符号读出来的寄存器先转回无符号
+            if high < 0:
+                high += 65536
+            if low < 0:
+                low += 65536
+            sign = 1
+            if high >= 32768:
+                sign = -1
+                high -= 32768
+            exponent = high // 128
+            mantissa = (high % 128) * 65536 + low
+            if exponent == 255:
+                # 1e308 * 10 在 Python 和 Lua 里都是 inf，inf - inf 是 NaN
+                f = 1e308 * 10
+                if mantissa != 0:
+                    f = f - f
+            elif exponent == 0:
+                f = mantissa * 2 ** -149
+            else:
+                f = (1 + mantissa / 8388608) * 2 ** (exponent - 127)
+            append_list(values, sign * f)
+            index += 1
+        return values
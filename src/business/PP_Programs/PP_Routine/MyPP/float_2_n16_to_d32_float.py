@@ -1,57 +1,36 @@
-from struct import pack, unpack
-
-from pp.core.mock import set_global_var
 from pp.parallel_program import ParallelProgram
 from pp.settings import RobotSetting
 from pp.core.basic import (
     get_list,
-    to_number,
-    sub_string,
-    concat_string, first_index_string)
+    append_list,
+    join_list,
+    concat_string,
+)
+from MyPP.float32_codec import Float32Codec
 
 
-class Float_2_N16(ParallelProgram):
+class Float_2_N16(Float32Codec):
 
     def __init__(self, setting: RobotSetting = RobotSetting()):
         super().__init__(setting=setting)
-
+        # 演示用的一组 float，整组转成寄存器再转回来
+        self.pp_demo_values = [20.0, 0.5, -1.25, 0.1, 16800.0, 3.0e-40]
 
     def pp_float_2_n16(self):
-
-        # self.func_float32_2_n16(20)
-        self.func_n16_2_float32(16800,0.5)
-
-    def func_float32_2_n16(self,d32_float):
-
-        n_Int_List = pack('f', d32_float)
-        n8_a = get_list(n_Int_List, 0)
-        n8_b = get_list(n_Int_List, 1)
-        n8_c = get_list(n_Int_List, 2)
-        n8_d = get_list(n_Int_List, 3)
-        n16_A = n8_a * 256 + n8_b
-        n16_B = n8_c * 256 + n8_d
-        # set_global_var(n16_A,n16_A)
-
-
-    def func_n16_2_float32(self, n16_A, n16_B):
-        r_n16_A = n16_A / 256
-        r_n16_B = n16_B / 256
-        # print(r_n16_A)
-        # print(r_n16_B)
-        str_n16_A = concat_string(r_n16_A)
-        str_n16_B = concat_string(r_n16_B)
-        #16800,0
-        dot_index_A = first_index_string(str_n16_A, ".")
-        dot_index_B = first_index_string(str_n16_B, ".")
-
-        end_n16_A = sub_string(str_n16_A, 0, dot_index_A)
-        end_n16_B = sub_string(str_n16_B, 0, dot_index_B)
-        # print(end_n16_A)
-        # print(end_n16_B)
-        nB_a = to_number(end_n16_A, 10)
-        nB_b = n16_A - nB_a * 256
-        nB_c = to_number(end_n16_B, 10)
-        nB_d = n16_B - nB_c * 256
-
-        # print(nB_a)
-        # print(unpack('f', b"nB_a,"))
\ No newline at end of file
+        # 高字在前（ABCD）：20.0 -> 16800, 0
+        registers = self.func_floats_to_registers(self.pp_demo_values, True)
+        print(concat_string("registers: ", join_list(registers, ",")))
+        values = self.func_registers_to_floats(registers, True)
+        print(concat_string("floats: ", join_list(values, ",")))
+
+        # 低字在前（CDAB），和 flx float 区的顺序一样
+        registers = self.func_floats_to_registers(self.pp_demo_values, False)
+        values = self.func_registers_to_floats(registers, False)
+        mismatch = 0
+        index = 0
+        while index < len(values):
+            if get_list(values, index) != get_list(self.pp_demo_values, index):
+                mismatch += 1
+            index += 1
+        # 0.1 和 3.0e-40（非规格化数）不能用 float32 精确表示，转回来会差一点，这里应该是 2
+        print(concat_string("round trip mismatches: ", mismatch))
@@ -0,0 +1,89 @@
+from pp.parallel_program import ParallelProgram
+from pp.settings import RobotSetting
+from pp.core.basic import (
+    concat_string,
+    first_index_string,
+    get_list,
+    split_string,
+    sub_string,
+    to_number,
+)
+
+
+class KvReply(ParallelProgram):
+    """
+    解码上位机的 kv1 应答（SocketService/socket_main.py 的 encode_kv）：键和值交替排列，都用 ; 隔开
+
+        kv1;3;name;zhangsan;age;30;skills;Python,数据分析,机器学习
+
+    解码只有一次 split，不逐字符扫描；第 i 条记录的键、值固定在 pp_kv_fields 的 2 + 2i、3 + 2i
+    按键名取值用 func_kv_get（顺序查找），布局固定的应答可以直接按下标 get_list
+    值里的 \\ ; , 回车 换行 被写成 \\b \\s \\c \\r \\n，需要原文时用 func_kv_unescape 还原：
+
+        if self.func_kv_decode(socket_recv(1)) >= 0:
+            name = self.func_kv_unescape(self.func_kv_get("name"))
+            age = to_number(self.func_kv_get("age"), 10)
+            skills = split_string(self.func_kv_get("skills"), ",")    # 每个元素再 func_kv_unescape
+
+    func_* 会一起转成 Lua，这里的几个 func 互相不调用（生成的 Lua 只展开两层 func 调用）
+    """
+
+    def __init__(self, setting: RobotSetting = RobotSetting()):
+        super().__init__(setting=setting)
+        self.pp_kv_fields = []
+
+    def func_kv_decode(self, text):
+        """切分到 pp_kv_fields，返回记录数；不是 kv1 或字段数对不上（收了半条）返回 -1"""
+        # 只取第一行，去掉行尾的换行；"\\n" 原样写进 Lua 就是换行（ppdk 不转义字符串）
+        line = text
+        stop = first_index_string(text, "\\n")
+        if stop >= 0:
+            line = sub_string(text, 0, stop)
+        fields = split_string(line, ";")
+        self.pp_kv_fields = fields
+        total = len(fields)
+        if total < 2 or get_list(fields, 0) != "kv1":
+            return -1
+        count = to_number(get_list(fields, 1), 10)
+        if count * 2 != total - 2:
+            return -1
+        return count
+
+    def func_kv_get(self, name):
+        """最近一次解码里 name 的原始值（数字直接 to_number），没有这个键返回空字符串"""
+        fields = self.pp_kv_fields
+        total = len(fields)
+        index = 2
+        while index < total:
+            if get_list(fields, index) == name:
+                return get_list(fields, index + 1)
+            index += 2
+        return ""
+
+    def func_kv_unescape(self, value):
+        """还原 \\b \\s \\c \\r \\n；没有转义的值原样返回"""
+        # "\\\\" 在 Lua 里是一个反斜杠
+        if first_index_string(value, "\\\\") < 0:
+            return value
+        parts = split_string(value, "\\\\")
+        result = get_list(parts, 0)
+        index = 1
+        count = len(parts)
+        while index < count:
+            part = get_list(parts, index)
+            # 结尾单独一个 \ 不是 encode_kv 写出来的，丢掉
+            if len(part) > 0:
+                code = sub_string(part, 0, 1)
+                if code == "s":
+                    code = ";"
+                elif code == "c":
+                    code = ","
+                elif code == "n":
+                    code = "\\n"
+                elif code == "r":
+                    code = "\\r"
+                elif code == "b":
+                    code = "\\\\"
+                result = concat_string(result, code, sub_string(part, 1, len(part)))
+            index += 1
+        return result
@@ -0,0 +1,97 @@
+from pp.parallel_program import ParallelProgram
+from pp.settings import RobotSetting
+from pp.core.basic import get_list
+from pp.core.communication import (
+    read_flx_modbus_tcp_bit,
+    read_flx_modbus_tcp_int,
+)
+
+
+class ModbusSnapshot(ParallelProgram):
+    """
+    Modbus 寄存器快照：每个 tick 每个寄存器块只读一次，之后的判断都按名字从快照里取
+
+    子类在 __init__ 里声明寄存器表，循环里每个 tick 开头调用一次 self.func_snapshot()：
+
+        self.declare_bits(0, ["running", "paused", "", "motor_ready"])   # "" 为不用的位
+        self.declare_ints(0, ["plan_id", "speed"])
+        ...
+        self.func_snapshot()
+        if self.func_rising("running"):
+            ...
+
+    func_* 会一起转成 Lua，所以这里只用 get_list 和 pp_ 变量，不调别的 func_
+    ppdk 只写 pp_ 直接调用的 func 和它们直接调用的 func，而且按发现的顺序写：子类里一个 func 既被 pp_ 调用、
+    又被别的 func 调用时，它里面的 self.func_bit(...) 可能写在 bit 定义之前，Lua 里调用到 nil。
+    这种 func 不要自己解码线圈，让 pp_ 调 func_bit 解码好再当参数传进去（ControlRobot.func_rizon_light_mode），pp_lint 会检查
+    """
+
+    def __init__(self, setting: RobotSetting = RobotSetting()):
+        super().__init__(setting=setting)
+        self.pp_snap_master = 1
+        self.pp_snap_slave = 1
+        self.pp_snap_ready = False
+        # 线圈块
+        self.pp_bit_offset = 0
+        self.pp_bit_length = 0
+        self.pp_bit_map = {}
+        self.pp_bits = []
+        self.pp_bits_prev = []
+        # 整数寄存器块
+        self.pp_int_offset = 0
+        self.pp_int_length = 0
+        self.pp_int_map = {}
+        self.pp_ints = []
+
+    def declare_bits(self, offset: int, names: list, master_id: int = 1, slave_id: int = 1):
+        """声明线圈块：names 依次对应 offset 开始的线圈"""
+        self.pp_snap_master = master_id
+        self.pp_snap_slave = slave_id
+        self.pp_bit_offset = offset
+        self.pp_bit_length = len(names)
+        self.pp_bit_map = {name: index for index, name in enumerate(names) if name}
+
+    def declare_ints(self, offset: int, names: list, master_id: int = 1, slave_id: int = 1):
+        """声明整数寄存器块：names 依次对应 offset 开始的 int32"""
+        self.pp_snap_master = master_id
+        self.pp_snap_slave = slave_id
+        self.pp_int_offset = offset
+        self.pp_int_length = len(names)
+        self.pp_int_map = {name: index for index, name in enumerate(names) if name}
+
+    def func_snapshot(self):
+        """每个已声明的块读一次，上一次的线圈快照留给 func_rising / func_falling"""
+        if self.pp_bit_length > 0:
+            self.pp_bits_prev = self.pp_bits
+            self.pp_bits = read_flx_modbus_tcp_bit(
+                self.pp_snap_master, self.pp_snap_slave, self.pp_bit_offset, self.pp_bit_length
+            )
+            # 第一次读没有上一拍，不报边沿
+            if not self.pp_snap_ready:
+                self.pp_bits_prev = self.pp_bits
+        if self.pp_int_length > 0:
+            self.pp_ints = read_flx_modbus_tcp_int(
+                self.pp_snap_master, self.pp_snap_slave, self.pp_int_offset, self.pp_int_length
+            )
+        self.pp_snap_ready = True
+
+    def func_bit(self, name):
+        """快照里的命名线圈，flx 线圈读回来是 "1"/"0"，这里统一成 True/False"""
+        value = get_list(self.pp_bits, self.pp_bit_map[name])
+        return value == "1" or value == 1
+
+    def func_rising(self, name):
+        """上一拍为 0、这一拍为 1"""
+        now = get_list(self.pp_bits, self.pp_bit_map[name])
+        before = get_list(self.pp_bits_prev, self.pp_bit_map[name])
+        return (now == "1" or now == 1) and not (before == "1" or before == 1)
+
+    def func_falling(self, name):
+        """上一拍为 1、这一拍为 0"""
+        now = get_list(self.pp_bits, self.pp_bit_map[name])
+        before = get_list(self.pp_bits_prev, self.pp_bit_map[name])
+        return (before == "1" or before == 1) and not (now == "1" or now == 1)
+
+    def func_int(self, name):
+        """快照里的命名 int32"""
+        return get_list(self.pp_ints, self.pp_int_map[name])
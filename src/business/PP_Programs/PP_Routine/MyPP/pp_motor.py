@@ -15,6 +15,7 @@ from pp.core.basic import (
     to_string,
     to_number,
     append_list,
+    get_list,
 )
 from pp.core.communication import(
     serial_port_close,
@@ -41,6 +42,15 @@ class USBMotorTxClient(ParallelProgram):
         self.MAX_SPEED = 600000
         self.SPEED = 50
         self.RUNNING = 0x88
+        # 帧头校验 = (0x3E + 命令 + 电机ID + 数据长度) % 256，除电机 ID 外都是常数，预先加好
+        self.pp_header_sum_a5 = (0x3E + 0xA5 + 0x04) % 256
+        self.pp_header_sum_a6 = (0x3E + 0xA6 + 0x08) % 256
+        self.pp_header_sum_a8 = (0x3E + 0xA8 + 0x08) % 256
+        self.pp_header_sum_94 = (0x3E + 0x94 + 0x00) % 256
+        self.pp_header_sum_19 = (0x3E + 0x19 + 0x00) % 256
+        self.pp_header_sum_88 = (0x3E + 0x88 + 0x00) % 256
+        # 0xA6 的应答：帧头 5 字节 + 数据 7 字节 + 校验
+        self.pp_angle_reply_len = 13
 
     def pp_motor(self):
         connected = self.func_connect()
@@ -84,133 +94,116 @@ class USBMotorTxClient(ParallelProgram):
 
 
     def func_send_angle(self, angle: float, direction: int):
-        """ send angle to motor
-        :param angle:
+        """ 0xA5 单圈位置控制帧（默认电机 ID）
+        :param angle: 0~359.99
+        :param direction: 0x00 顺时针，0x01 逆时针
         """
-
         if not (0.0 <= angle <= 359.99):
             print("角度需在0~359.99范围内")
-
-        # 1. 构造帧[0]~[4]
-        frame_list = []
-        angleIncrement = math.floor(angle * 8 * 100.0)
-        frame_header_num = to_number("0x3E", NumberFormatEnum.DEC)
-        single_turn_cmd_v1_num = to_number("0xA5", NumberFormatEnum.DEC)
-        default_motor_id_num = to_number("0x01", NumberFormatEnum.DEC)
-        data_len_num = to_number("0x04", NumberFormatEnum.DEC)
-        append_list(frame_list, frame_header_num)
-        append_list(frame_list, single_turn_cmd_v1_num)
-        append_list(frame_list, default_motor_id_num)
-        append_list(frame_list, data_len_num)
-        header_sum_low = (frame_header_num + single_turn_cmd_v1_num + default_motor_id_num + data_len_num) % 256
-        append_list(frame_list, header_sum_low)
-       
-        
-
-        # 2. 构造DATA[0]~DATA[3]
-        direction_str = concat_string("0x", to_string(direction, NumberFormatEnum.HEX))
-        angle_str = concat_string("0x", to_string(angleIncrement, NumberFormatEnum.HEX))
-        print(angle_str)
-        low_angle_str = concat_string("0x", to_string(to_number(angle_str, NumberFormatEnum.HEX) % 256, NumberFormatEnum.HEX))
-        high_angle_str = concat_string("0x", to_string(math.floor(to_number(angle_str, NumberFormatEnum.HEX) / 256), NumberFormatEnum.HEX))
-        angleControl_str = to_string(to_number(angle_str, NumberFormatEnum.HEX) / 65532, NumberFormatEnum.HEX)
-        direction_num = to_number(direction_str, NumberFormatEnum.DEC)
-        low_angle_num = to_number(low_angle_str, NumberFormatEnum.DEC)
-        high_angle_num = to_number(high_angle_str, NumberFormatEnum.DEC)
-
-        append_list(frame_list, direction_num)
-        append_list(frame_list, low_angle_num)
-        append_list(frame_list, high_angle_num)
-        append_list(frame_list, angleControl_str)
-        data_sum_low = (direction_num + low_angle_num + high_angle_num + to_number(angleControl_str, NumberFormatEnum.DEC)) % 256
-        append_list(frame_list, data_sum_low)
-        return frame_list
+        mid = 1
+        value = math.floor(angle * 8 * 100.0)
+        a0 = value % 256
+        a1 = math.floor(value / 256) % 256
+        return [0x3E, 0xA5, mid, 0x04, (self.pp_header_sum_a5 + mid) % 256,
+                direction, a0, a1, 0x00, (direction + a0 + a1) % 256]
 
     def func_send_angle_v2(self, angle: float, direction: int, speed_percentage: int, motor_id: int = None):
+        """ 0xA6 单圈位置控制帧（带最大速度） """
         if not (0.0 <= angle <= 359.99):
             print("角度需在0~359.99范围内")
+        mid = motor_id
+        if mid == None:
+            mid = 1
+        if mid < 1 or mid > 32:
+            print("电机ID需在1~32范围内")
+            mid = 1
 
-        frame_list = []
-        frame_header_num = to_number("0x3E", NumberFormatEnum.DEC)
-        single_turn_cmd_v2_num = to_number("0xA6", NumberFormatEnum.DEC)
+        value = math.floor(angle * 8 * 100.0)
+        a0 = value % 256
+        a1 = math.floor(value / 256) % 256
+        a2 = math.floor(value / 65536) % 256
+        speed = math.floor(600000 * (speed_percentage / 100.0))
+        s0 = speed % 256
+        s1 = math.floor(speed / 256) % 256
+        s2 = math.floor(speed / 65536) % 256
+        s3 = math.floor(speed / 16777216) % 256
+        return [0x3E, 0xA6, mid, 0x08, (self.pp_header_sum_a6 + mid) % 256,
+                direction, a0, a1, a2, s0, s1, s2, s3,
+                (direction + a0 + a1 + a2 + s0 + s1 + s2 + s3) % 256]
+
+    def func_send_increment(self, delta: float, speed_percentage: int, motor_id: int = None):
+        """ 0xA8 增量位置控制帧：delta 为正顺时针、为负逆时针（度），int32 补码 """
         mid = motor_id
         if mid == None:
             mid = 1
         if mid < 1 or mid > 32:
             print("电机ID需在1~32范围内")
             mid = 1
-        mid_mod = mid % 256
-        motor_id_str = concat_string("0x", to_string(mid_mod, NumberFormatEnum.HEX))
-        motor_id_num = to_number(motor_id_str, NumberFormatEnum.DEC)
-        data_len_num = to_number("0x08", NumberFormatEnum.DEC)
-        append_list(frame_list, frame_header_num)
-        append_list(frame_list, single_turn_cmd_v2_num)
-        append_list(frame_list, motor_id_num)
-        append_list(frame_list, data_len_num)
-        header_sum_low = (frame_header_num + single_turn_cmd_v2_num + motor_id_num + data_len_num) % 256
-        append_list(frame_list, header_sum_low)
-
-        direction_str = concat_string("0x", to_string(direction, NumberFormatEnum.HEX))
-        direction_num = to_number(direction_str, NumberFormatEnum.DEC)
-
-        angle_increment = math.floor(angle * 8 * 100.0)
-        angle_str = concat_string("0x", to_string(angle_increment, NumberFormatEnum.HEX))
-        angle_low_str = concat_string("0x", to_string(to_number(angle_str, NumberFormatEnum.HEX) % 256, NumberFormatEnum.HEX))
-        angle_mid_str = concat_string("0x", to_string(math.floor(to_number(angle_str, NumberFormatEnum.HEX) / 256) % 256, NumberFormatEnum.HEX))
-        angle_high_str = concat_string("0x", to_string(math.floor(to_number(angle_str, NumberFormatEnum.HEX) / 65536) % 256, NumberFormatEnum.HEX))
-        angle_low_num = to_number(angle_low_str, NumberFormatEnum.DEC)
-        angle_mid_num = to_number(angle_mid_str, NumberFormatEnum.DEC)
-        angle_high_num = to_number(angle_high_str, NumberFormatEnum.DEC)
-
-        max_speed_val = math.floor(600000 * (speed_percentage / 100.0))
-        speed_str = concat_string("0x", to_string(max_speed_val, NumberFormatEnum.HEX))
-        speed_b0_str = concat_string("0x", to_string(to_number(speed_str, NumberFormatEnum.HEX) % 256, NumberFormatEnum.HEX))
-        speed_b1_str = concat_string("0x", to_string(math.floor(to_number(speed_str, NumberFormatEnum.HEX) / 256) % 256, NumberFormatEnum.HEX))
-        speed_b2_str = concat_string("0x", to_string(math.floor(to_number(speed_str, NumberFormatEnum.HEX) / 65536) % 256, NumberFormatEnum.HEX))
-        speed_b3_str = concat_string("0x", to_string(math.floor(to_number(speed_str, NumberFormatEnum.HEX) / 16777216) % 256, NumberFormatEnum.HEX))
-        speed_b0_num = to_number(speed_b0_str, NumberFormatEnum.DEC)
-        speed_b1_num = to_number(speed_b1_str, NumberFormatEnum.DEC)
-        speed_b2_num = to_number(speed_b2_str, NumberFormatEnum.DEC)
-        speed_b3_num = to_number(speed_b3_str, NumberFormatEnum.DEC)
-
-        append_list(frame_list, direction_num)
-        append_list(frame_list, angle_low_num)
-        append_list(frame_list, angle_mid_num)
-        append_list(frame_list, angle_high_num)
-        append_list(frame_list, speed_b0_num)
-        append_list(frame_list, speed_b1_num)
-        append_list(frame_list, speed_b2_num)
-        append_list(frame_list, speed_b3_num)
-        data_sum_low = (direction_num + angle_low_num + angle_mid_num + angle_high_num + speed_b0_num + speed_b1_num + speed_b2_num + speed_b3_num) % 256
-        append_list(frame_list, data_sum_low)
-        return frame_list
+
+        value = math.floor(delta * 8 * 100.0)
+        if value < 0:
+            value = value + 4294967296
+        a0 = value % 256
+        a1 = math.floor(value / 256) % 256
+        a2 = math.floor(value / 65536) % 256
+        a3 = math.floor(value / 16777216) % 256
+        speed = math.floor(600000 * (speed_percentage / 100.0))
+        s0 = speed % 256
+        s1 = math.floor(speed / 256) % 256
+        s2 = math.floor(speed / 65536) % 256
+        s3 = math.floor(speed / 16777216) % 256
+        return [0x3E, 0xA8, mid, 0x08, (self.pp_header_sum_a8 + mid) % 256,
+                a0, a1, a2, a3, s0, s1, s2, s3,
+                (a0 + a1 + a2 + a3 + s0 + s1 + s2 + s3) % 256]
+
+    def func_send_angles(self, motor_ids, directions, angles, speed_percentage: int):
+        """
+        依次给多台电机发 0xA6，每台发完读一次应答再发下一台（RS485 半双工，应答不能和下一帧撞上）
+        速度的 4 个字节只算一次，每台只剩角度 3 个字节和校验
+        :param motor_ids: [id, ...]，1~32
+        :param directions: 和 motor_ids 一一对应，0x00 顺时针，0x01 逆时针
+        :param angles: 和 motor_ids 一一对应，0~359.99
+        :return: 收到应答的电机数
+        """
+        speed = math.floor(600000 * (speed_percentage / 100.0))
+        s0 = speed % 256
+        s1 = math.floor(speed / 256) % 256
+        s2 = math.floor(speed / 65536) % 256
+        s3 = math.floor(speed / 16777216) % 256
+        speed_sum = s0 + s1 + s2 + s3
+
+        replies = 0
+        count = len(motor_ids)
+        index = 0
+        while index < count:
+            mid = get_list(motor_ids, index)
+            direction = get_list(directions, index)
+            value = math.floor(get_list(angles, index) * 8 * 100.0)
+            a0 = value % 256
+            a1 = math.floor(value / 256) % 256
+            a2 = math.floor(value / 65536) % 256
+            serial_port_send(1, [0x3E, 0xA6, mid, 0x08, (self.pp_header_sum_a6 + mid) % 256,
+                                 direction, a0, a1, a2, s0, s1, s2, s3,
+                                 (direction + a0 + a1 + a2 + speed_sum) % 256])
+            resp = serial_port_recv(1, self.pp_angle_reply_len)
+            if len(resp) > 0:
+                replies += 1
+            index += 1
+        return replies
 
     def func_read_single_angle(self, motor_id: int = None):
-        frame_list = []
-        frame_header_num = to_number("0x3E", NumberFormatEnum.DEC)
-        read_single_angle_cmd_num = to_number("0x94", NumberFormatEnum.DEC)
         mid = motor_id
         if mid == None:
             mid = 1
         if mid < 1 or mid > 32:
             print("电机ID需在1~32范围内")
             mid = 1
-        mid_mod = mid % 256
-        motor_id_str = concat_string("0x", to_string(mid_mod, NumberFormatEnum.HEX))
-        motor_id_num = to_number(motor_id_str, NumberFormatEnum.DEC)
-        data_len_num = to_number("0x00", NumberFormatEnum.DEC)
-        append_list(frame_list, frame_header_num)
-        append_list(frame_list, read_single_angle_cmd_num)
-        append_list(frame_list, motor_id_num)
-        append_list(frame_list, data_len_num)
-        header_sum_low = (frame_header_num + read_single_angle_cmd_num + motor_id_num + data_len_num) % 256
-        append_list(frame_list, header_sum_low)
-        serial_port_send(1, frame_list)
+        serial_port_send(1, [0x3E, 0x94, mid, 0x00, (self.pp_header_sum_94 + mid) % 256])
         resp = serial_port_recv(1, 10)
-        if resp:
-            cmd_sum_low = (resp[0] + resp[1] + resp[2] + resp[3]) % 256
-            data_sum_low = (resp[5] + resp[6] + resp[7] + resp[8]) % 256
-            raw_value = resp[5] + resp[6] * 256 + resp[7] * 65536 + resp[8] * 16777216
+        if len(resp) >= 10:
+            # 不用 get_list：这个 func 只被 func_move_to_angle_v2 调用，ppdk 不会把 get_list 写进 motor.lua
+            # 直接写下标就是 Lua 表的下标，从 1 开始：resp[6] 是第 6 个字节，即 get_list(resp, 5)
+            raw_value = resp[6] + resp[7] * 256 + resp[8] * 65536 + resp[9] * 16777216
             angle_deg = (raw_value * 0.01) / 8
             return angle_deg
         return 0.0
@@ -1,42 +1,147 @@
 from pp.settings import RobotSetting
-from pp.enums import GPIOEnum, GPIOOutPortEnum, SystemStateEnum
+from pp.enums import GPIOEnum, SystemStateEnum
 
 from pp.parallel_program import ParallelProgram
 from pp.core.robot import get_system_state, get_global_var, set_io
-from pp.core.basic import get_list
+from pp.core.basic import get_list, set_list, append_list, wait_ms, concat_string
 
 
-class SecurityZone(ParallelProgram):
+class SecurityZoneTask(ParallelProgram):
+    """
+    安全区判定，拆成 func_zone_setup / func_zone_step 两步，SecurityZone 和 Supervisor 共用
+
+    全局变量 SecZones：每个区域 10 个数 [形状, 输出口, a, b, c, d, e, f, 滞回带宽, 区域内输出]
+      形状 0 球：a b c 球心，d 半径（e f 不用）；形状 1 轴对齐盒：a b c 最小角，d e f 最大角
+      输出口 n 对应 GPIO_OUT_n；区域内输出 1：进入区域置 True，0：离开区域置 True
+      滞回：进入要越过边界往里 带宽，离开要越过边界往外 带宽
+    原来的两个球区（secZone1_calcRef 半径 0.1 → OUT_0，secZone2_calcRef 半径 0.05 → OUT_1，离开时置位）对应：
+      [0, 0, x1, y1, z1, 0.1, 0, 0, 0.005, 0,   0, 1, x2, y2, z2, 0.05, 0, 0, 0.005, 0]
+    """
+
+    def __init__(self, setting: RobotSetting = RobotSetting()):
+        super().__init__(setting=setting)
+        self.pp_zone_count = 0
+        self.pp_zone_first = True
+        self.pp_zone_shapes = []
+        self.pp_zone_ports = []
+        self.pp_zone_levels = []
+        self.pp_zone_limits = []
+        self.pp_zone_states = []
+
+    def func_zone_setup(self):
+        """读 SecZones，每个区域预先算好判定用的 12 个数，循环里只做乘加比较，不开方
+          球：[cx, cy, cz, 进入半径², 离开半径², 0 ...]
+          盒：[进入用的 6 个边界（往里缩 带宽）, 离开用的 6 个边界（往外扩 带宽）]
+        """
+        zones = get_global_var("SecZones")
+        count = len(zones) // 10
+        shapes = []
+        ports = []
+        levels = []
+        limits = []
+        states = []
+        index = 0
+        while index < count:
+            base = index * 10
+            shape = get_list(zones, base)
+            band = get_list(zones, base + 8)
+            append_list(shapes, shape)
+            # // 1 取整（Lua 里是 math.floor），方案里的数是浮点时拼出来才不会是 gpioOut0.0
+            append_list(ports, concat_string("gpioOut", get_list(zones, base + 1) // 1))
+            append_list(levels, get_list(zones, base + 9) == 1)
+            append_list(states, False)
+            if shape == 0:
+                radius = get_list(zones, base + 5)
+                enter = radius - band
+                if enter < 0:
+                    enter = 0
+                leave = radius + band
+                append_list(limits, get_list(zones, base + 2))
+                append_list(limits, get_list(zones, base + 3))
+                append_list(limits, get_list(zones, base + 4))
+                append_list(limits, enter * enter)
+                append_list(limits, leave * leave)
+                n = 0
+                while n < 7:
+                    append_list(limits, 0)
+                    n += 1
+            else:
+                n = 0
+                while n < 3:
+                    append_list(limits, get_list(zones, base + 2 + n) + band)
+                    n += 1
+                n = 0
+                while n < 3:
+                    append_list(limits, get_list(zones, base + 5 + n) - band)
+                    n += 1
+                n = 0
+                while n < 3:
+                    append_list(limits, get_list(zones, base + 2 + n) - band)
+                    n += 1
+                n = 0
+                while n < 3:
+                    append_list(limits, get_list(zones, base + 5 + n) + band)
+                    n += 1
+            index += 1
+        self.pp_zone_count = count
+        self.pp_zone_shapes = shapes
+        self.pp_zone_ports = ports
+        self.pp_zone_levels = levels
+        self.pp_zone_limits = limits
+        self.pp_zone_states = states
+        self.pp_zone_first = True
+
+    def func_zone_step(self, tcp_pose):
+        """按一次 TCP 位姿判定所有区域，状态变化才写 IO"""
+        tcp_x = get_list(tcp_pose, 0)
+        tcp_y = get_list(tcp_pose, 1)
+        tcp_z = get_list(tcp_pose, 2)
+        limits = self.pp_zone_limits
+        states = self.pp_zone_states
+        index = 0
+        while index < self.pp_zone_count:
+            base = index * 12
+            was_inside = get_list(states, index)
+            # 先在循环体这一层赋值，ppdk 才不会把 inside 变成 if 分支里的 local
+            inside = was_inside
+            # 盒：不在区内看进入用的 6 个边界，在区内看后面离开用的 6 个
+            # 也放在这一层：else: 里先写 if 的话，ppdk 会把它合成 elseif，后面的 inside = ... 就丢了
+            box = base
+            if was_inside:
+                box = base + 6
+            if get_list(self.pp_zone_shapes, index) == 0:
+                dx = tcp_x - get_list(limits, base)
+                dy = tcp_y - get_list(limits, base + 1)
+                dz = tcp_z - get_list(limits, base + 2)
+                dist2 = dx * dx + dy * dy + dz * dz
+                if was_inside:
+                    inside = dist2 <= get_list(limits, base + 4)
+                else:
+                    inside = dist2 < get_list(limits, base + 3)
+            else:
+                inside = (
+                    get_list(limits, box) <= tcp_x
+                    and tcp_x <= get_list(limits, box + 3)
+                    and get_list(limits, box + 1) <= tcp_y
+                    and tcp_y <= get_list(limits, box + 4)
+                    and get_list(limits, box + 2) <= tcp_z
+                    and tcp_z <= get_list(limits, box + 5)
+                )
+            if self.pp_zone_first or inside != was_inside:
+                set_list(states, index, inside)
+                set_io(GPIOEnum.SYSTEM, get_list(self.pp_zone_ports, index), inside == get_list(self.pp_zone_levels, index))
+            index += 1
+        self.pp_zone_first = False
+
+
+class SecurityZone(SecurityZoneTask):
     def __init__(self, setting: RobotSetting = RobotSetting()):
         super().__init__(setting=setting)
+        # 监控周期 (ms)
+        self.pp_period_ms = 10
 
     def pp_security_zone_judge(self):
-        sec_zone1_calc_ref = get_global_var('secZone1_calcRef')
-        sec_zone2_cal_cref = get_global_var('secZone2_calcRef')
-        ref1_x = get_list(sec_zone1_calc_ref, 0)
-        ref1_y = get_list(sec_zone1_calc_ref, 1)
-        ref1_z = get_list(sec_zone1_calc_ref, 2)
-        ref2_x = get_list(sec_zone2_cal_cref, 0)
-        ref2_y = get_list(sec_zone2_cal_cref, 1)
-        ref2_z = get_list(sec_zone2_cal_cref, 2)
+        self.func_zone_setup()
         while True:
-            tcp_pose = get_system_state(SystemStateEnum.TCP_POSE)
-            tcp_x = get_list(tcp_pose, 0)
-            tcp_y = get_list(tcp_pose, 1)
-            tcp_z = get_list(tcp_pose, 2)
-            # print(tcp_x)
-            # print(tcp_y)
-            # print(tcp_z)
-            # print(ref1_x)
-            # print(ref1_y)
-            # print(ref1_z)
-            dis1 = (
-                (ref1_x - tcp_x) ** 2 + (ref1_y - tcp_y) ** 2 + (ref1_z - tcp_z) ** 2
-            ) ** 0.5
-            dis2 = (
-                (ref2_x - tcp_x) ** 2 + (ref2_y - tcp_y) ** 2 + (ref2_z - tcp_z) ** 2
-            ) ** 0.5
-            if dis1 > 0.1:
-                set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_0, True)
-            elif dis2 > 0.05:
-                set_io(GPIOEnum.SYSTEM, GPIOOutPortEnum.GPIO_OUT_1, True)
+            self.func_zone_step(get_system_state(SystemStateEnum.TCP_POSE))
+            wait_ms(self.pp_period_ms)
@@ -0,0 +1,130 @@
+from pp.parallel_program import ParallelProgram
+from pp.settings import RobotSetting
+from pp.enums import SystemStateEnum
+from pp.core.basic import wait_ms, get_list, set_list, append_list
+from pp.core.robot import get_system_state, set_global_var
+
+from MyPP.clearfault_test import ClearFaultTask
+from MyPP.control_gripper import GripperTask
+from MyPP.security_zone import SecurityZoneTask
+
+# ================== 配置 ==================
+# 能挂到 Supervisor 上的任务，名字对应 pp_supervisor 里的分发
+SUPERVISOR_TASKS = ("gripper", "security_zone", "clear_fault")
+
+
+class Supervisor(ClearFaultTask, GripperTask, SecurityZoneTask):
+    """
+    一个并行程序里轮流跑 ClearFaultTest / ControlGripper / SecurityZone 的活，代替三个各自轮询的 PP
+
+    每个 tick 开头读一次系统状态快照，到期的任务共用；任务按各自周期执行，晚了整整一个周期以上记一次超时
+    全局变量 SupervisorStats：按注册顺序每个任务 3 个数 [执行次数, 超时次数, 最大延后 ms]
+      控制器上没有时钟，时间按 tick、任务里 wait_ms 等掉的时间、再加上这一拍的调用次数 * pp_call_cost_ms 累计
+      调用耗时是估计值，控制器被别的程序占满时真实调用会慢很多倍，这种卡顿延后和超时都看不到；
+      只能算下限，真实的执行频率用 simulator 的 --cpu-load 或现场的执行次数对时间核对
+    """
+
+    def __init__(self, setting: RobotSetting = RobotSetting()):
+        super().__init__(setting=setting)
+        # 调度 tick (ms)，任务周期最好是它的整数倍
+        self.pp_tick_ms = 2
+        # 每隔多久发布一次 SupervisorStats (ms)
+        self.pp_stats_every_ms = 1000
+        # 估计的每次控制器读写调用耗时 (ms)，计入调度时钟
+        self.pp_call_cost_ms = 0.05
+        self.pp_task_names = []
+        self.pp_task_periods = []
+        self.register_task("gripper", self.pp_poll_ms)
+        self.register_task("security_zone", 10)
+        self.register_task("clear_fault", 100)
+
+    def register_task(self, name: str, period_ms: int):
+        """挂一个任务，name 取 SUPERVISOR_TASKS 里的名字"""
+        if name not in SUPERVISOR_TASKS:
+            raise ValueError(f"unknown supervisor task {name!r}, expected one of {SUPERVISOR_TASKS}")
+        if name in self.pp_task_names:
+            raise ValueError(f"supervisor task {name!r} registered twice")
+        self.pp_task_names.append(name)
+        self.pp_task_periods.append(period_ms)
+
+    def pp_supervisor(self):
+        names = self.pp_task_names
+        periods = self.pp_task_periods
+        count = len(names)
+        due = []
+        last_run = []
+        stats = []
+        index = 0
+        while index < count:
+            append_list(due, 0)
+            append_list(last_run, 0)
+            append_list(stats, 0)
+            append_list(stats, 0)
+            append_list(stats, 0)
+            if get_list(names, index) == "security_zone":
+                self.func_zone_setup()
+            index += 1
+
+        now_ms = 0
+        next_stats_ms = self.pp_stats_every_ms
+        while True:
+            # 系统状态快照：运行状态每拍都要，其余的等到期任务第一次用到时读，一拍最多读一次
+            running = get_system_state(SystemStateEnum.PROJECT_RUNNING)
+            calls = 1
+            # 快照变量先在这一层赋值，ppdk 才不会把它们变成读取分支里的 local
+            have_fault = False
+            servo_on = False
+            is_fault = False
+            have_pose = False
+            tcp_pose = []
+            waited_ms = 0
+            index = 0
+            while index < count:
+                if now_ms >= get_list(due, index):
+                    period = get_list(periods, index)
+                    late = now_ms - get_list(due, index)
+                    base = index * 3
+                    set_list(stats, base, get_list(stats, base) + 1)
+                    if late >= period:
+                        set_list(stats, base + 1, get_list(stats, base + 1) + 1)
+                    if late > get_list(stats, base + 2):
+                        set_list(stats, base + 2, late)
+
+                    name = get_list(names, index)
+                    # clear_fault 每次都要报错状态，夹爪只在运行中刚停下来的那一拍要
+                    if not have_fault and (name == "clear_fault" or (
+                            name == "gripper" and not running and self.pp_grip_running)):
+                        servo_on = get_system_state(SystemStateEnum.IS_SERVO_ON)
+                        is_fault = get_system_state(SystemStateEnum.IS_FAULT)
+                        have_fault = True
+                        calls += 2
+                    if name == "gripper":
+                        if self.func_gripper_step(running, is_fault, now_ms - get_list(last_run, index)):
+                            calls += 2
+                        if running:
+                            calls += 1
+                    elif name == "security_zone":
+                        if not have_pose:
+                            tcp_pose = get_system_state(SystemStateEnum.TCP_POSE)
+                            have_pose = True
+                            calls += 1
+                        self.func_zone_step(tcp_pose)
+                    elif name == "clear_fault":
+                        cleared_ms = self.func_clear_fault_step(servo_on, is_fault)
+                        if cleared_ms > 0:
+                            waited_ms += cleared_ms
+                            calls += 2
+
+                    set_list(last_run, index, now_ms)
+                    # 错过的周期不补跑，从现在起排下一次
+                    next_due = get_list(due, index) + period
+                    if next_due <= now_ms:
+                        next_due = now_ms + period
+                    set_list(due, index, next_due)
+                index += 1
+
+            if now_ms >= next_stats_ms:
+                set_global_var("SupervisorStats", stats)
+                next_stats_ms = now_ms + self.pp_stats_every_ms
+            wait_ms(self.pp_tick_ms)
+            now_ms += self.pp_tick_ms + waited_ms + calls * self.pp_call_cost_ms
@@ -7,30 +7,143 @@ from pp.enums import (
     DataBitsEnum,
     StopBitsEnum,
 )
-from pp.core.basic import wait_ms
+from pp.core.basic import wait_ms, get_list, set_list, append_list
+from pp.core.robot import set_global_var
 from pp.core.communication import modbus_rtu_open, modbus_rtu_read, modbus_rtu_close
 
 
 class UsbSensorPP(ParallelProgram):
+    """
+    RS485 传感器轮询：每个采样把声明的寄存器块各读一次（一块一个 Modbus RTU 事务），结果写进全局变量环形缓冲
+
+    全局变量 SensorRing：[已写采样数, 每个采样的数据个数 width, 容量, 采样 0 的 width 个数, 采样 1 ...]
+      第 n 个采样（从 0 数）在 3 + (n % 容量) * width；消费方记住上次读到的采样数，只取新写的
+      采样数和数据在同一个列表里一次发布，不会读到数据和计数对不上的情况
+    全局变量 SensorStats：[采样数, 超时次数, CRC 错次数, 有效采样率 Hz]
+      ppdk 的 modbus_rtu_read 只返回数据表：空表按超时计，长度不对按 CRC / 帧错误计，这个采样整个丢掉
+      控制器上没有时钟，时间按 wait_ms 加上按波特率估的总线时间累计，超时按 pp_timeout_ms 计
+    """
+
     def __init__(self, setting: RobotSetting = RobotSetting()):
         super().__init__(setting=setting)
+        self.pp_port = "/dev/serusb2"
+        # BaudRateEnum 的值，也用来估算总线时间
+        self.pp_baud = BaudRateEnum.BAUD_9600.value
+        # 从站不应答时控制器等多久 (ms)，只用来估算采样率
+        self.pp_timeout_ms = 100
+        # 采样周期 (ms)，两次采样之间额外等的时间；总线时间比它长时采样率由总线决定
+        self.pp_period_ms = 5
+        # 环形缓冲能存多少个采样
+        self.pp_ring_size = 200
+        # 每写几个采样发布一次 SensorRing
+        self.pp_publish_every = 1
+        # 每隔多久发布一次 SensorStats (ms)
+        self.pp_stats_every_ms = 1000
+        # 寄存器块，每块 4 个数 [从站, 读类型, 起始地址, 个数]
+        self.pp_blocks = []
+        self.pp_width = 0
+        # 所有块正常读一遍在总线上的字符数（含帧间静默）
+        self.pp_sample_chars = 0
+        self.pp_ring = []
+        self.declare_block(1, ModbusReadTypeEnum.HOLDING_REGISTERS, 512, 1)
+
+    def declare_block(self, slave_id: int, type: ModbusReadTypeEnum, address: int, quantity: int):
+        """声明一个寄存器块，每个采样按声明顺序一块一个事务读，数据依次排进采样里"""
+        if not 1 <= quantity <= 125:
+            raise ValueError(f"modbus block quantity must be between 1 and 125, got {quantity}")
+        type = getattr(type, "value", type)
+        self.pp_blocks = self.pp_blocks + [slave_id, type, address, quantity]
+        self.pp_width = self.pp_width + quantity
+        # 请求 8 字节，应答 5 字节加数据，每帧后 3.5 个字符静默
+        data_bytes = (quantity + 7) // 8 if type in (0, 2) else quantity * 2
+        self.pp_sample_chars = self.pp_sample_chars + 8 + 5 + data_bytes + 7
+
+    def func_ring_setup(self):
+        """按容量和 width 建好 SensorRing，数据全是 0"""
+        ring = [0, self.pp_width, self.pp_ring_size]
+        total = self.pp_ring_size * self.pp_width
+        index = 0
+        while index < total:
+            append_list(ring, 0)
+            index += 1
+        self.pp_ring = ring
+
+    def func_sample(self, seq):
+        """读一个采样写到第 seq 个位置：返回 0 成功，1 超时，2 CRC 错"""
+        blocks = self.pp_blocks
+        ring = self.pp_ring
+        count = len(blocks) // 4
+        base = 3 + (seq % self.pp_ring_size) * self.pp_width
+        index = 0
+        while index < count:
+            quantity = get_list(blocks, index * 4 + 3)
+            data = modbus_rtu_read(
+                1,
+                get_list(blocks, index * 4),
+                quantity,
+                get_list(blocks, index * 4 + 1),
+                get_list(blocks, index * 4 + 2),
+            )
+            received = len(data)
+            if received == 0:
+                return 1
+            if received != quantity:
+                return 2
+            n = 0
+            while n < quantity:
+                set_list(ring, base + n, get_list(data, n))
+                n += 1
+            base += quantity
+            index += 1
+        set_list(ring, 0, seq + 1)
+        return 0
 
     def pp_sensor(self):
-        i = 0
-        if modbus_rtu_open(
+        if not modbus_rtu_open(
             1,
-            "/dev/serusb2",
-            BaudRateEnum.BAUD_9600,
+            self.pp_port,
+            self.pp_baud,
             PartityEnum.NONE,
             DataBitsEnum.BIT_8,
             StopBitsEnum.BIT_1,
         ):
+            # ppdk 转 Lua 不支持不带值的 return，打不开就走到结尾
+            print("Sensor connection failed")
+            modbus_rtu_close(1)
+        else:
             print("Sensor connection successful")
-            while i < 1000:
-                print(
-                    modbus_rtu_read(1, 1, 1, ModbusReadTypeEnum.HOLDING_REGISTERS, 512)
-                )
-                wait_ms(5)
-                i = i + 1
-        print("Sensor connection failed")
-        modbus_rtu_close(1)
+            self.func_ring_setup()
+            # 每字符 10 位（起始位 + 8 数据位 + 停止位）
+            sample_bus_ms = self.pp_sample_chars * 10 * 1000 / self.pp_baud
+            seq = 0
+            timeouts = 0
+            crc_errors = 0
+            unpublished = 0
+            now_ms = 0
+            window_start_ms = 0
+            window_start_seq = 0
+            next_stats_ms = self.pp_stats_every_ms
+            while True:
+                result = self.func_sample(seq)
+                if result == 0:
+                    seq += 1
+                    unpublished += 1
+                    now_ms += sample_bus_ms
+                    if unpublished >= self.pp_publish_every:
+                        set_global_var("SensorRing", self.pp_ring)
+                        unpublished = 0
+                elif result == 1:
+                    timeouts += 1
+                    now_ms += self.pp_timeout_ms
+                else:
+                    crc_errors += 1
+                    now_ms += sample_bus_ms
+
+                if now_ms >= next_stats_ms:
+                    rate = (seq - window_start_seq) * 1000 / (now_ms - window_start_ms)
+                    set_global_var("SensorStats", [seq, timeouts, crc_errors, rate])
+                    window_start_ms = now_ms
+                    window_start_seq = seq
+                    next_stats_ms = now_ms + self.pp_stats_every_ms
+                wait_ms(self.pp_period_ms)
+                now_ms += self.pp_period_ms
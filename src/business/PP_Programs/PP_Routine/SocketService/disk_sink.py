@@ -0,0 +1,160 @@
+import collections
+import os
+import threading
+import time
+
+# ================== 配置 ==================
+QUEUE_MAX_SAMPLES = 200_000     # 队列上限（按采样行数计），12 字段 1kHz 约 3 分钟
+MAX_BATCH_ITEMS = 256           # 写线程一次最多取这么多项合并写
+FSYNC_NONE = "none"             # 交给操作系统
+FSYNC_BATCH = "batch"           # 每批写完都 fsync
+FSYNC_INTERVAL = "interval"     # 最多每 fsync_interval_s 秒 fsync 一次
+WARN_INTERVAL_S = 1.0           # 丢数据告警最多每秒一条
+HIGH_WATER_MARKS = (0.5, 0.75, 0.9)
+
+
+def fsync_file(f):
+    """先把 Python 缓冲刷到内核，再让内核刷到磁盘"""
+    f.flush()
+    os.fsync(f.fileno())
+
+
+class DiskSink:
+    """
+    接收线程和磁盘之间的有界队列 + 专用写线程
+    - put() 从接收线程调用，队列没满时只是 append，不碰磁盘
+    - 写线程一次取出所有积压项交给 write_batch(items)，再按策略调用 sync()
+    - 队列满时 on_full="drop" 丢掉新数据并计数告警，"block" 则等待（背压传回 TCP）
+    - 队列深度第一次超过 50% / 75% / 90% 时各打印一次，丢弃数和高水位都在 stats() 里
+    """
+
+    def __init__(self, name, write_batch, sync=None, max_samples=QUEUE_MAX_SAMPLES, on_full="drop",
+                 fsync=FSYNC_INTERVAL, fsync_interval_s=1.0, max_batch=MAX_BATCH_ITEMS):
+        self.name = name
+        self.write_batch = write_batch
+        self.sync = sync
+        self.max_samples = max_samples
+        self.on_full = on_full
+        self.fsync = fsync if sync is not None else FSYNC_NONE
+        self.fsync_interval_s = fsync_interval_s
+        self.max_batch = max_batch
+
+        self.queued = 0             # 队列里的采样行数
+        self.high_water = 0
+        self.dropped = 0            # 因队列满丢掉的采样行数
+        self.written = 0
+        self.batches = 0
+        self.write_errors = 0
+        self.write_seconds = 0.0
+        self.fsyncs = 0
+
+        self._items = collections.deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._marks = list(HIGH_WATER_MARKS)
+        self._last_warn = 0.0
+        self._unreported = 0
+        self._last_sync = time.monotonic()
+        self._dirty = False
+        self._thread = threading.Thread(target=self._run, name=f"sink-{name}", daemon=True)
+        self._thread.start()
+
+    # ================== 接收线程侧 ==================
+    def put(self, item, samples=1):
+        """
+        返回 False 表示这批数据被丢弃
+        block 模式下单批就超过 max_samples 的按 max_samples 算：等队列清空后单独放进去，不会永远等下去
+        """
+        with self._cond:
+            if self.queued + samples > self.max_samples:
+                if self.on_full == "block":
+                    need = min(samples, self.max_samples)
+                    while self.queued + need > self.max_samples and not self._closed:
+                        self._cond.wait()
+                else:
+                    self._drop(samples)
+                    return False
+            self._items.append((item, samples))
+            self.queued += samples
+            if self.queued > self.high_water:
+                self.high_water = self.queued
+                while self._marks and self.queued >= self._marks[0] * self.max_samples:
+                    print(f"[WARN] sink {self.name}: queue reached {self._marks.pop(0):.0%} "
+                          f"({self.queued}/{self.max_samples} samples)")
+            self._cond.notify_all()
+        return True
+
+    def _drop(self, samples):
+        self.dropped += samples
+        self._unreported += samples
+        now = time.monotonic()
+        if now - self._last_warn >= WARN_INTERVAL_S:
+            print(f"[WARN] sink {self.name}: queue full, dropped {self._unreported} samples "
+                  f"(total {self.dropped})")
+            self._unreported = 0
+            self._last_warn = now
+
+    def close(self, timeout=None):
+        """写完队列里剩下的数据再返回"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        if self._unreported:
+            print(f"[WARN] sink {self.name}: dropped {self.dropped} samples in total")
+
+    def stats(self):
+        return {
+            "queued": self.queued, "high_water": self.high_water, "max": self.max_samples,
+            "dropped": self.dropped, "written": self.written, "batches": self.batches,
+            "errors": self.write_errors, "write_seconds": self.write_seconds, "fsyncs": self.fsyncs,
+        }
+
+    # ================== 写线程 ==================
+    def _run(self):
+        timeout = self.fsync_interval_s if self.fsync == FSYNC_INTERVAL else None
+        while True:
+            with self._cond:
+                if not self._items and not self._closed:
+                    self._cond.wait(timeout)
+                if not self._items and self._closed:
+                    break
+                batch = [self._items.popleft() for _ in range(min(len(self._items), self.max_batch))]
+            if not batch:
+                self._maybe_sync()      # 空闲时把上一段时间写的数据刷盘
+                continue
+
+            samples = sum(n for _, n in batch)
+            t0 = time.perf_counter()
+            try:
+                self.write_batch([item for item, _ in batch])
+                self.written += samples
+                self._dirty = True
+            except Exception as e:
+                # 不只是 OSError：写线程一退出队列就不再消化，block 模式的接收线程会永远等下去
+                self.write_errors += 1
+                print(f"[ERROR] sink {self.name}: write failed, lost {samples} samples: {type(e).__name__}: {e}")
+            self.write_seconds += time.perf_counter() - t0
+            self.batches += 1
+            if self.fsync == FSYNC_BATCH:
+                self._maybe_sync()
+            elif self.fsync == FSYNC_INTERVAL and time.monotonic() - self._last_sync >= self.fsync_interval_s:
+                self._maybe_sync()
+
+            with self._cond:
+                self.queued -= samples
+                self._cond.notify_all()
+        self._maybe_sync()
+
+    def _maybe_sync(self):
+        if self.fsync == FSYNC_NONE or not self._dirty:
+            return
+        t0 = time.perf_counter()
+        try:
+            self.sync()
+            self.fsyncs += 1
+        except Exception as e:
+            print(f"[ERROR] sink {self.name}: fsync failed: {type(e).__name__}: {e}")
+        self.write_seconds += time.perf_counter() - t0
+        self._dirty = False
+        self._last_sync = time.monotonic()
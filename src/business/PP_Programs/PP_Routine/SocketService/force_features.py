@@ -0,0 +1,92 @@
+import csv
+import os
+
+# ================== 配置 ==================
+CONTACT_FORCE_N = 2.0       # |Fz - 基线| 超过该值视为接触
+
+SUMMARY_HEADER = [
+    "Group", "Start", "End", "Samples", "Duration_s",
+    "Peak_Fz", "Contact_PoseZ", "Impulse_Ns", "Contact_Duration_s", "Time_Base",
+]
+
+
+class GroupFeatures:
+    """
+    随采样增量计算一组按压的特征，组关闭时直接给出汇总，不需要回读宽表 CSV
+    - peak_fz: |Fz| 最大的那个采样值（保留符号）
+    - contact_pose_z: 第一次进入接触时的 Pose_Z
+    - impulse: (Fz - 基线) 对时间的梯形积分，单位 N·s
+    - duration / contact_duration: 整组时长 / 处于接触状态的时长
+    基线取本组第一个采样的 Fz
+    update 的 ts 是采样时刻（秒），time_base 说明它从哪来，原样写进汇总：
+    "t_ms" PP 给的采样时刻，"period" 序号 * 固定周期，"arrival" 到达时刻（同一次 recv 的行 dt≈0，只是估计）
+    """
+
+    def __init__(self, index, contact_force=CONTACT_FORCE_N, time_base="arrival"):
+        self.index = index
+        self.contact_force = contact_force
+        self.time_base = time_base
+        self.samples = 0
+        self.start_time = None
+        self.end_time = None
+        self.first_ts = None
+        self.last_ts = None
+        self.baseline = 0.0
+        self.peak_fz = None
+        self.contact_pose_z = None
+        self.impulse = 0.0
+        self.contact_duration = 0.0
+        self._last_df = 0.0
+        self._in_contact = False
+
+    def update(self, ts, force_z, pose_z, time_str=""):
+        if self.samples == 0:
+            self.first_ts = ts
+            self.start_time = time_str
+            self.baseline = force_z
+        else:
+            dt = ts - self.last_ts
+            df = force_z - self.baseline
+            self.impulse += (df + self._last_df) * 0.5 * dt
+            if self._in_contact:
+                self.contact_duration += dt
+
+        df = force_z - self.baseline
+        if abs(df) >= self.contact_force:
+            if self.contact_pose_z is None:
+                self.contact_pose_z = pose_z
+            self._in_contact = True
+        else:
+            self._in_contact = False
+
+        if self.peak_fz is None or abs(force_z) > abs(self.peak_fz):
+            self.peak_fz = force_z
+
+        self._last_df = df
+        self.last_ts = ts
+        self.end_time = time_str
+        self.samples += 1
+
+    def summary(self):
+        return {
+            "Group": self.index,
+            "Start": self.start_time,
+            "End": self.end_time,
+            "Samples": self.samples,
+            "Duration_s": round(self.last_ts - self.first_ts, 6) if self.samples else 0.0,
+            "Peak_Fz": self.peak_fz,
+            "Contact_PoseZ": self.contact_pose_z,
+            "Impulse_Ns": round(self.impulse, 6),
+            "Contact_Duration_s": round(self.contact_duration, 6),
+            "Time_Base": self.time_base,
+        }
+
+
+def append_summary(filename, record):
+    """组关闭时追加一行汇总，文件不存在时先写表头"""
+    new_file = not os.path.exists(filename)
+    with open(filename, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_HEADER)
+        if new_file:
+            writer.writeheader()
+        writer.writerow(record)
@@ -0,0 +1,421 @@
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import fcntl
+    import termios
+except ImportError:  # Windows 上没有，接收积压就不采
+    fcntl = None
+
+import numpy as np
+
+# ================== 配置 ==================
+SUMMARY_INTERVAL_S = 10     # 汇总日志间隔
+# recv 到落盘的延迟直方图桶（秒）
+LATENCY_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0)
+
+
+def recv_backlog(sock):
+    """内核接收缓冲里还没被读走的字节数，持续增长说明处理跟不上"""
+    if fcntl is None:
+        return 0
+    try:
+        return int.from_bytes(fcntl.ioctl(sock.fileno(), termios.FIONREAD, b"\0\0\0\0"), "little")
+    except OSError:
+        return 0
+
+
+# ================== 单连接计数 ==================
+class ConnectionMetrics:
+    """
+    一个连接的计数器，热路径上不加锁：接收相关字段只由连接线程更新，
+    落盘相关字段（observe_disk / observe_latency）只由该连接的写线程更新
+    连接关闭后由 IngestMetrics 并入同一机器人的历史累计，计数保持单调
+    """
+
+    def __init__(self, peer):
+        self.peer = peer
+        self.bytes = 0
+        self.lines = 0
+        self.parse_errors = 0
+        self.disk_writes = 0
+        self.disk_seconds = 0.0
+        self.recv_backlog = 0
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)   # 最后一格是 +Inf
+        self.latency_sum = 0.0
+        # 定频采样（带序号的行）
+        self.seq_samples = 0
+        self.seq_dropped = 0
+        self.seq_resets = 0
+        self.jitter_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.jitter_sum = 0.0
+        self.seq_period = None      # 本轮实际采样周期（秒），(seq, 到达时刻) 最小二乘拟合的斜率
+        self._last_seq = None
+        self._offset0 = None        # 本轮 (到达时刻 - 拟合直线) 的最小值，作为抖动的零点
+        self._run_start = None      # 本轮第一次 recv 的 (最后一行 seq, 到达时刻, t_ms)，拟合的原点
+        self._fit = None            # 本轮拟合的累加量 [点数, Σx, Σy, Σxx, Σxy]
+
+    def on_recv(self, nbytes, sock=None):
+        """每次 recv 后调用，返回 recv 时刻，落盘后交给 observe_latency"""
+        self.bytes += nbytes
+        if sock is not None:
+            self.recv_backlog = recv_backlog(sock)
+        return time.perf_counter()
+
+    def on_parsed(self, parser):
+        """ChunkParser 自带累计行数 / 坏行数，直接同步过来"""
+        self.lines = parser.rows
+        self.parse_errors = parser.bad_rows
+
+    def on_lines(self, n, bad=0):
+        """不经过 ChunkParser 的服务（只按行计数）"""
+        self.lines += n
+        self.parse_errors += bad
+
+    def on_sequence(self, seq, t_ms, t_recv):
+        """
+        定频采样的一批行：seq / t_ms 为两列数组，t_recv 为这批数据的 recv 时刻
+        - seq 跳号计入丢失样本，seq 不增反降说明 PP 开始了新一轮采集
+        - 本轮每次 recv 的 (最后一行 seq, recv 时刻) 做最小二乘拟合，斜率就是实测周期
+        - 抖动 = 到达时刻相对拟合直线的偏移，减去本轮见过的最小偏移（网络和批量接收都算在内）
+        不拿 t_ms 当排程：PP 的 wait_ms 扣的是估计的单轮耗时，实际周期和名义周期差一点，
+        几千个样本下来 t_ms 就差出几百 ms，那是漂移不是抖动；t_ms 只在还测不出周期时给出名义周期
+        """
+        n = len(seq)
+        if n == 0:
+            return
+        seq = np.asarray(seq, dtype=np.int64)
+
+        prev = np.empty_like(seq)
+        prev[0] = seq[0] - 1 if self._last_seq is None else self._last_seq
+        prev[1:] = seq[:-1]
+        step = seq - prev
+        resets = np.flatnonzero(step <= 0).tolist()
+        self.seq_resets += len(resets)
+        self.seq_dropped += int((step[step > 0] - 1).sum())
+        self.seq_samples += n
+
+        bounds = [0, *resets, n]
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            if start == end:
+                continue
+            if start in resets or self._run_start is None:
+                self._offset0 = None
+                self._run_start = (int(seq[end - 1]), t_recv, float(t_ms[end - 1]))
+                self._fit = [0, 0.0, 0.0, 0.0, 0.0]
+                self.seq_period = None
+            first_seq, first_recv, first_t_ms = self._run_start
+            x = seq[start:end] - first_seq
+            # 先用这批之前的拟合算偏移，免得这批自己把直线拉过去
+            line = self._line()
+            if line is None:
+                # 本轮还不到两次 recv，测不出周期，先按 t_ms 的名义排程
+                expected = (np.asarray(t_ms[start:end], dtype=np.float64) - first_t_ms) / 1000
+            else:
+                expected = line[0] + x * line[1]
+            run = (t_recv - first_recv) - expected
+            low = float(run.min())
+            if self._offset0 is None or low < self._offset0:
+                self._offset0 = low
+            jitter = run - self._offset0
+            counts = np.bincount(np.searchsorted(LATENCY_BUCKETS, jitter), minlength=len(self.jitter_counts))
+            for i, c in enumerate(counts.tolist()):
+                self.jitter_counts[i] += c
+            self.jitter_sum += float(jitter.sum())
+
+            # recv 时刻只属于这批的最后一行，每次 recv 给拟合一个点
+            xi, yi = float(x[-1]), t_recv - first_recv
+            fit = self._fit
+            fit[0] += 1
+            fit[1] += xi
+            fit[2] += yi
+            fit[3] += xi * xi
+            fit[4] += xi * yi
+            line = self._line()
+            if line is not None:
+                self.seq_period = line[1]
+
+        self._last_seq = int(seq[-1])
+
+    def _line(self):
+        """本轮拟合的 (截距, 斜率)，点数不够时为 None"""
+        n, sx, sy, sxx, sxy = self._fit
+        det = n * sxx - sx * sx
+        if n < 2 or det <= 0:
+            return None
+        slope = (n * sxy - sx * sy) / det
+        return (sy - slope * sx) / n, slope
+
+    def observe_disk(self, seconds):
+        self.disk_writes += 1
+        self.disk_seconds += seconds
+
+    def observe_latency(self, t_recv):
+        seconds = time.perf_counter() - t_recv
+        self.latency_counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.latency_sum += seconds
+
+    def merge(self, other):
+        self.bytes += other.bytes
+        self.lines += other.lines
+        self.parse_errors += other.parse_errors
+        self.disk_writes += other.disk_writes
+        self.disk_seconds += other.disk_seconds
+        self.latency_sum += other.latency_sum
+        for i, n in enumerate(other.latency_counts):
+            self.latency_counts[i] += n
+        self.seq_samples += other.seq_samples
+        self.seq_dropped += other.seq_dropped
+        self.seq_resets += other.seq_resets
+        self.jitter_sum += other.jitter_sum
+        for i, n in enumerate(other.jitter_counts):
+            self.jitter_counts[i] += n
+        if other.seq_period is not None:
+            self.seq_period = other.seq_period
+
+
+# ================== 服务级汇总 ==================
+class IngestMetrics:
+    """一个采集服务的全部连接，按机器人（对端 IP）聚合输出"""
+
+    def __init__(self, service):
+        self.service = service
+        self._active = []
+        self._retired = {}
+        self._lock = threading.Lock()
+        self._last = {}
+        self._last_time = time.monotonic()
+        self._sinks = []
+        self._retired_sinks = {}
+        self._last_dropped = {}
+
+    def open(self, peer):
+        conn = ConnectionMetrics(peer)
+        with self._lock:
+            self._active.append(conn)
+        return conn
+
+    def close(self, conn):
+        with self._lock:
+            self._active.remove(conn)
+            total = self._retired.setdefault(conn.peer, ConnectionMetrics(conn.peer))
+            total.merge(conn)
+
+    def add_sink(self, sink):
+        """DiskSink 的队列深度、高水位、丢弃数一起输出"""
+        with self._lock:
+            self._sinks.append(sink)
+
+    def remove_sink(self, sink):
+        """sink 关闭后按名字并入累计，计数保持单调"""
+        with self._lock:
+            self._sinks.remove(sink)
+            total = self._retired_sinks.setdefault(sink.name, dict.fromkeys(SINK_COUNTERS, 0))
+            stats = sink.stats()
+            for key in SINK_COUNTERS:
+                total[key] += stats[key]
+            total["high_water"] = max(total["high_water"], stats["high_water"])
+
+    def sink_snapshot(self):
+        """{name: stats}，同名的活动 sink 与历史累计相加"""
+        with self._lock:
+            result = {name: dict(total, queued=0) for name, total in self._retired_sinks.items()}
+            sinks = list(self._sinks)
+        for sink in sinks:
+            stats = sink.stats()
+            entry = result.setdefault(sink.name, dict(dict.fromkeys(SINK_COUNTERS, 0), queued=0))
+            for key in SINK_COUNTERS:
+                entry[key] += stats[key]
+            entry["queued"] += stats["queued"]
+            entry["high_water"] = max(entry["high_water"], stats["high_water"])
+        return result
+
+    def snapshot(self):
+        """{peer: (累计 ConnectionMetrics, 活动连接数, 接收积压字节)}"""
+        with self._lock:
+            active = list(self._active)
+            result = {}
+            for peer, retired in self._retired.items():
+                total = ConnectionMetrics(peer)
+                total.merge(retired)
+                result[peer] = [total, 0, 0]
+        for conn in active:
+            entry = result.setdefault(conn.peer, [ConnectionMetrics(conn.peer), 0, 0])
+            entry[0].merge(conn)
+            entry[1] += 1
+            entry[2] += conn.recv_backlog
+        return result
+
+    def render(self):
+        """Prometheus 文本格式"""
+        snap = self.snapshot()
+        out = []
+
+        def family(name, kind, help_text, value_of):
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            for peer, entry in snap.items():
+                out.append(f'{name}{{service="{self.service}",peer="{peer}"}} {value_of(*entry)}')
+
+        family("ingest_bytes_total", "counter", "Bytes received.", lambda m, a, b: m.bytes)
+        family("ingest_lines_total", "counter", "Telemetry lines parsed.", lambda m, a, b: m.lines)
+        family("ingest_parse_errors_total", "counter", "Malformed lines dropped.", lambda m, a, b: m.parse_errors)
+        family("ingest_disk_writes_total", "counter", "Disk write calls.", lambda m, a, b: m.disk_writes)
+        family("ingest_disk_write_seconds_total", "counter", "Time spent in disk writes.",
+               lambda m, a, b: f"{m.disk_seconds:.6f}")
+        family("ingest_connections", "gauge", "Open connections.", lambda m, a, b: a)
+        family("ingest_recv_backlog_bytes", "gauge", "Unread bytes in the kernel receive buffer.",
+               lambda m, a, b: b)
+
+        name = "ingest_recv_to_disk_seconds"
+        out.append(f"# HELP {name} Latency from recv() to the rows being written.")
+        out.append(f"# TYPE {name} histogram")
+        for peer, (m, _, _) in snap.items():
+            labels = f'service="{self.service}",peer="{peer}"'
+            cumulative = 0
+            for le, n in zip(LATENCY_BUCKETS + ("+Inf",), m.latency_counts):
+                cumulative += n
+                out.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            out.append(f"{name}_sum{{{labels}}} {m.latency_sum:.6f}")
+            out.append(f"{name}_count{{{labels}}} {cumulative}")
+
+        # 定频采样：只输出发过带序号数据的机器人
+        seq_snap = {peer: entry for peer, entry in snap.items() if entry[0].seq_samples}
+        if seq_snap:
+            for metric, help_text, value_of in (
+                    ("ingest_samples_total", "Sequenced samples received.", lambda m: m.seq_samples),
+                    ("ingest_samples_dropped_total", "Samples missing from the sequence.", lambda m: m.seq_dropped),
+                    ("ingest_sequence_resets_total", "Sampling runs restarted by the PP.", lambda m: m.seq_resets)):
+                out.append(f"# HELP {metric} {help_text}")
+                out.append(f"# TYPE {metric} counter")
+                for peer, (m, _, _) in seq_snap.items():
+                    out.append(f'{metric}{{service="{self.service}",peer="{peer}"}} {value_of(m)}')
+            name = "ingest_sample_period_seconds"
+            out.append(f"# HELP {name} Measured sampling period of the current run.")
+            out.append(f"# TYPE {name} gauge")
+            for peer, (m, _, _) in seq_snap.items():
+                if m.seq_period is not None:
+                    out.append(f'{name}{{service="{self.service}",peer="{peer}"}} {m.seq_period:.6f}')
+            name = "ingest_sample_jitter_seconds"
+            out.append(f"# HELP {name} Arrival time of each sample relative to the measured sampling period.")
+            out.append(f"# TYPE {name} histogram")
+            for peer, (m, _, _) in seq_snap.items():
+                labels = f'service="{self.service}",peer="{peer}"'
+                cumulative = 0
+                for le, n in zip(LATENCY_BUCKETS + ("+Inf",), m.jitter_counts):
+                    cumulative += n
+                    out.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+                out.append(f"{name}_sum{{{labels}}} {m.jitter_sum:.6f}")
+                out.append(f"{name}_count{{{labels}}} {cumulative}")
+
+        sinks = self.sink_snapshot()
+        for name, kind, key, help_text in SINK_FAMILIES:
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            for sink, stats in sinks.items():
+                out.append(f'{name}{{service="{self.service}",sink="{sink}"}} {stats[key]:g}')
+        return "\n".join(out) + "\n"
+
+    def summary_lines(self):
+        """距离上次调用的速率，每个机器人一行；没有活动的机器人不输出"""
+        now = time.monotonic()
+        dt = max(now - self._last_time, 1e-6)
+        snap = self.snapshot()
+        lines = []
+        for peer, (m, active, backlog) in snap.items():
+            prev = self._last.get(peer)
+            d_bytes = m.bytes - (prev.bytes if prev else 0)
+            d_lines = m.lines - (prev.lines if prev else 0)
+            if not active and d_bytes == 0:
+                continue
+            d_err = m.parse_errors - (prev.parse_errors if prev else 0)
+            d_disk = m.disk_seconds - (prev.disk_seconds if prev else 0.0)
+            counts = [n - (prev.latency_counts[i] if prev else 0) for i, n in enumerate(m.latency_counts)]
+            line = (f"[STAT] {self.service} {peer} conn={active} {d_bytes / dt / 1024:.1f} KB/s "
+                    f"{d_lines / dt:.0f} lines/s err={d_err} backlog={backlog}B "
+                    f"disk={d_disk / dt:.1%} p50<={_bucket_quantile(counts, 0.5)} "
+                    f"p99<={_bucket_quantile(counts, 0.99)}")
+            if m.seq_samples:
+                d_drop = m.seq_dropped - (prev.seq_dropped if prev else 0)
+                jitter = [n - (prev.jitter_counts[i] if prev else 0) for i, n in enumerate(m.jitter_counts)]
+                period = f"{m.seq_period * 1000:.2f}ms" if m.seq_period is not None else "n/a"
+                line += (f" drop={d_drop} period={period} "
+                         f"jitter p50<={_bucket_quantile(jitter, 0.5)} p99<={_bucket_quantile(jitter, 0.99)}")
+            lines.append(line)
+        self._last = {peer: entry[0] for peer, entry in snap.items()}
+        self._last_time = now
+
+        for sink, stats in self.sink_snapshot().items():
+            d_dropped = stats["dropped"] - self._last_dropped.get(sink, 0)
+            self._last_dropped[sink] = stats["dropped"]
+            if stats["queued"] or d_dropped:
+                lines.append(f"[STAT] {self.service} sink {sink} queued={stats['queued']} "
+                             f"high_water={stats['high_water']} dropped={d_dropped}")
+        return lines
+
+
+SINK_COUNTERS = ("high_water", "dropped", "written", "errors", "write_seconds", "fsyncs")
+SINK_FAMILIES = (
+    ("ingest_sink_queue_samples", "gauge", "queued", "Samples waiting for the disk writer."),
+    ("ingest_sink_queue_high_water", "gauge", "high_water", "Highest queue depth seen."),
+    ("ingest_sink_dropped_samples_total", "counter", "dropped", "Samples dropped because the queue was full."),
+    ("ingest_sink_written_samples_total", "counter", "written", "Samples written by the disk writer."),
+    ("ingest_sink_write_errors_total", "counter", "errors", "Failed batch writes."),
+    ("ingest_sink_write_seconds_total", "counter", "write_seconds", "Time the writer spent writing and syncing."),
+    ("ingest_sink_fsyncs_total", "counter", "fsyncs", "fsync calls."),
+)
+
+
+def _bucket_quantile(counts, q):
+    """直方图只能给出分位数所在桶的上界"""
+    total = sum(counts)
+    if total == 0:
+        return "n/a"
+    target = q * total
+    cumulative = 0
+    for le, n in zip(LATENCY_BUCKETS, counts):
+        cumulative += n
+        if cumulative >= target:
+            return f"{le * 1000:g}ms"
+    return f">{LATENCY_BUCKETS[-1]:g}s"
+
+
+# ================== 输出 ==================
+class _MetricsHandler(BaseHTTPRequestHandler):
+    metrics = None
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.metrics.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_metrics_server(metrics, host, port):
+    """后台线程启动 http://<host>:<port>/metrics 供 Prometheus 抓取"""
+    handler = type("MetricsHandler", (_MetricsHandler,), {"metrics": metrics})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"[INFO] Metrics on http://{host}:{port}/metrics")
+    return server
+
+
+def start_summary_log(metrics, interval=SUMMARY_INTERVAL_S):
+    """每 interval 秒打印一行汇总，替代逐条打印"""
+    def loop():
+        while True:
+            time.sleep(interval)
+            for line in metrics.summary_lines():
+                print(line)
+    threading.Thread(target=loop, daemon=True).start()
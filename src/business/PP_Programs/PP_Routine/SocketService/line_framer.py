@@ -0,0 +1,111 @@
+import struct
+
+# ================== 配置 ==================
+DEFAULT_BUFFER_SIZE = 64 * 1024     # 一次 recv_into 最多读这么多
+MAX_MESSAGE_SIZE = 4 * 1024 * 1024  # 单行 / 单帧上限，超过说明对端协议错了
+
+_NL = ord("\n")
+
+
+class FrameTooLarge(ValueError):
+    pass
+
+
+class LineFramer:
+    """
+    recv_into 到预分配的 bytearray，按换行（或长度前缀）切出完整消息
+    - 消息以 memoryview 返回，不复制；下一次 fill() 之后旧的 view 失效
+    - 只有未消费的半条消息会在 fill() 时挪到缓冲区开头
+    - 缓冲区装不下一条消息时换一块翻倍的缓冲区，上限 max_size
+    socket 的超时 / 断开按原样抛给调用方（socket.timeout / fill() 返回 0）
+    """
+
+    def __init__(self, sock, buffer_size=DEFAULT_BUFFER_SIZE, max_size=MAX_MESSAGE_SIZE):
+        self.sock = sock
+        self.max_size = max_size
+        self._buf = bytearray(buffer_size)
+        self._view = memoryview(self._buf)
+        self._start = 0     # 未消费数据起点
+        self._end = 0       # 已接收数据终点
+        self._need = 0      # 长度前缀模式下，当前半帧需要的总字节数
+
+    @property
+    def pending(self):
+        """还没凑成完整消息的字节数"""
+        return self._end - self._start
+
+    def fill(self):
+        """接收一次，返回本次收到的字节数，0 表示对端关闭"""
+        if self._start == self._end:
+            self._start = self._end = 0
+        if self._end == len(self._buf) or self._start + self._need > len(self._buf):
+            self._make_room(max(self._need, self._end - self._start + 1))
+        n = self.sock.recv_into(self._view[self._end:])
+        self._end += n
+        return n
+
+    def _make_room(self, size):
+        """把半条消息挪到开头；还装不下 size 字节就换一块更大的缓冲区"""
+        pending = self._end - self._start
+        if size > len(self._buf):
+            new_size = len(self._buf)
+            while new_size < size:
+                new_size *= 2
+            if new_size > self.max_size * 2:
+                raise FrameTooLarge(f"message exceeds {self.max_size} bytes")
+            buf = bytearray(new_size)
+            buf[:pending] = self._view[self._start:self._end]
+            self._buf, self._view = buf, memoryview(buf)
+        else:
+            self._buf[:pending] = self._view[self._start:self._end]
+        self._start, self._end = 0, pending
+
+    def peek(self):
+        """还没凑成完整消息的那部分数据（不消费）"""
+        return self._view[self._start:self._end]
+
+    # ================== 换行分隔 ==================
+    def block(self):
+        """当前所有完整行（含结尾换行）的一个 view，给 ChunkParser 这类整块解析用"""
+        cut = self._buf.rfind(b"\n", self._start, self._end)
+        if cut < 0:
+            return self._view[0:0]
+        block = self._view[self._start:cut + 1]
+        self._start = cut + 1
+        return block
+
+    def discard_lines(self):
+        """只数不取：消费所有完整行，返回行数"""
+        cut = self._buf.rfind(b"\n", self._start, self._end)
+        if cut < 0:
+            return 0
+        count = self._buf.count(b"\n", self._start, cut + 1)
+        self._start = cut + 1
+        return count
+
+    def lines(self):
+        """逐条产出完整行（不含换行，去掉 \\r）"""
+        buf = self._buf
+        while True:
+            nl = buf.find(_NL, self._start, self._end)
+            if nl < 0:
+                return
+            start, self._start = self._start, nl + 1
+            end = nl - 1 if nl > start and buf[nl - 1] == 0x0D else nl
+            yield self._view[start:end]
+
+    # ================== 长度前缀 ==================
+    def frames(self, header=">I"):
+        """逐条产出长度前缀帧的负载，header 为 struct 格式（默认 4 字节大端）"""
+        head = struct.Struct(header)
+        while self._end - self._start >= head.size:
+            (size,) = head.unpack_from(self._buf, self._start)
+            if size > self.max_size:
+                raise FrameTooLarge(f"frame of {size} bytes exceeds {self.max_size}")
+            begin = self._start + head.size
+            if self._end - begin < size:
+                self._need = head.size + size
+                return
+            self._need = 0
+            self._start = begin + size
+            yield self._view[begin:begin + size]
@@ -0,0 +1,308 @@
+"""
+采集服务压测工具：N 个模拟 PP 客户端通过回环地址向 socket 服务推数据
+
+    # 合成 20 台机器人、每台 1kHz 的 force_z,pose_z 推给 socket_service_force
+    python load_generator.py --port 20000 --clients 20 --rate 1000 --layout 2 --duration 30
+
+    # 按原始节奏的 2 倍回放一段 socket_service_csv 录下的数据
+    python load_generator.py --replay sessions/xxx_0001.csv.gz --speed 2 --clients 4
+
+    # 通过实时流端口测端到端延迟（发送时间戳编码在最后一个字段）
+    python load_generator.py --clients 8 --rate 500 --fanout http://127.0.0.1:20080/stream?rate=200
+
+丢失按服务的 /metrics 计：本机 IP 这个 peer 的 ingest_lines_total 在压测前后的差值 vs 发出的行数，三个服务都适用
+--archive 另外按 socket_service_csv 的段索引核对落盘行数
+"""
+import argparse
+import csv
+import json
+import math
+import re
+import socket
+import threading
+import time
+import urllib.request
+from datetime import datetime
+
+from session_archive import TIME_FORMAT, open_segment, read_index
+
+HELLO = "Hi, Sunseed!\n"
+METRICS_PORT = 20090        # 采集服务默认的 /metrics 端口
+PROBE_MODULO = 1000.0       # 探针字段 = time.time() % 1000，float64 下精度约 0.1us
+
+
+# ================== 数据源 ==================
+def synth_source(layout, probe):
+    """合成按压曲线：Fz 做周期性下压，Pose_Z 跟着下降"""
+    def make_line(seq, now):
+        phase = (seq % 1000) / 1000.0
+        fz = -20.0 * max(0.0, math.sin(phase * 2 * math.pi))
+        pz = 0.300 - 0.010 * phase
+        if layout == 2:
+            values = [fz, pz]
+        else:
+            values = [0.5, 0.1, pz, 0.0, 180.0, 0.0, 0.1, -0.1, fz, 0.01, -0.01, 0.0]
+        if probe:
+            values[-1] = now % PROBE_MODULO
+        return ",".join(f"{v:.6f}" for v in values) + "\n"
+    return make_line
+
+
+def load_replay(path, columns):
+    """读取 socket_service_csv 录下的段（可以是 .gz/.zst），返回 (相对时间, 行文本)"""
+    base = path
+    for suffix in (".gz", ".zst"):
+        if base.endswith(suffix):
+            base = base[:-len(suffix)]
+    frames = []
+    with open_segment(base) as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        picks = [header.index(c) for c in columns] if columns else list(range(2, len(header)))
+        t0 = None
+        for row in reader:
+            t = datetime.strptime(row[1], TIME_FORMAT).timestamp()
+            t0 = t if t0 is None else t0
+            frames.append((t - t0, ",".join(row[i] for i in picks) + "\n"))
+    return frames
+
+
+# ================== 统计 ==================
+def percentiles(values, ps=(50, 90, 99, 99.9)):
+    if not values:
+        return {}
+    values = sorted(values)
+    return {p: values[min(len(values) - 1, int(len(values) * p / 100))] for p in ps}
+
+
+def format_ms(pcts):
+    return "  ".join(f"p{p}={v * 1000:.3f}ms" for p, v in pcts.items()) or "n/a"
+
+
+class ClientStats:
+    def __init__(self):
+        self.sent = 0
+        self.bytes = 0
+        self.send_latency = []      # 单次 sendall 阻塞时间，反映服务端背压
+        self.max_lag = 0.0          # 调度落后的最大值
+        self.local_ip = None        # 服务端看到的 peer，/metrics 按它过滤
+        self.error = None
+
+
+# ================== 模拟客户端 ==================
+def run_client(args, stop_at, stats, frames=None):
+    try:
+        sock = socket.create_connection((args.host, args.port), timeout=5)
+    except OSError as e:
+        stats.error = str(e)
+        return
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    stats.local_ip = sock.getsockname()[0]
+    sock.sendall(HELLO.encode())
+
+    make_line = synth_source(args.layout, args.probe) if frames is None else None
+    if frames is not None:
+        # 循环回放时一轮的时长 = 录制时长 + 一个平均采样间隔
+        span = frames[-1][0] * len(frames) / max(len(frames) - 1, 1)
+    t0 = time.perf_counter()
+    seq = 0
+    try:
+        while True:
+            now = time.perf_counter()
+            if now >= stop_at:
+                break
+            elapsed = now - t0
+
+            # 计算截至现在应该发出的条数，落后时一次补发（相当于 TCP 合包）
+            if frames is None:
+                due = int(elapsed * args.rate)
+            else:
+                due = seq
+                while due - seq < args.max_batch:
+                    loop, idx = divmod(due, len(frames))
+                    t_frame = (loop * span + frames[idx][0]) / args.speed if args.speed > 0 else 0.0
+                    if t_frame > elapsed:
+                        break
+                    due += 1
+            n = min(due - seq, args.max_batch)
+            if n <= 0:
+                time.sleep(args.tick)
+                continue
+
+            if frames is None:
+                wall = time.time()
+                payload = "".join(make_line(seq + i, wall) for i in range(n))
+            else:
+                payload = "".join(frames[(seq + i) % len(frames)][1] for i in range(n))
+            data = payload.encode()
+
+            t_send = time.perf_counter()
+            sock.sendall(data)
+            stats.send_latency.append(time.perf_counter() - t_send)
+            if frames is None:
+                stats.max_lag = max(stats.max_lag, elapsed - seq / args.rate)
+            seq += n
+            stats.sent += n
+            stats.bytes += len(data)
+    except OSError as e:
+        stats.error = str(e)
+    finally:
+        sock.close()
+
+
+# ================== 端到端延迟探针 ==================
+def run_probe(url, stop_at, latencies):
+    """订阅实时流，每帧最后一个字段是发送时刻 (time.time() % 1000)"""
+    try:
+        resp = urllib.request.urlopen(url, timeout=5)
+    except OSError as e:
+        print(f"[WARN] fanout probe failed: {e}")
+        return
+    for line in resp:
+        if time.perf_counter() >= stop_at:
+            break
+        if not line.startswith(b"data:"):
+            continue
+        now = time.time() % PROBE_MODULO
+        frame = json.loads(line[5:])
+        sent = [v for k, v in frame.items() if k not in ("t", "src")][-1]
+        lat = (now - sent) % PROBE_MODULO
+        if lat < PROBE_MODULO / 2:
+            latencies.append(lat)
+
+
+# ================== 服务端计数 ==================
+def scrape_metrics(url):
+    """/metrics 文本 -> {(指标名, peer): 值}；没有 peer 标签的（sink 指标）peer 为 ""，同名同 peer 的累加"""
+    with urllib.request.urlopen(url, timeout=5) as resp:
+        text = resp.read().decode()
+    values = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        series, _, value = line.rpartition(" ")
+        name, _, labels = series.partition("{")
+        peer = re.search(r'peer="([^"]*)"', labels)
+        key = (name, peer.group(1) if peer else "")
+        values[key] = values.get(key, 0.0) + float(value)
+    return values
+
+
+def counter_delta(before, after, name, peers=None):
+    """after - before，只算 peers 里的（None 为全部）"""
+    return int(sum(v - before.get(key, 0.0) for key, v in after.items()
+                   if key[0] == name and (peers is None or key[1] in peers)))
+
+
+def archived_rows(directory, since):
+    return sum(int(seg["Rows"]) for seg in read_index(directory) if seg["Start"] >= since)
+
+
+def settle(count, expected, quiet=10.0):
+    """连接断开后服务端要先消化积压（csv 还要关段写索引）：等到 count() 够了或 quiet 秒内不再变化"""
+    last, changed_at = -1, time.perf_counter()
+    while True:
+        n = count()
+        if n >= expected:
+            return n
+        if n != last:
+            last, changed_at = n, time.perf_counter()
+        elif time.perf_counter() - changed_at > quiet:
+            return n
+        time.sleep(0.5)
+
+
+# ================== 主程序 ==================
+def main():
+    parser = argparse.ArgumentParser(description="Replay or synthesize PP telemetry into a socket service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=1, help="simulated PP clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--rate", type=float, default=1000.0, help="synth samples/s per client")
+    parser.add_argument("--layout", type=int, choices=(2, 12), default=2, help="synth fields per line")
+    parser.add_argument("--replay", help="recorded session csv (.csv/.csv.gz/.csv.zst)")
+    parser.add_argument("--columns", help="replay columns, e.g. Force_Z,Pose_Z (default: all data columns)")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay time scale, 0 = as fast as possible")
+    parser.add_argument("--max-batch", type=int, default=1000, help="max lines per send when catching up")
+    parser.add_argument("--tick", type=float, default=0.0005, help="scheduler sleep (s)")
+    parser.add_argument("--probe", action="store_true", help="encode send time in the last field")
+    parser.add_argument("--fanout", help="live stream URL for end-to-end latency (implies --probe)")
+    parser.add_argument("--metrics", help=f"service /metrics URL for loss (default http://<host>:{METRICS_PORT}/metrics, "
+                                          "'none' to skip)")
+    parser.add_argument("--archive", help="socket_service_csv archive dir, rows indexed during the run count as received")
+    parser.add_argument("--settle", type=float, default=10.0,
+                        help="give up waiting for the service after this many seconds without progress")
+    args = parser.parse_args()
+    args.probe = args.probe or bool(args.fanout)
+    if args.metrics is None:
+        args.metrics = f"http://{args.host}:{METRICS_PORT}/metrics"
+    elif args.metrics.lower() == "none":
+        args.metrics = None
+
+    frames = None
+    if args.replay:
+        frames = load_replay(args.replay, args.columns.split(",") if args.columns else None)
+        print(f"[INFO] replay {len(frames)} frames spanning {frames[-1][0]:.3f}s, speed x{args.speed}")
+
+    stop_at = time.perf_counter() + args.duration
+    stats = [ClientStats() for _ in range(args.clients)]
+    threads = [threading.Thread(target=run_client, args=(args, stop_at, stats[i], frames), daemon=True)
+               for i in range(args.clients)]
+    latencies = []
+    if args.fanout:
+        threading.Thread(target=run_probe, args=(args.fanout, stop_at, latencies), daemon=True).start()
+
+    metrics_before = None
+    if args.metrics:
+        try:
+            metrics_before = scrape_metrics(args.metrics)
+        except OSError as e:
+            print(f"[WARN] {args.metrics}: {e}, loss will not be reported")
+
+    started = datetime.now().strftime(TIME_FORMAT)[:-3]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    sent = sum(s.sent for s in stats)
+    errors = [s.error for s in stats if s.error]
+    send_lat = [v for s in stats for v in s.send_latency]
+    print("=" * 60)
+    print(f"clients          : {args.clients} ({len(errors)} failed)")
+    if frames is None:
+        print(f"target           : {args.clients * args.rate:,.0f} samples/s")
+        print(f"max schedule lag : {max(s.max_lag for s in stats) * 1000:.1f} ms")
+    print(f"sustained        : {sent / elapsed:,.0f} samples/s, "
+          f"{sum(s.bytes for s in stats) / elapsed / 1e6:.2f} MB/s over {elapsed:.1f}s")
+    print(f"sendall blocking : {format_ms(percentiles(send_lat))}")
+    if args.fanout:
+        print(f"end-to-end       : {format_ms(percentiles(latencies))} ({len(latencies)} probes)")
+    if metrics_before is not None:
+        peers = {s.local_ip for s in stats if s.local_ip}
+
+        def ingested():
+            return counter_delta(metrics_before, scrape_metrics(args.metrics), "ingest_lines_total", peers)
+
+        # socket_service_main 把问候行也算进行数，多出来的不算负丢失
+        received = settle(ingested, sent, args.settle)
+        after = scrape_metrics(args.metrics)
+        lost = max(sent - received, 0)
+        print(f"not ingested     : {lost} of {sent} ({lost / max(sent, 1):.3%}), "
+              f"parse errors {counter_delta(metrics_before, after, 'ingest_parse_errors_total', peers)}")
+        sink_dropped = counter_delta(metrics_before, after, "ingest_sink_dropped_samples_total")
+        if sink_dropped:
+            print(f"sink dropped     : {sink_dropped} queued items (samples for csv, table flushes for force)")
+    if args.archive:
+        received = settle(lambda: archived_rows(args.archive, started), sent, args.settle)
+        # 服务端还在消化积压时段没关闭，这部分也算进来，说明它跟不上这个速率
+        print(f"not archived     : {sent - received} of {sent} ({(sent - received) / max(sent, 1):.3%})")
+    for e in errors[:5]:
+        print(f"[ERROR] {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+import argparse
+import csv
+import gzip
+import io
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+
+try:
+    import zstandard  # 可选依赖，没有就用 gzip
+except ImportError:
+    zstandard = None
+
+# ================== 配置 ==================
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024    # 单段超过 64MB 切段
+SEGMENT_MAX_SECONDS = 300               # 单段超过 5 分钟切段
+INDEX_FILE = "index.csv"
+INDEX_HEADER = ["Segment", "Robot", "Start", "End", "Rows"]
+OPEN_END = "~"                          # 还在写的段：End 为空，查询时当作比任何时间都晚（'~' 大于数字）
+
+# 行内时间格式，字典序即时间序，查询时直接按字符串比较
+TIME_FORMAT = "%Y-%m-%d-%H:%M:%S.%f"
+
+
+def _safe_name(text):
+    """文件名里不能出现 ':'（Windows 共享盘）"""
+    return "".join(c if c.isalnum() or c in "-_." else "-" for c in text)
+
+
+# ================== 后台压缩 ==================
+class _Compressor(threading.Thread):
+    """关闭的段交给这个线程压缩，采集线程不等待"""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.tasks = queue.Queue()
+
+    def run(self):
+        while True:
+            path, method = self.tasks.get()
+            try:
+                compress_segment(path, method)
+            except OSError as e:
+                print(f"[ERROR] compress {path}: {e}")
+            finally:
+                self.tasks.task_done()
+
+
+_compressor = None
+_compressor_lock = threading.Lock()
+
+
+def _submit_compress(path, method):
+    global _compressor
+    with _compressor_lock:
+        if _compressor is None:
+            _compressor = _Compressor()
+            _compressor.start()
+    _compressor.tasks.put((path, method))
+
+
+def wait_compress_done():
+    if _compressor is not None:
+        _compressor.tasks.join()
+
+
+def default_compression():
+    return "zstd" if zstandard is not None else "gzip"
+
+
+def compress_segment(path, method):
+    """先写临时文件再改名，中途崩溃也不会留下半个压缩包"""
+    suffix = ".zst" if method == "zstd" else ".gz"
+    target = path + suffix
+    tmp = target + ".tmp"
+    with open(path, "rb") as src:
+        if method == "zstd":
+            with open(tmp, "wb") as dst:
+                zstandard.ZstdCompressor(level=3).copy_stream(src, dst)
+        else:
+            with gzip.open(tmp, "wb", compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+    os.replace(tmp, target)
+    os.remove(path)
+
+
+def open_segment(path):
+    """
+    按实际存在的文件打开段：优先压缩包，压缩还没完成时读原始 csv
+    原始 csv 刚好在检查之后被压缩删掉时再查一次压缩包，还找不到就是段确实不在了，抛 FileNotFoundError
+    """
+    for _ in range(2):
+        if os.path.exists(path + ".zst") and zstandard is not None:
+            raw = zstandard.ZstdDecompressor().stream_reader(open(path + ".zst", "rb"))
+            return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+        if os.path.exists(path + ".gz"):
+            return gzip.open(path + ".gz", "rt", encoding="utf-8", newline="")
+        try:
+            return open(path, "r", encoding="utf-8", newline="")
+        except FileNotFoundError:
+            pass
+    raise FileNotFoundError(f"segment {path} not found (csv, .gz or .zst)")
+
+
+# ================== 分段写入 ==================
+class SessionArchive:
+    """
+    一个连接（一台机器人）的分段写入器
+    - 段大小或段时长超限就切段，关闭的段后台压缩
+    - 段写入第一批数据时往 index.csv 追加一行（End 为空，表示还在写），关闭时再追加一行完整的：
+      段名、机器人、起止时间、行数；同一段以最后一行为准，查询能覆盖到正在写的段
+    - 段大小自己按写出的字节数累计，不调用 tell()（文本文件的 tell 每次都要先刷缓冲）
+    """
+    _index_lock = threading.Lock()
+
+    def __init__(self, directory, robot, header, max_bytes=SEGMENT_MAX_BYTES,
+                 max_seconds=SEGMENT_MAX_SECONDS, compression=None):
+        self.directory = directory
+        self.robot = robot
+        self.header = header
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.compression = compression or default_compression()
+        self.segment_seq = 0
+        self._file = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _open_segment(self, now):
+        stamp = datetime.fromtimestamp(now).strftime("%Y%m%d-%H%M%S")
+        while True:
+            # 同一台机器人同一秒内重连时段名会撞上，"x" 模式保证不会两个连接写同一个文件
+            self.segment_seq += 1
+            self.segment = f"{_safe_name(self.robot)}_{stamp}_{self.segment_seq:04d}.csv"
+            self._path = os.path.join(self.directory, self.segment)
+            try:
+                self._file = open(self._path, "xb")
+                break
+            except FileExistsError:
+                continue
+        # csv 先格式化到内存，编码后写二进制文件，字节数顺便记下
+        self._buffer = io.StringIO(newline="")
+        self._writer = csv.writer(self._buffer)
+        self._bytes = 0
+        self._writer.writerow(self.header)
+        self._flush_buffer()
+        self._opened_at = now
+        self._rows = 0
+        self._first_time = None
+        self._last_time = None
+
+    def write_rows(self, rows, time_str, now=None):
+        """rows 的第二列是 time_str（TIME_FORMAT 截到毫秒）"""
+        now = time.time() if now is None else now
+        if self._file is None:
+            self._open_segment(now)
+        elif (self._bytes >= self.max_bytes
+              or now - self._opened_at >= self.max_seconds):
+            self.close_segment()
+            self._open_segment(now)
+
+        self._writer.writerows(rows)
+        self._flush_buffer()
+        self._last_time = time_str
+        self._rows += len(rows)
+        if self._first_time is None:
+            self._first_time = time_str
+            self._append_index([self.segment, self.robot, self._first_time, "", self._rows])
+
+    def _flush_buffer(self):
+        data = self._buffer.getvalue().encode("utf-8")
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._file.write(data)
+        self._bytes += len(data)
+
+    def close_segment(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        if self._rows == 0:
+            os.remove(self._path)
+            return
+        self._append_index([self.segment, self.robot, self._first_time, self._last_time, self._rows])
+        if self.compression != "none":
+            _submit_compress(self._path, self.compression)
+
+    def _append_index(self, record):
+        path = os.path.join(self.directory, INDEX_FILE)
+        with self._index_lock:
+            new_file = not os.path.exists(path)
+            with open(path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                if new_file:
+                    writer.writerow(INDEX_HEADER)
+                writer.writerow(record)
+
+    def sync(self):
+        """把当前段刷到磁盘，供写线程按 fsync 策略调用"""
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self.close_segment()
+
+
+# ================== 按时间段查询 ==================
+def read_index(directory):
+    """每段一条，同一段有多行时取最后一行；End 为空的是还在写（或写端异常退出没关上）的段"""
+    path = os.path.join(directory, INDEX_FILE)
+    if not os.path.exists(path):
+        return []
+    segments = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for seg in csv.DictReader(f):
+            segments[seg["Segment"]] = seg
+    return list(segments.values())
+
+
+def find_segments(directory, start, end, robot=None):
+    """只返回时间范围和 [start, end] 有交集的段（start/end 为 TIME_FORMAT 字符串）"""
+    return [
+        seg for seg in read_index(directory)
+        if (robot is None or seg["Robot"] == robot)
+        and seg["Start"] <= end and (seg["End"] or OPEN_END) >= start
+    ]
+
+
+def query(directory, start, end, robot=None, time_column=1):
+    """
+    逐行产出 [start, end] 内的数据行，只打开相关的段
+    正在写的段只能读到已经写出的部分，写线程按 fsync 策略调 sync()
+    """
+    for seg in find_segments(directory, start, end, robot):
+        with open_segment(os.path.join(directory, seg["Segment"])) as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if start <= row[time_column] <= end:
+                    yield row
+
+
+def _parse_time_arg(text):
+    """支持 'HH:MM[:SS]'（当天）或 'YYYY-mm-dd HH:MM[:SS]'"""
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%H:%M:%S", "%H:%M"):
+        try:
+            t = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        if fmt.startswith("%H"):
+            t = datetime.combine(datetime.now().date(), t.time())
+        return t.strftime(TIME_FORMAT)[:-3]
+    raise argparse.ArgumentTypeError(f"bad time: {text}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract a time range from archived sessions")
+    parser.add_argument("directory")
+    parser.add_argument("--start", type=_parse_time_arg, required=True)
+    parser.add_argument("--end", type=_parse_time_arg, required=True)
+    parser.add_argument("--robot", help="robot IP, e.g. 192.168.3.102")
+    parser.add_argument("-o", "--output", help="output csv, default stdout")
+    args = parser.parse_args()
+
+    segments = find_segments(args.directory, args.start, args.end, args.robot)
+    print(f"[INFO] {len(segments)} segment(s) match", file=sys.stderr)
+    if not segments:
+        return
+
+    with open_segment(os.path.join(args.directory, segments[0]["Segment"])) as f:
+        header = next(csv.reader(f))
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        writer = csv.writer(out)
+        writer.writerow(header)
+        writer.writerows(query(args.directory, args.start, args.end, args.robot))
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+采集服务 → 分析进程的共享内存环形缓冲区
+
+    # 分析进程里（采集服务已经在跑）
+    reader = RingReader("pp_csv_192-168-3-102")
+    while True:
+        seq, rows, lost = reader.read(timeout=1.0)
+        ...                          # rows 是共享内存上的 numpy 视图，不复制
+        if not reader.still_valid(seq):
+            ...                      # 处理期间被写端覆盖了（或正在覆盖），这批结果作废
+
+    # 命令行看一眼速率和丢失
+    python shm_ring.py pp_csv_192-168-3-102
+"""
+import argparse
+import sys
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+# ================== 配置 ==================
+DEFAULT_CAPACITY = 1 << 16      # 行数，12 字段约 6MB，1kHz 下约 65 秒
+MAGIC = 0x50505247              # "PPRG"
+VERSION = 2
+
+# 头部：8 个 int64 + 256 字节字段名，之后是时间列和数据区
+# WRITING_SEQ 是正在写的这批写完后的 write_seq，写之前先更新，和 WRITE_SEQ 一起构成 seqlock
+_H_MAGIC, _H_VERSION, _H_CAPACITY, _H_FIELDS, _H_WRITE_SEQ, _H_WRITING_SEQ = range(6)
+_HEADER_INTS = 8
+_NAMES_BYTES = 256
+_DATA_OFFSET = _HEADER_INTS * 8 + _NAMES_BYTES
+
+
+def ring_name(prefix, peer):
+    """共享内存名在 Linux 上就是 /dev/shm 下的文件名，IP 里的点和冒号换成 '-'"""
+    return f"{prefix}_{peer}".replace(".", "-").replace(":", "-")
+
+
+def _layout(buf, capacity, n_fields):
+    header = np.ndarray((_HEADER_INTS,), dtype=np.int64, buffer=buf)
+    times = np.ndarray((capacity,), dtype=np.float64, buffer=buf, offset=_DATA_OFFSET)
+    data = np.ndarray((capacity, n_fields), dtype=np.float64, buffer=buf,
+                      offset=_DATA_OFFSET + capacity * 8)
+    return header, times, data
+
+
+# ================== 写端 ==================
+class SampleRing:
+    """
+    单写多读的环形缓冲区，第 k 行（从 0 开始累计）放在 k % capacity
+    写端先把 writing_seq 推到这批写完后的序号，再写数据，最后更新 write_seq（seqlock）
+    读端按自己的序号追，序号小于 writing_seq - capacity 的行已经或正在被覆盖，算溢出
+    同一进程内多个连接共用一个 ring 时 publish 加锁
+    """
+
+    def __init__(self, name, fields, capacity=DEFAULT_CAPACITY):
+        self.name = name
+        self.fields = list(fields)
+        self.capacity = capacity
+        size = _DATA_OFFSET + capacity * 8 * (1 + len(self.fields))
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # 上次异常退出留下的，直接接管
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self._header, self._times, self._data = _layout(self.shm.buf, capacity, len(self.fields))
+        names = ",".join(self.fields).encode()[:_NAMES_BYTES]
+        self.shm.buf[_HEADER_INTS * 8:_HEADER_INTS * 8 + len(names)] = names
+        self._header[_H_CAPACITY] = capacity
+        self._header[_H_FIELDS] = len(self.fields)
+        self._header[_H_WRITE_SEQ] = 0
+        self._header[_H_WRITING_SEQ] = 0
+        self._header[_H_VERSION] = VERSION
+        self._header[_H_MAGIC] = MAGIC    # 最后写 magic，读端看到它才认为 ring 可用
+        self._lock = threading.Lock()
+
+    @property
+    def write_seq(self):
+        return int(self._header[_H_WRITE_SEQ])
+
+    def publish(self, rows, t=None):
+        """rows: (n, n_fields) 数组；t: 这批数据的接收时间（time.time()）"""
+        n = len(rows)
+        if n == 0:
+            return
+        t = time.time() if t is None else t
+        skip = 0
+        if n > self.capacity:
+            # 一次比整个 ring 还多：只留最后 capacity 行，序号照样按全部行数推进
+            skip = n - self.capacity
+            rows = rows[skip:]
+            n = self.capacity
+        with self._lock:
+            seq = int(self._header[_H_WRITE_SEQ])
+            # 先声明要覆盖到哪里，读端据此判断手上的行是不是正在被改
+            self._header[_H_WRITING_SEQ] = seq + skip + n
+            start = (seq + skip) % self.capacity
+            first = min(n, self.capacity - start)
+            self._data[start:start + first] = rows[:first]
+            self._times[start:start + first] = t
+            if first < n:
+                self._data[:n - first] = rows[first:]
+                self._times[:n - first] = t
+            self._header[_H_WRITE_SEQ] = seq + skip + n
+
+    def close(self, unlink=True):
+        self._header = self._times = self._data = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+_rings = {}
+_rings_lock = threading.Lock()
+
+
+def ring_for(prefix, peer, fields, capacity=DEFAULT_CAPACITY):
+    """每台机器人一个 ring，重连的连接接着写同一个"""
+    name = ring_name(prefix, peer)
+    with _rings_lock:
+        ring = _rings.get(name)
+        if ring is None:
+            ring = _rings[name] = SampleRing(name, fields, capacity)
+            print(f"[INFO] Shared-memory ring {name}: {capacity} rows x {len(fields)} fields")
+        return ring
+
+
+def close_rings():
+    with _rings_lock:
+        for ring in _rings.values():
+            ring.close()
+        _rings.clear()
+
+
+# ================== 读端 ==================
+class RingReader:
+    """
+    一个分析进程的读游标，多个进程各自独立读同一个 ring
+    start="latest" 只看新数据，"oldest" 从 ring 里最早还有效的一行开始
+    """
+
+    def __init__(self, name, start="latest"):
+        self.name = name
+        # attach 默认会登记到 resource_tracker，读进程退出时会把写端的共享内存删掉
+        if sys.version_info >= (3, 13):
+            self.shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        header = np.ndarray((_HEADER_INTS,), dtype=np.int64, buffer=self.shm.buf)
+        if header[_H_MAGIC] != MAGIC or header[_H_VERSION] != VERSION:
+            raise ValueError(f"{name} is not a sample ring (or version mismatch)")
+        self.capacity = int(header[_H_CAPACITY])
+        n_fields = int(header[_H_FIELDS])
+        names = bytes(self.shm.buf[_HEADER_INTS * 8:_DATA_OFFSET]).rstrip(b"\0").decode()
+        self.fields = names.split(",") if names else [f"f{i}" for i in range(n_fields)]
+        self._header, self._times, self._data = _layout(self.shm.buf, self.capacity, n_fields)
+
+        write_seq = self.write_seq
+        self.next_seq = write_seq if start == "latest" else max(0, self.writing_seq - self.capacity)
+        self.lost = 0           # 累计因落后太多被覆盖、没读到的行数
+
+    @property
+    def write_seq(self):
+        return int(self._header[_H_WRITE_SEQ])
+
+    @property
+    def writing_seq(self):
+        """写端正在写的那批写完后的序号，没有在写时等于 write_seq"""
+        return int(self._header[_H_WRITING_SEQ])
+
+    def read(self, max_rows=None, timeout=0.0, poll_s=0.001):
+        """
+        返回 (seq, rows, lost)：rows 第一行的序号、共享内存上的视图、本次发现的丢失行数
+        环回处只返回到缓冲区末尾的那一段，下次调用再取剩下的
+        没有新数据时等 timeout 秒，仍然没有就返回空视图
+        """
+        deadline = time.monotonic() + timeout
+        write_seq = self.write_seq
+        while write_seq == self.next_seq and time.monotonic() < deadline:
+            time.sleep(poll_s)
+            write_seq = self.write_seq
+
+        # 按 writing_seq 算：写端正在覆盖的行也不能读
+        lost = 0
+        oldest = self.writing_seq - self.capacity
+        if self.next_seq < oldest:
+            lost = oldest - self.next_seq
+            self.next_seq = oldest
+            self.lost += lost
+
+        seq = self.next_seq
+        start = seq % self.capacity
+        n = max(0, min(write_seq - seq, self.capacity - start))
+        if max_rows is not None:
+            n = min(n, max_rows)
+        self.next_seq = seq + n
+        return seq, self._data[start:start + n], lost
+
+    def times(self, seq, n):
+        """与 read() 返回的行对应的接收时间"""
+        start = seq % self.capacity
+        return self._times[start:start + n]
+
+    def still_valid(self, seq):
+        """从 seq 开始读到的行在这期间有没有被写端覆盖，包括正在覆盖（用完视图后检查）"""
+        return self.writing_seq - seq <= self.capacity
+
+    def close(self):
+        self._header = self._times = self._data = None
+        self.shm.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tail a shared-memory sample ring")
+    parser.add_argument("name", help="ring name, e.g. pp_csv_192-168-3-102")
+    parser.add_argument("--interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    reader = RingReader(args.name)
+    print(f"[INFO] {args.name}: {reader.capacity} rows, fields={','.join(reader.fields)}")
+    rows = 0
+    t0 = time.monotonic()
+    try:
+        while True:
+            seq, view, lost = reader.read(timeout=args.interval)
+            rows += len(view)
+            if len(view) and not reader.still_valid(seq):
+                print(f"[WARN] rows {seq}..{seq + len(view)} overwritten while reading")
+            now = time.monotonic()
+            if now - t0 >= args.interval:
+                last = view[-1].tolist() if len(view) else None
+                print(f"[STAT] {rows / (now - t0):,.0f} rows/s  lost={reader.lost}  seq={reader.next_seq}  last={last}")
+                rows, t0 = 0, now
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,93 +1,290 @@
+import argparse
+import asyncio
+import collections
+import inspect
+import re
 import socket  # 导入socket模块，用于网络通信
 import threading  # 导入threading模块，用于多线程处理
 from datetime import datetime
 import time
 
+# ================== 配置 ==================
+MAX_IN_FLIGHT = 32          # 每个连接最多同时处理的请求数，满了就不再读 socket（背压）
+LEGACY_FLUSH_S = 0.05       # 没有换行的消息静默这么久就当作一条完整请求（兼容旧客户端）
+READ_SIZE = 64 * 1024
+# 给 PP 的应答格式（MyPP/kv_reply.py 解码）："kv1;记录数;key;value;key;value..."，PP 端一次 split 就能按下标取
+#   值里的 \ ; , 回车 换行 写成 \b \s \c \r \n，列表元素用 , 连接
+KV_VERSION = "kv1"
+KV_ESCAPES = {"\\": "\\b", ";": "\\s", ",": "\\c", "\r": "\\r", "\n": "\\n"}
+KV_KEY = re.compile(r"[A-Za-z_][A-Za-z0-9_.]*$")
+
+
+def _kv_scalar(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    text = str(value)
+    if any(c in text for c in KV_ESCAPES):
+        text = "".join(KV_ESCAPES.get(c, c) for c in text)
+    return text
+
+
+def encode_kv(record, prefix=""):
+    """
+    dict -> PP 应答字符串（不带换行，TcpServer 发送时补）
+    嵌套 dict 展开成 a.b 形式的键，list / tuple 的元素用 , 连接，bool 写成 1 / 0，None 写成空
+    """
+    fields = []
+
+    def walk(obj, path):
+        for key, value in obj.items():
+            key = f"{path}{key}"
+            if not KV_KEY.match(key):
+                raise ValueError(f"kv key {key!r} must be an identifier (dots allowed)")
+            if isinstance(value, dict):
+                walk(value, key + ".")
+            elif isinstance(value, (list, tuple)):
+                fields.extend((key, ",".join(_kv_scalar(v) for v in value)))
+            else:
+                fields.extend((key, _kv_scalar(value)))
+
+    walk(record, prefix)
+    return ";".join([KV_VERSION, str(len(fields) // 2)] + fields)
+
+
 class TcpServer:
+    """
+    PP 客户端的请求/应答服务（asyncio）
+    - 请求以换行分隔，应答同样以换行结尾，按请求顺序返回
+    - 一个连接上可以连发多条请求（流水线），不必等上一条的应答
+    - 处理函数用 register(前缀, 函数) 注册，函数收到去掉前缀后的内容，返回应答字符串
+      协程函数会并发执行；blocking=True 的普通函数放到线程池里执行
+    """
+
+    def __init__(self, debug=False):
+        self.debug = debug      # 逐条打印收发内容
+        self._handlers = []     # [(prefix, func, blocking)]，按前缀长度降序匹配
+        self._default = lambda message: f"服务器已收到: {message}"
+        self.server = None
+        # RobotSocket 的请求，按 kv1 格式应答
+        self.register("1", lambda args: encode_kv({"name": "zhangsan"}))
+        # encode_kv({"name": "张三", "age": 30, "email": "zhangsan@example.com", "skills": ["Python", "数据分析", "机器学习"]})
+        self.register("reverse:", lambda args: args[::-1])  # 返回反转后的字符串
+
     def _get_time(self):
         t = datetime.now().timestamp()
         # t = time.time()
         return f"{time.strftime('%H:%M:%S')}.{int(t % 1 * 1000):06d}"
 
+    # ================== 处理函数注册 ==================
+    def register(self, prefix, func, blocking=False):
+        self._handlers = [h for h in self._handlers if h[0] != prefix]
+        self._handlers.append((prefix, func, blocking))
+        self._handlers.sort(key=lambda h: len(h[0]), reverse=True)
+
+    def set_default(self, func):
+        """没有前缀匹配时的处理函数，收到完整消息"""
+        self._default = func
 
     def generate_response(self, message):
         """
         根据接收到的消息生成相应的响应内容。
+        同步调用，只适用于非协程处理函数（兼容旧接口）
         """
-        # if message.lower() == '时间':
-        #     current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        #     return f"当前服务器时间是: {current_time}"
-        # if message.startswith('echo:'):
-        #     # 返回冒号后面的内容
-        #     return message[5:]
-        if message.startswith("1"):
-            json_string ='''{"name": "zhangsan"}'''
-            # json_string = '''{"name": "张三","age": 30,"email": "zhangsan@example.com","skills": ["Python", "数据分析", "机器学习"]}'''
-            return json_string
-        elif message.startswith('reverse:'):
-            # 返回反转后的字符串
-            content = message[8:]
-            return content[::-1]
+        for prefix, func, _ in self._handlers:
+            if message.startswith(prefix):
+                return func(message[len(prefix):])
+        return self._default(message)
+
+    def _dispatch(self, message):
+        """普通处理函数直接返回应答字符串；协程 / 阻塞函数返回 future"""
+        for prefix, func, blocking in self._handlers:
+            if message.startswith(prefix):
+                args = message[len(prefix):]
+                break
         else:
-            return f"服务器已收到: {message}"
+            func, blocking, args = self._default, False, message
+
+        if inspect.iscoroutinefunction(func):
+            return asyncio.ensure_future(func(args))
+        if blocking:
+            return asyncio.get_running_loop().run_in_executor(None, func, args)
+        try:
+            return str(func(args))
+        except Exception as e:
+            return self._error(e, message)
 
+    def _error(self, e, message):
+        print(f"[{self._get_time()}] 处理请求 {message!r} 出错: {e}")
+        return f"ERROR: {e}"
 
-    def handle_client(self, connection, client_address):
-        # 打印客户端连接信息
+    # ================== 连接处理 ==================
+    async def handle_client(self, reader, writer):
+        """
+        outbox 按请求顺序存放应答：已算好的字符串或还没完成的 future
+        每读到一批请求就全部分发，再把队头已完成的应答合并成一次 write
+        """
+        client_address = writer.get_extra_info("peername")
         print(f"[{self._get_time()}] 连接来自 {client_address}")
+        outbox = collections.deque()
+
+        def flush(_=None):
+            chunks = []
+            while outbox and (isinstance(outbox[0], str) or outbox[0].done()):
+                item = outbox.popleft()
+                if not isinstance(item, str):
+                    try:
+                        item = str(item.result())
+                    except Exception as e:
+                        item = self._error(e, "<async>")
+                if self.debug:
+                    print(f"[{self._get_time()}] 发送给{client_address}的数据: {item}")
+                chunks.append(item)
+            if chunks and not writer.is_closing():
+                writer.write(("\n".join(chunks) + "\n").encode("utf-8"))
+
         try:
-            while True:
-                # 接收数据
-                data = connection.recv(1024)  # 从客户端接收最多1024字节的数据
-                if data:
-                    # print(f'[{self._get_time()}] 开始接收数据')
-                    message = data.decode().strip()  # 解码并去除首尾空白字符
-                    print(f"[{self._get_time()}] 收到来自{client_address}的数据: {message}")  # 打印接收到的消息
-
-                    # 这里可以根据需要处理接收到的数据
-                    response = self.generate_response(message)
-                    # response = f"服务器已收到: {message}"  # 构建响应消息
-                    print(f"[{self._get_time()}] 发送给{client_address}的数据: {response}")  # 打印要发送的消息
-                    connection.sendall((response + '\n').encode('utf-8'))  # 将响应消息编码为UTF-8并发送给客户端
-                    # print(f'[{self._get_time()}] 发送数据完成')
-                else:
-                    print(f"[{self._get_time()}] {client_address} 断开连接")  # 打印客户端断开连接的信息
-                    break  # 退出循环
-        except Exception as e:
-            print(f"[{self._get_time()}] 与{client_address}通信时发生错误: {e}")  # 打印异常信息
+            async for messages in self._read_messages(reader):
+                for message in messages:
+                    if self.debug:
+                        print(f"[{self._get_time()}] 收到来自{client_address}的数据: {message}")
+                    if not message:
+                        continue
+                    result = self._dispatch(message)
+                    outbox.append(result)
+                    if not isinstance(result, str):
+                        result.add_done_callback(flush)
+                flush()
+                # 在途请求太多时先等队头完成，不再继续读 socket（背压）
+                while len(outbox) >= MAX_IN_FLIGHT:
+                    await asyncio.wait([outbox[0]])
+                    flush()
+                await writer.drain()
+            print(f"[{self._get_time()}] {client_address} 断开连接")
+            while outbox:
+                await asyncio.wait([outbox[0]])
+                flush()
+            await writer.drain()
+        except (ConnectionError, OSError) as e:
+            print(f"[{self._get_time()}] 与{client_address}通信时发生错误: {e}")
         finally:
-            connection.close()  # 关闭连接
+            writer.close()
 
+    async def _read_messages(self, reader):
+        """每次读到的完整行作为一批产出；末尾没有换行的半条消息静默 LEGACY_FLUSH_S 后也当作一条"""
+        buffer = b""
+        while True:
+            try:
+                if buffer:
+                    data = await asyncio.wait_for(reader.read(READ_SIZE), LEGACY_FLUSH_S)
+                else:
+                    data = await reader.read(READ_SIZE)
+            except asyncio.TimeoutError:
+                yield [buffer.decode(errors="replace").strip()]
+                buffer = b""
+                continue
+            if not data:
+                if buffer.strip():
+                    yield [buffer.decode(errors="replace").strip()]
+                return
+            buffer += data
+            if b"\n" not in data:
+                continue
+            *lines, buffer = buffer.split(b"\n")
+            yield [line.decode(errors="replace").strip() for line in lines]
 
-    def start_server(self, host='192.168.2.220', port=30000):
-        # 创建一个TCP/IP套接字
-        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        # 设置端口复用
-        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        # 绑定套接字到本地地址和端口
-        server_address = (host, port)  # 定义服务器地址和端口
-        # print(f"启动服务器在 {server_address}")  # 打印服务器启动信息
+    async def serve(self, host, port):
+        self.server = await asyncio.start_server(self.handle_client, host, port, reuse_address=True)
         print(f'[{self._get_time()}] Server started on {host}:{port}')
-        self.server_socket.bind(server_address)  # 绑定套接字到指定地址和端口
-
-        # 监听连接
-        self.server_socket.listen(5)  # 开始监听连接，允许最多5个挂起连接
-        print(f"[{self._get_time()}] 等待连接...")  # 打印等待连接信息
+        async with self.server:
+            await self.server.serve_forever()
 
+    def start_server(self, host='192.168.2.220', port=30000):
         try:
-            while True:
-                # 等待连接
-                connection, client_address = self.server_socket.accept()  # 接受客户端连接
-                # 为每个客户端连接创建一个新的线程
-                client_thread = threading.Thread(target=self.handle_client, args=(connection, client_address))  # 创建新线程处理客户端连接
-                client_thread.daemon = True  # 设置为守护线程，主线程退出时自动关闭
-                client_thread.start()  # 启动线程
+            asyncio.run(self.serve(host, port))
         except KeyboardInterrupt:
-            print(f"[{self._get_time()}] 服务器正在关闭...")  # 捕获键盘中断信号，打印服务器关闭信息
-        finally:
-            self.server_socket.close()  # 关闭服务器套接字
+            print(f"[{self._get_time()}] 服务器正在关闭...")
 
 
-if __name__ == "__main__":
+# ================== 基准测试 ==================
+def _legacy_server(host, port, ready):
+    """改造前的线程模型：每次 recv(1024) 当一条请求，一问一答（去掉打印）"""
     server = TcpServer()
-    server.start_server()  # 启动服务器
+    srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    srv.bind((host, port))
+    srv.listen(5)
+    ready.set()
+
+    def handle(connection):
+        while True:
+            data = connection.recv(1024)
+            if not data:
+                break
+            response = server.generate_response(data.decode().strip())
+            connection.sendall((response + '\n').encode('utf-8'))
+        connection.close()
+
+    while True:
+        connection, _ = srv.accept()
+        threading.Thread(target=handle, args=(connection,), daemon=True).start()
+
+
+def _pp_client(host, port, n_requests, depth, message="1"):
+    """模拟 PP 端：depth=1 就是 socket_send + socket_recv 一问一答，depth>1 为流水线"""
+    sock = socket.create_connection((host, port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    request = (message + "\n").encode()
+    latencies = []
+    sent_at = []
+    buffer = b""
+    sent = received = 0
+    t0 = time.perf_counter()
+    while received < n_requests:
+        burst = min(depth - (sent - received), n_requests - sent)
+        if burst > 0:
+            sent_at.extend([time.perf_counter()] * burst)
+            sock.sendall(request * burst)
+            sent += burst
+        buffer += sock.recv(65536)
+        n = buffer.count(b"\n")
+        if n:
+            buffer = buffer[buffer.rfind(b"\n") + 1:]
+            now = time.perf_counter()
+            latencies.extend(now - t for t in sent_at[received:received + n])
+            received += n
+    elapsed = time.perf_counter() - t0
+    sock.close()
+    return n_requests / elapsed, sorted(latencies)
+
+
+def benchmark(n_requests=20000, host="127.0.0.1", port=30100):
+    ready = threading.Event()
+    threading.Thread(target=_legacy_server, args=(host, port, ready), daemon=True).start()
+    ready.wait()
+    server = TcpServer()
+    threading.Thread(target=server.start_server, args=(host, port + 1), daemon=True).start()
+    time.sleep(0.3)
+
+    def report(name, rate, lat):
+        p = lambda q: lat[min(len(lat) - 1, int(len(lat) * q))] * 1000
+        print(f"[BENCH] {name:28s} {rate:10,.0f} req/s  p50={p(0.5):.3f}ms  p99={p(0.99):.3f}ms")
+
+    report("legacy thread, 1 in flight", *_pp_client(host, port, n_requests, 1))
+    for depth in (1, 8, 32):
+        report(f"asyncio, {depth} in flight", *_pp_client(host, port + 1, n_requests, depth))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Request/response server for PP clients")
+    parser.add_argument("--host", default='192.168.2.220')
+    parser.add_argument("--port", type=int, default=30000)
+    parser.add_argument("--debug", action="store_true", help="print every request and response")
+    parser.add_argument("--bench", action="store_true", help="run the loopback benchmark and exit")
+    args = parser.parse_args()
+    if args.bench:
+        benchmark()
+    else:
+        server = TcpServer(debug=args.debug)
+        server.start_server(args.host, args.port)  # 启动服务器
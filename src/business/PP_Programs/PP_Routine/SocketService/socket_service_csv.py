@@ -2,77 +2,114 @@ import socket
 import time
 import threading
 import argparse
+import atexit
 from datetime import datetime
 import csv
 import os
 
+from telemetry_parser import ChunkParser, LAYOUT_POSE_WRENCH
+from line_framer import LineFramer
+from telemetry_fanout import TelemetryHub, start_fanout_server
+from session_archive import SessionArchive, TIME_FORMAT
+from ingest_metrics import IngestMetrics, start_metrics_server, start_summary_log
+from disk_sink import DiskSink, FSYNC_INTERVAL
+from shm_ring import ring_for, close_rings
 
-def FileName():  # Data sheet file name
-    # fileName = str(datetime.now().year)+"-"+datetime.now().month+"-"+datetime.now().day+"-"+datetime.now().hour+"-"+datetime.now().minute+".csv"
-    fileName = datetime.now().strftime("%Y-%m-%d-%H:%M:%S") + ".csv"
-    return fileName
+ARCHIVE_DIR = "sessions"  # rolling segments + index.csv, see session_archive.py
+FANOUT_PORT = 20080  # live stream (SSE) port, None to disable
+METRICS_PORT = 20090  # Prometheus /metrics port, None to disable
+DEBUG = False  # print every received row (--debug)
+SINK_MAX_SAMPLES = 200_000  # rows buffered between recv and disk, dropped (and reported) beyond that
+SINK_ON_FULL = "drop"  # or "block": stall recv instead of dropping
+FSYNC_POLICY = FSYNC_INTERVAL  # none / batch / interval, see disk_sink.py
+SHM_PREFIX = "pp_csv"  # shared-memory ring per robot for analysis processes (shm_ring.py), None to disable
 
+HEADER = ["Index", "Time", "Pose_X", "Pose_Y", "Pose_Z", "Pose_Rx", "Pose_Ry", "Pose_Rz", "Force_X", "Force_Y",
+          "Force_Z", "Force_Mx", "Force_My", "Force_Mz"]
+hub = TelemetryHub(HEADER[2:])
+metrics = IngestMetrics("csv")
 
-fileName = FileName()
 
+def Write2CSVRows(archive, rows, start_index, stamp):  # write a parsed (n, 12) block at once
+    archive.write_rows(
+        [[start_index + i, stamp] + row for i, row in enumerate(rows.tolist())], stamp)
 
-def Writer2CVSHeader(fileName):  # Creat sheet header
-    with open(fileName, 'a+', newline='') as csvfile:
-        dataWriter = csv.writer(csvfile, delimiter=',')
-        dataWriter.writerow(
-            ["Index", "Time", "Pose_X", "Pose_Y", "Pose_Z", "Pose_Rx", "Pose_Ry", "Pose_Rz", "Force_X", "Force_Y",
-             "Force_Z", "Force_Mx", "Force_My", "Force_Mz"])
 
-
-def Write2CSV(fileName, value1, value3):  # creat csv file
-    if os.path.exists(fileName):  # Writer data
-        with open(fileName, 'a+', newline='') as csvfile:
-            dataWriter = csv.writer(csvfile, delimiter=',')
-            dataWriter.writerow(
-                [value3, datetime.now().strftime("%Y-%m-%d-%H:%M:%S.%f")[:-3], value1[0], value1[1], value1[2],
-                 value1[3], value1[4], value1[5], value1[-6], value1[-5], value1[-4], value1[-3], value1[-2],
-                 value1[-1]])
+def make_writer(archive, conn):
+    """runs on the sink's writer thread: items are (rows, start_index, stamp, t_recv)"""
+    def write_batch(items):
+        t0 = time.perf_counter()
+        for rows, start_index, stamp, _ in items:
+            Write2CSVRows(archive, rows, start_index, stamp)
+        conn.observe_disk(time.perf_counter() - t0)
+        for item in items:
+            conn.observe_latency(item[3])
+    return write_batch
 
 
 def tcplick(sock, addr):
     print('Accepting %s:%s' % addr)
-    print("nnFile Name is :", fileName)
+    archive = SessionArchive(ARCHIVE_DIR, addr[0], HEADER)
+    print("Archive folder is :", os.path.abspath(ARCHIVE_DIR))
     print("Collecting data ...... press ctrl+c to stop")
-    index = 0
-    elements = []
-    while True:
-        data = sock.recv(1024)
-        decoded_data = data.decode('utf_8')
-        # print(decoded_data)
-        lines = decoded_data.splitlines()
-        for line in lines:
-            if index == 0:
-                print(index, line)
-                index = index + 1
-                continue  # discard Hi Flexiv
-            else:
-                elements = line.split(",")
-                print(elements)
-                # print(index)
-                Write2CSV(fileName, elements, index)
-                index = index + 1
-
-        if not data or decoded_data == 'exit':
+    index = 1
+    parser = ChunkParser(LAYOUT_POSE_WRENCH, skip_lines=1)  # discard Hi Flexiv
+    framer = LineFramer(sock)
+    conn = metrics.open(addr[0])
+    sink = DiskSink("csv-%s" % addr[0], make_writer(archive, conn), sync=archive.sync,
+                    max_samples=SINK_MAX_SAMPLES, on_full=SINK_ON_FULL, fsync=FSYNC_POLICY)
+    metrics.add_sink(sink)
+    ring = ring_for(SHM_PREFIX, addr[0], HEADER[2:]) if SHM_PREFIX else None
+    stop = False
+    while not stop:
+        n = framer.fill()
+        if not n:
             break
 
+        t_recv = conn.on_recv(n, sock)
+        block = bytes(framer.block())
+        # 'exit' 可能单独成行，也可能跟在最后一批数据后面、还没有换行
+        if block[-8:].strip().endswith(b'exit'):
+            block, stop = block[:block.rstrip().rfind(b'exit')], True
+        elif bytes(framer.peek()).strip() == b'exit':
+            stop = True
+        rows = parser.feed_block(block)
+        conn.on_parsed(parser)
+        if len(rows):
+            if DEBUG:
+                print(addr[0], rows.tolist())
+            hub.publish(rows, addr[0])
+            if ring is not None:
+                ring.publish(rows)
+            stamp = datetime.now().strftime(TIME_FORMAT)[:-3]
+            sink.put((rows, index, stamp, t_recv), len(rows))
+            index = index + len(rows)
+
     sock.close()
+    sink.close()  # drain the queue before the last segment is closed
+    archive.close()
+    metrics.remove_sink(sink)
+    metrics.close(conn)
     print('Close Connection %s:%s' % addr)
+    print("rows: %d, bad rows: %d, dropped: %d, queue high water: %d"
+          % (parser.rows, parser.bad_rows, sink.dropped, sink.high_water))
 
 
 if __name__ == "__main__":
-    if os.path.exists(fileName) == False:  # Writer sheet header
-        Writer2CVSHeader(fileName)
-    else:
-        print("Can't creat csv file...")
+    args = argparse.ArgumentParser(description="Pose/wrench ingest server")
+    args.add_argument("--debug", action="store_true", help="print every received row")
+    DEBUG = args.parse_args().debug
+
+    atexit.register(close_rings)
     server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     server.bind(('192.168.3.220', 20000))
     server.listen(5)
     print('Wait for connection...')
+    if FANOUT_PORT:
+        start_fanout_server(hub, '192.168.3.220', FANOUT_PORT)
+    if METRICS_PORT:
+        start_metrics_server(metrics, '192.168.3.220', METRICS_PORT)
+    start_summary_log(metrics)
     while True:
         sock, addr = server.accept()
         new_thread = threading.Thread(target=tcplick, args=(sock, addr))
@@ -1,3 +1,5 @@
+import argparse
+import atexit
 import socket
 import threading
 import csv
@@ -5,26 +7,45 @@ import os
 from datetime import datetime
 import time
 
+from telemetry_parser import ChunkParser, LAYOUT_FORCE_POSE, LAYOUT_SEQ_FORCE_POSE
+from line_framer import LineFramer
+from force_features import GroupFeatures, append_summary
+from telemetry_fanout import TelemetryHub, start_fanout_server
+from ingest_metrics import IngestMetrics, start_metrics_server, start_summary_log
+from disk_sink import DiskSink
+from shm_ring import ring_for, close_rings
+
 # ================== 配置 ==================
 HOST = "192.168.3.220"
 PORT = 20000
 
 GROUP_GAP_MS = 500          # 超过 500ms → 新组
+# 尽快发送模式（不带 seq,t_ms）的采样周期（秒），特征按 采样序号 * 周期 积分；
+# None 时按到达时刻积分，同一次 recv 的行几乎同时到达，冲量 / 时长只是估计，汇总里 Time_Base 记为 arrival
+FREE_RUN_PERIOD_S = None
 CSV_FLUSH_INTERVAL = 20     # 每 N 条写一次 CSV
+SINK_MAX_ITEMS = 10000      # 待写队列上限（刷新请求 + 汇总行），满了丢弃并告警
+FANOUT_PORT = 20080         # 实时曲线 SSE 端口，None 关闭
+METRICS_PORT = 20090        # Prometheus /metrics 端口，None 关闭
+SHM_PREFIX = "pp_force"     # 每台机器人一个共享内存环形缓冲区给分析进程读（shm_ring.py），None 关闭
+DEBUG = False               # 逐条打印收到的数据（--debug），高频下打印本身就是瓶颈
 
 # ================== 文件名 ==================
 def make_filename():
     return datetime.now().strftime("%Y-%m-%d-%H-%M-%S") + ".csv"
 
 file_name = make_filename()
+summary_file_name = file_name[:-4] + "_summary.csv"   # 每组一行特征汇总
 
 # ================== 全局数据 ==================
 groups = []
 current_group = None
 lock = threading.Lock()
+hub = TelemetryHub(["force_z", "pose_z"])
+metrics = IngestMetrics("force")
 
 # ================== 新建一组 ==================
-def start_new_group(reason=""):
+def start_new_group(reason="", time_base="arrival"):
     group_id = len(groups) + 1
     group = {
         "index": group_id,
@@ -32,33 +53,54 @@ def start_new_group(reason=""):
         "force_z": [],
         "pose_z": [],      # 新增 pose_z
         "counter": 0,
-        "last_ts": None
+        "last_ts": None,
+        "features": GroupFeatures(group_id, time_base=time_base)
     }
     groups.append(group)
     print(f"[INFO] >>> Start Group {group_id} {reason}")
     return group
 
+# ================== 关闭当前组 ==================
+def close_current_group(reason=""):
+    """组结束时立即输出特征汇总（峰值 Fz、接触高度、冲量、时长）"""
+    global current_group
+
+    if current_group is None:
+        return
+    record = current_group["features"].summary()
+    current_group = None
+
+    print(f"[INFO] <<< Close Group {record['Group']} {reason} "
+          f"samples={record['Samples']} peak_fz={record['Peak_Fz']} "
+          f"contact_z={record['Contact_PoseZ']} impulse={record['Impulse_Ns']} "
+          f"duration={record['Duration_s']}s")
+    sink.put(("summary", record))
+
 # ================== CSV 写入 ==================
-def flush_groups_to_csv(filename):
-    if not groups:
+def snapshot_groups():
+    """锁内调用：各组的列表只追加不修改，记下当前长度就够了，不用复制数据"""
+    return [(g, len(g["force_z"])) for g in groups]
+
+def flush_groups_to_csv(filename, snapshot):
+    if not snapshot:
         return
 
-    max_rows = max(len(g["force_z"]) for g in groups)
+    max_rows = max(n for _, n in snapshot)
 
     with open(filename, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
 
         # 写表头
         header = []
-        for g in groups:
+        for g, _ in snapshot:
             header += [f"第{g['index']}组", "时间", "Force_Z", "Pose_Z"]
         writer.writerow(header)
 
         # 写每行数据
         for i in range(max_rows):
             row = []
-            for g in groups:
-                if i < len(g["force_z"]):
+            for g, n in snapshot:
+                if i < n:
                     row += [
                         g["index"],
                         g["time"][i],
@@ -69,94 +111,186 @@ def flush_groups_to_csv(filename):
                     row += ["", "", "", ""]
             writer.writerow(row)
 
-# ================== 行解析 ==================
-# 假设每行数据是 "force_z,pose_z"
-def parse_line(line):
-    parts = line.split(",")
-    if len(parts) < 2:
-        return None, None
-    try:
-        force_z = float(parts[0])
-        pose_z = float(parts[1])
-        return force_z, pose_z
-    except ValueError:
-        return None, None
-
 # ================== 数据处理 ==================
-def process_data(force_z, pose_z):
+def process_data(force_z, pose_z, restart=False, sample_ts=None):
+    """
+    返回 True 表示到了刷新 CSV 的时候；restart 表示 PP 新一轮采集的第一条（seq 为 0）
+    sample_ts 是定频模式的采样时刻 t_ms / 1000，特征按它积分；分组仍按到达时刻的间隔
+    """
     global current_group
 
     now_ts = time.perf_counter()
+    if sample_ts is not None:
+        time_base = "t_ms"
+    elif FREE_RUN_PERIOD_S:
+        time_base = "period"
+    else:
+        time_base = "arrival"
 
     # 条件 1：第一条数据
     if current_group is None:
-        current_group = start_new_group("[first data]")
+        current_group = start_new_group("[first data]" if not groups else "[after close]", time_base)
+
+    # 条件 1.5：定频模式下 seq 从 0 重新开始
+    elif restart and current_group["counter"] > 0:
+        close_current_group("[seq reset]")
+        current_group = start_new_group("[seq reset]", time_base)
 
     # 条件 2：时间间隔触发新组
     elif current_group["last_ts"] is not None:
         gap_ms = (now_ts - current_group["last_ts"]) * 1000
         if gap_ms > GROUP_GAP_MS:
-            current_group = start_new_group(f"[gap {gap_ms:.2f} ms]")
+            close_current_group(f"[gap {gap_ms:.2f} ms]")
+            current_group = start_new_group(f"[gap {gap_ms:.2f} ms]", time_base)
+
+    if time_base == "period":
+        sample_ts = current_group["counter"] * FREE_RUN_PERIOD_S
+    elif time_base == "arrival":
+        sample_ts = now_ts
 
     # 写入当前组
-    current_group["time"].append(datetime.now().strftime("%H:%M:%S.%f")[:-3])
+    time_str = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+    current_group["time"].append(time_str)
     current_group["force_z"].append(force_z)
     current_group["pose_z"].append(pose_z)
     current_group["last_ts"] = now_ts
     current_group["counter"] += 1
+    current_group["features"].update(sample_ts, force_z, pose_z, time_str)
+
+    return current_group["counter"] % CSV_FLUSH_INTERVAL == 0
+
+# ================== 写线程 ==================
+def write_files(items):
+    """
+    在 sink 的写线程里执行，接收线程不再碰磁盘
+    items: ("summary", record) 追加汇总行；("flush", conn, t_recv) 重写宽表，一批里只写一次
+    """
+    flushes = []
+    for item in items:
+        if item[0] == "summary":
+            append_summary(summary_file_name, item[1])
+        else:
+            flushes.append(item)
+    if not flushes:
+        return
 
-    if current_group["counter"] % CSV_FLUSH_INTERVAL == 0:
-        flush_groups_to_csv(file_name)
+    t0 = time.perf_counter()
+    with lock:
+        snapshot = snapshot_groups()
+    flush_groups_to_csv(file_name, snapshot)
+    elapsed = time.perf_counter() - t0
+    for _, conn, t_recv in flushes:
+        if conn is not None:
+            conn.observe_disk(elapsed / len(flushes))
+            conn.observe_latency(t_recv)
+
+sink = DiskSink("force", write_files, max_samples=SINK_MAX_ITEMS)
+
+# ================== 间隔检测 ==================
+def check_group_gap():
+    """recv 超时时调用：当前组已经静默超过 GROUP_GAP_MS 就立即关闭，不等下一条数据"""
+    if current_group is None or current_group["last_ts"] is None:
+        return
+    gap_ms = (time.perf_counter() - current_group["last_ts"]) * 1000
+    if gap_ms > GROUP_GAP_MS:
+        close_current_group(f"[gap {gap_ms:.2f} ms]")
+        sink.put(("flush", None, None))
+
+# ================== 问候行 ==================
+def read_hello(framer):
+    """
+    PP 连上后先发一行问候，定频模式在后面带上字段名（"Hi, Sunseed! seq,t_ms,force_z,pose_z"）
+    返回问候文本，对端关闭返回 None；问候之后已经收到的数据留在 framer 里
+    """
+    while True:
+        for line in framer.lines():
+            return bytes(line).decode("utf-8", errors="ignore")
+        try:
+            if not framer.fill():
+                return None
+        except socket.timeout:
+            continue
 
 # ================== TCP 线程 ==================
 def tcp_worker(sock, addr):
-    global current_group
-
     print(f"[INFO] Connection from {addr}")
 
-    buffer = ""
-    first_line = True
+    # 每行数据是 "force_z,pose_z"；定频模式是 "seq,t_ms,force_z,pose_z"，按问候行区分
+    parser = ChunkParser(LAYOUT_FORCE_POSE, skip_lines=0)
+    framer = LineFramer(sock)
+    conn = metrics.open(addr[0])
+    ring = ring_for(SHM_PREFIX, addr[0], ["force_z", "pose_z"]) if SHM_PREFIX else None
+    sock.settimeout(GROUP_GAP_MS / 1000)
 
     try:
+        hello = read_hello(framer)
+        if hello is None:
+            return
+        sequenced = "seq" in hello
+        if sequenced:
+            parser = ChunkParser(LAYOUT_SEQ_FORCE_POSE, skip_lines=0)
+        print(f"[INFO] {addr[0]} {hello.strip()!r} -> {'sequenced' if sequenced else 'free-running'}")
+
         while True:
-            data = sock.recv(4096)
-            if not data:
+            try:
+                n = framer.fill()
+            except socket.timeout:
+                with lock:
+                    check_group_gap()
+                continue
+            if not n:
                 # 断线 → 下一条数据必然新组
                 with lock:
-                    current_group = None
-                    flush_groups_to_csv(file_name)
+                    close_current_group("[disconnect]")
+                    sink.put(("flush", None, None))
                 break
 
-            buffer += data.decode("utf-8", errors="ignore")
-
-            while "\n" in buffer:
-                line, buffer = buffer.split("\n", 1)
-                line = line.strip()
-
-                if not line:
-                    continue
-
-                if first_line:
-                    first_line = False
-                    continue  # 跳过 Hi Flexiv
-                # print(f"[RECV] Raw line: '{line}'")
-                force_z, pose_z = parse_line(line)
-                if force_z is None or pose_z is None:
-                    continue
-
-                with lock:
-                    process_data(force_z, pose_z)
+            t_recv = conn.on_recv(n, sock)
+            rows = parser.feed_block(framer.block())
+            conn.on_parsed(parser)
+            if len(rows) == 0:
+                continue
+            restarts = None
+            sample_ts = None
+            if sequenced:
+                conn.on_sequence(rows[:, 0], rows[:, 1], t_recv)
+                restarts = (rows[:, 0] == 0).tolist()
+                # 一次 recv 里的行几乎同时到达，特征按 PP 给的采样时刻积分
+                sample_ts = (rows[:, 1] / 1000).tolist()
+                rows = rows[:, 2:]
+            hub.publish(rows, addr[0])
+            if ring is not None:
+                ring.publish(rows)
+
+            flush_due = False
+            with lock:
+                for i, (force_z, pose_z) in enumerate(rows.tolist()):
+                    if DEBUG:
+                        print(f"[DEBUG] {addr[0]} force_z={force_z} pose_z={pose_z}")
+                    restart = restarts is not None and restarts[i]
+                    ts = sample_ts[i] if sample_ts is not None else None
+                    flush_due = process_data(force_z, pose_z, restart, ts) or flush_due
+            if flush_due:
+                sink.put(("flush", conn, t_recv))
 
     except Exception as e:
         print("[ERROR]", e)
     finally:
         sock.close()
-        print(f"[INFO] Connection closed {addr}")
+        metrics.close(conn)
+        print(f"[INFO] Connection closed {addr}, rows={parser.rows}, bad rows={parser.bad_rows}")
 
 # ================== 主程序 ==================
 def main():
-    if os.path.exists(file_name):
-        os.remove(file_name)
+    global DEBUG
+    args = argparse.ArgumentParser(description="Force/pose ingest server")
+    args.add_argument("--debug", action="store_true", help="print every received line")
+    DEBUG = args.parse_args().debug
+    atexit.register(close_rings)
+
+    for name in (file_name, summary_file_name):
+        if os.path.exists(name):
+            os.remove(name)
 
     server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
@@ -164,6 +298,12 @@ def main():
     server.listen(1)
 
     print(f"[INFO] Server listening on {HOST}:{PORT}")
+    if FANOUT_PORT:
+        start_fanout_server(hub, HOST, FANOUT_PORT)
+    if METRICS_PORT:
+        start_metrics_server(metrics, HOST, METRICS_PORT)
+    metrics.add_sink(sink)
+    start_summary_log(metrics)
 
     while True:
         sock, addr = server.accept()
@@ -1,12 +1,20 @@
+import argparse
 import socket
 import threading
 import time  # 新增时间模块
 
+from line_framer import LineFramer
+from ingest_metrics import IngestMetrics, start_metrics_server, start_summary_log
+
+METRICS_PORT = 20090  # Prometheus /metrics 端口，None 关闭
+metrics = IngestMetrics("main")
+
 class TcpServer:
-    def __init__(self, host='192.168.3.220', port=20000):
+    def __init__(self, host='192.168.3.220', port=20000, debug=False):
         # 初始化服务器参数
         self.host = host      # 服务器监听IP地址
         self.port = port      # 服务器监听端口
+        self.debug = debug    # 逐条打印收到的数据，高频推送时打印本身就是瓶颈
         self.server_socket = None  # 服务器Socket对象
         self.running = False       # 服务器运行状态标志
         # self.log_file = log_file  # 新增日志文件路径
@@ -40,6 +48,9 @@ class TcpServer:
             # 添加时间戳的启动日志
             print(f'[{self._get_time()}] Server started on {self.host}:{self.port}')
             self.running = True
+            if METRICS_PORT:
+                start_metrics_server(metrics, self.host, METRICS_PORT)
+            start_summary_log(metrics)
 
             # 主循环接受连接
             while self.running:
@@ -60,20 +71,29 @@ class TcpServer:
 
     def handle_client(self, client_socket, client_address):
         """处理客户端连接的线程函数"""
+        conn = metrics.open(client_address[0])
+        framer = LineFramer(client_socket)  # 按行切分，跨两次 recv 的消息不会被拆开
         try:
             while self.running:
-                data = client_socket.recv(1024)  # 接收数据（最大1024字节）
-                if not data:  # 客户端断开连接时跳出循环
+                n = framer.fill()
+                if not n:  # 客户端断开连接时跳出循环
                     break
+                conn.on_recv(n, client_socket)
 
                 # 处理接收到的数据（添加时间戳）
-                decoded_data = data.decode('utf-8').strip()
-                print(f'[{self._get_time()}] Received from {client_address}: {decoded_data}')
+                if self.debug:
+                    for line in framer.lines():
+                        conn.on_lines(1)
+                        decoded_data = bytes(line).decode('utf-8', errors='replace').strip()
+                        print(f'[{self._get_time()}] Received from {client_address}: {decoded_data}')
+                else:
+                    conn.on_lines(framer.discard_lines())
 
         except Exception as e:
             print(f'[{self._get_time()}] Error handling client {client_address}: {e}')
         finally:
             client_socket.close()  # 关闭客户端连接
+            metrics.close(conn)
             print(f'[{self._get_time()}] Closed connection from {client_address}')
 
     def stop(self):
@@ -85,5 +105,7 @@ class TcpServer:
 
 
 if __name__ == "__main__":
-    server = TcpServer()  # 创建服务器实例
+    parser = argparse.ArgumentParser(description="PP socket server")
+    parser.add_argument("--debug", action="store_true", help="print every received message")
+    server = TcpServer(debug=parser.parse_args().debug)  # 创建服务器实例
     server.start()        # 启动服务器
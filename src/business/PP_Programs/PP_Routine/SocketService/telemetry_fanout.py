@@ -0,0 +1,163 @@
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# ================== 配置 ==================
+DEFAULT_RATE_HZ = 30        # 每个看板默认最多 30 帧/秒
+MAX_RATE_HZ = 500
+DEFAULT_QUEUE_SIZE = 64     # 每个看板最多积压 64 帧，满了丢最旧的
+MAX_QUEUE_SIZE = 1024
+KEEPALIVE_S = 15
+
+
+class Subscriber:
+    """一个看板连接：独立的限速和有界队列，慢看板只会丢自己的帧"""
+
+    def __init__(self, rate_hz=DEFAULT_RATE_HZ, queue_size=DEFAULT_QUEUE_SIZE):
+        self.min_interval = 1.0 / rate_hz
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.next_due = 0.0
+        self.sent = 0
+        self.dropped = 0
+
+    def offer(self, item):
+        """采集线程调用，永不阻塞"""
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.dropped += 1
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                self.dropped += 1
+
+
+class TelemetryHub:
+    """
+    把采集线程解析出的数据块按看板各自的频率抽稀后分发
+    publish() 在没有看板时只做一次判断；有看板时每个看板每块最多一次字典构造
+    """
+
+    def __init__(self, fields):
+        self.fields = list(fields)
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, rate_hz=DEFAULT_RATE_HZ, queue_size=DEFAULT_QUEUE_SIZE):
+        sub = Subscriber(rate_hz, queue_size)
+        with self._lock:
+            self._subscribers = self._subscribers + [sub]
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s is not sub]
+
+    def publish(self, rows, source=""):
+        """rows: 解析好的 (n, len(fields)) 数组，抽稀为每个到期看板取最新一行"""
+        subscribers = self._subscribers     # 写时复制，读不加锁
+        if not subscribers or len(rows) == 0:
+            return
+        now = time.monotonic()
+        frame = None
+        for sub in subscribers:
+            if now < sub.next_due:
+                continue
+            sub.next_due = now + sub.min_interval
+            if frame is None:
+                frame = dict(zip(self.fields, rows[-1].tolist()))
+                frame["t"] = time.time()
+                frame["src"] = source
+            sub.offer(frame)
+
+    def stats(self):
+        return [
+            {"rate_hz": round(1.0 / s.min_interval, 2), "queued": s.queue.qsize(),
+             "sent": s.sent, "dropped": s.dropped}
+            for s in self._subscribers
+        ]
+
+
+# ================== SSE 服务 ==================
+def stream_options(query):
+    """
+    /stream 的查询参数 -> (rate_hz, queue_size)
+    rate 限制在 (0, MAX_RATE_HZ]，queue 限制在 [1, MAX_QUEUE_SIZE]（queue.Queue 的 0 / 负数是无界）
+    不是数字、rate <= 0 抛 ValueError，处理函数回 400
+    """
+    try:
+        rate = float(query.get("rate", [DEFAULT_RATE_HZ])[0])
+        size = int(query.get("queue", [DEFAULT_QUEUE_SIZE])[0])
+    except ValueError:
+        raise ValueError("rate must be a number and queue an integer") from None
+    if not rate > 0:    # 也挡住 nan
+        raise ValueError(f"rate must be > 0, got {rate}")
+    return min(rate, MAX_RATE_HZ), min(max(size, 1), MAX_QUEUE_SIZE)
+
+
+class _FanoutHandler(BaseHTTPRequestHandler):
+    hub = None
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/stream":
+            self._stream(parse_qs(url.query))
+        elif url.path == "/stats":
+            body = json.dumps(self.hub.stats()).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_error(404)
+
+    def _stream(self, query):
+        try:
+            rate, size = stream_options(query)
+        except ValueError as e:
+            self.send_error(400, str(e))
+            return
+        sub = self.hub.subscribe(rate, size)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        try:
+            while True:
+                try:
+                    frame = sub.queue.get(timeout=KEEPALIVE_S)
+                    self.wfile.write(f"data: {json.dumps(frame)}\n\n".encode())
+                    sub.sent += 1
+                except queue.Empty:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            pass
+        finally:
+            self.hub.unsubscribe(sub)
+
+
+def start_fanout_server(hub, host, port):
+    """
+    后台线程启动 SSE 服务
+    看板: new EventSource("http://<host>:<port>/stream?rate=20")
+    """
+    handler = type("FanoutHandler", (_FanoutHandler,), {"hub": hub})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"[INFO] Live stream on http://{host}:{port}/stream")
+    return server
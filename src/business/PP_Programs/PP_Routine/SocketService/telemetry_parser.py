@@ -0,0 +1,174 @@
+import time
+import warnings
+
+import numpy as np
+
+# ================== 数据布局 ==================
+LAYOUT_FORCE_POSE = 2       # "force_z,pose_z"             (CollectForce)
+LAYOUT_POSE_WRENCH = 12     # "x,y,z,rx,ry,rz,Fx,Fy,Fz,Mx,My,Mz" (CollectAndSendData)
+LAYOUT_SEQ_FORCE_POSE = 4   # "seq,t_ms,force_z,pose_z"     (CollectForce 定频模式)
+
+_NL = ord("\n")
+_COMMA = ord(",")
+
+
+# ================== 整块解析 ==================
+def parse_block(block, n_fields):
+    """
+    把若干完整行（以换行结尾）一次性解析成 (rows, n_fields) 的 float64 数组
+    :return: (array, bad_rows) 空行直接忽略，字段数不对、含非数字或空白字段的行计入 bad_rows
+    """
+    if b"\r" in block:
+        block = block.replace(b"\r", b"")
+    buf = np.frombuffer(block, dtype=np.uint8)
+    nl = np.flatnonzero(buf == _NL)
+    if len(nl) == 0:
+        return np.empty((0, n_fields)), 0
+
+    starts = np.empty(len(nl), dtype=np.intp)
+    starts[0] = 0
+    starts[1:] = nl[:-1] + 1
+    # 每行的逗号数 = 该行换行符之前的逗号数之差；只处理逗号位置，不对整块逐字节 cumsum
+    before = np.searchsorted(np.flatnonzero(buf == _COMMA), nl)
+    commas = np.diff(before, prepend=0)
+
+    blank = (nl - starts) == 0
+    good = (commas == n_fields - 1) & ~blank
+    bad_rows = int(len(nl) - np.count_nonzero(good) - np.count_nonzero(blank))
+
+    n_good = int(np.count_nonzero(good))
+    if n_good == 0:
+        return np.empty((0, n_fields)), bad_rows
+
+    # np.fromstring 把只有空白的字段读成 -1，带空白的块直接走逐行的严格解析
+    if b" " not in block and b"\t" not in block:
+        if n_good == len(nl):
+            text = block[:nl[-1]].replace(b"\n", b",")
+        else:
+            text = b",".join([block[s:e] for s, e in zip(starts[good].tolist(), nl[good].tolist())])
+        values = _fast_floats(text)
+        if values is not None and len(values) == n_good * n_fields:
+            return values.reshape(n_good, n_fields), bad_rows
+
+    # 含非数字或空白字段 → 逐行兜底，只丢坏行
+    rows = []
+    for s, e in zip(starts[good].tolist(), nl[good].tolist()):
+        try:
+            rows.append([float(field) for field in block[s:e].split(b",")])
+        except ValueError:
+            bad_rows += 1
+    if not rows:
+        return np.empty((0, n_fields)), bad_rows
+    return np.array(rows), bad_rows
+
+
+def _fast_floats(text):
+    """np.fromstring 文本模式在遇到非法字段时只给警告并截断，这里把它转成 None"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        try:
+            return np.fromstring(text, dtype=np.float64, sep=",")
+        except (ValueError, DeprecationWarning):
+            return None
+
+
+# ================== 流式解析器 ==================
+class ChunkParser:
+    """
+    逐块喂入 recv 到的字节，返回其中所有完整行的数值数组
+    - 末尾不完整的行缓存到下一次 feed
+    - skip_lines: 连接开头需要丢弃的行数（PP 端先发的 "Hi, Sunseed!"）
+    """
+
+    def __init__(self, n_fields=LAYOUT_FORCE_POSE, skip_lines=1):
+        self.n_fields = n_fields
+        self.skip_lines = skip_lines
+        self.tail = b""
+        self.rows = 0
+        self.bad_rows = 0
+
+    def feed(self, data):
+        data = bytes(data)
+        cut = data.rfind(b"\n")
+        if cut < 0:
+            self.tail += data
+            return np.empty((0, self.n_fields))
+
+        block = self.tail + data[:cut + 1] if self.tail else data[:cut + 1]
+        self.tail = data[cut + 1:]
+        return self.feed_block(block)
+
+    def feed_block(self, block):
+        """block 只含完整行（LineFramer.block() 的结果），不经过 tail 缓存"""
+        block = bytes(block)    # np.fromstring 需要 bytes，整块只复制这一次
+        while self.skip_lines > 0 and block:
+            nl = block.find(b"\n")
+            line, block = block[:nl], block[nl + 1:]
+            if line.strip():
+                self.skip_lines -= 1
+
+        values, bad = parse_block(block, self.n_fields)
+        self.rows += len(values)
+        self.bad_rows += bad
+        return values
+
+
+# ================== 基准测试 ==================
+def _legacy_parse(chunks, n_fields):
+    """当前 socket_service_force / socket_service_csv 的逐行路径"""
+    buffer = ""
+    out = []
+    for data in chunks:
+        buffer += data.decode("utf-8", errors="ignore")
+        while "\n" in buffer:
+            line, buffer = buffer.split("\n", 1)
+            parts = line.strip().split(",")
+            if len(parts) != n_fields:
+                continue
+            try:
+                out.append([float(p) for p in parts])
+            except ValueError:
+                continue
+    return out
+
+
+def _make_stream(n_lines, n_fields, chunk_size=4096):
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(n_lines, n_fields))
+    text = "\n".join(",".join(f"{v:.6f}" for v in row) for row in values) + "\n"
+    raw = text.encode()
+    return [raw[i:i + chunk_size] for i in range(0, len(raw), chunk_size)]
+
+
+def _best_time(fn, runs=3):
+    best = None
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def benchmark(n_lines=100_000, target_rate=100_000):
+    # 4KB 是很小的 recv；LineFramer 一次 recv_into 最多 64KB，负载高时每次都接近读满
+    for n_fields in (LAYOUT_FORCE_POSE, LAYOUT_POSE_WRENCH):
+        for chunk_size in (4096, 64 * 1024):
+            chunks = _make_stream(n_lines, n_fields, chunk_size)
+            assert len(_legacy_parse(chunks, n_fields)) == n_lines
+            parser = ChunkParser(n_fields, skip_lines=0)
+            assert sum(len(parser.feed(c)) for c in chunks) == n_lines
+
+            t_legacy = _best_time(lambda: _legacy_parse(chunks, n_fields))
+            t_chunk = _best_time(lambda: [ChunkParser(n_fields, skip_lines=0).feed(c) for c in chunks])
+            budget = n_lines / target_rate
+            print(f"[BENCH] {n_fields:2d} fields, {n_lines} lines, {chunk_size // 1024}KB reads")
+            print(f"        per-line : {n_lines / t_legacy:12,.0f} lines/s  "
+                  f"({t_legacy / budget * 100:5.1f}% of one core @ {target_rate:,} lines/s)")
+            print(f"        chunk    : {n_lines / t_chunk:12,.0f} lines/s  "
+                  f"({t_chunk / budget * 100:5.1f}% of one core @ {target_rate:,} lines/s)")
+            print(f"        speedup  : {t_legacy / t_chunk:.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark()
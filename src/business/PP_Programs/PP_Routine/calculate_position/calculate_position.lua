@@ -1,4 +1,10 @@
 
+function concat_string(...)
+    local args = {...}
+    return table.concat(args, "")
+end
+
+
 function join_list(list, delim)
   local str = table.concat(list, delim)
   return str
@@ -28,9 +34,11 @@ function split_string(input, delim)
 end
 
 
-function concat_string(...)
-    local args = {...}
-    return table.concat(args, "")
+function get_list(list, index)
+  assert((#list ~= 0), "empty list")
+  assert((type(index) == "number"), "index must be a number")
+  assert((index >= 0 and index <= #list-1), "index out of range")
+  return list[index + 1]
 end
 
 local function calculate_position(base_x, base_y, base_z, base_rx, base_ry, base_rz, rows, cols, layers, x_offset, y_offset, z_offset, reference_pose)
@@ -38,23 +46,42 @@ local function calculate_position(base_x, base_y, base_z, base_rx, base_ry, base
   
   ݻꡢвάƫеλ꣨ռ
   
+  ֱֵÿ㣬ƴַٲ𿪣 while Python  Lua ±һ
+  
+  reference_pose Ϊ 7 οؽڽ + 6 ⲿᣬѭȡÿһι 21 
+  
    ]]
   local points = {}
-  for k=1,layers,1 do
-      for i=1,rows,1 do
-          for j=1,cols,1 do
-              local x = (base_x + ((j - 1) * x_offset))
-              local y = (base_y + ((i - 1) * y_offset))
-              local z = (base_z + ((k - 1) * z_offset))
-              local rx = base_rx
-              local ry = base_ry
-              local rz = base_rz
-              local str_pose = split_string(concat_string(x, ",", y, ",", z, ",", rx, ",", ry, ",", rz, ",", "WORLD", ",", "WORLD_ORIGIN", ",", reference_pose), ",")
-              append_list(points, str_pose)
+  local j1 = get_list(reference_pose, 0)
+  local j2 = get_list(reference_pose, 1)
+  local j3 = get_list(reference_pose, 2)
+  local j4 = get_list(reference_pose, 3)
+  local j5 = get_list(reference_pose, 4)
+  local j6 = get_list(reference_pose, 5)
+  local j7 = get_list(reference_pose, 6)
+  local e1 = get_list(reference_pose, 7)
+  local e2 = get_list(reference_pose, 8)
+  local e3 = get_list(reference_pose, 9)
+  local e4 = get_list(reference_pose, 10)
+  local e5 = get_list(reference_pose, 11)
+  local e6 = get_list(reference_pose, 12)
+  local k = 0
+  while (k < layers) do
+      local z = (base_z + (k * z_offset))
+      local i = 0
+      while (i < rows) do
+          local y = (base_y + (i * y_offset))
+          local j = 0
+          while (j < cols) do
+              local x = (base_x + (j * x_offset))
+              append_list(points, {x, y, z, base_rx, base_ry, base_rz, "WORLD", "WORLD_ORIGIN", j1, j2, j3, j4, j5, j6, j7, e1, e2, e3, e4, e5, e6})
+              j = (j + 1)
               ::loop_label_3::
           end
+          i = (i + 1)
           ::loop_label_2::
       end
+      k = (k + 1)
       ::loop_label_1::
   end
   return points
@@ -71,15 +98,20 @@ if modbus_tcp_open(1, "192.168.2.100", 502) then
     local col_spacing = get_global_var("ColSpacing")
     local layer_spacing = get_global_var("LayerSpacing")
     local reference_pose = get_global_var("ReferencePose")
-    local reference_pose_list = join_list(reference_pose, ",")
-    local confirm = (row >= 1) and (col >= 1) and (layer >= 1)
+    local confirm = ((row >= 1) and (col >= 1) and (layer >= 1))
     if not confirm then
         info("Rows, cols and layers must be non-negative integers")
         info("ȷ С   ֵrow>=1 && col>=1 && layer>=1")
         modbus_tcp_close(1)
         return false
     end
-    local arr_row_data = calculate_position(base_x, base_y, base_z, 0, -90, 0, row, col, layer, row_spacing, col_spacing, layer_spacing, reference_pose_list)
+    local key = concat_string(base_x, ",", base_y, ",", base_z, ",", row, ",", col, ",", layer, ",", row_spacing, ",", col_spacing, ",", layer_spacing, ",", join_list(reference_pose, ","))
+    if (get_global_var("ArrDataKey") == key) then
+        info("λδ䣬 ArrData")
+        modbus_tcp_close(1)
+        return true
+    end
+    local arr_row_data = calculate_position(base_x, base_y, base_z, 0, -90, 0, row, col, layer, row_spacing, col_spacing, layer_spacing, reference_pose)
     if (#arr_row_data == 0) then
         local a_coord = {"0,0,0,0,180,0,WORLD,WORLD_ORIGIN,0,-40,0,90,0,40,0,0,0,0,0,0,0"}
         local arr_coord = {}
@@ -90,9 +122,9 @@ if modbus_tcp_open(1, "192.168.2.100", 502) then
         set_global_var("ArrData", arr_coord)
         info("쳣--ֹ")
         modbus_tcp_close(1)
-    else
-
+        return false
     end
     set_global_var("ArrData", arr_row_data)
+    set_global_var("ArrDataKey", key)
     modbus_tcp_close(1)
 end
@@ -1,3 +1,5 @@
+sample_period_ms = 4
+loop_cost_ms = 1
 
 function get_list(list, index)
   assert((#list ~= 0), "empty list")
@@ -13,21 +15,37 @@ function concat_string(...)
 end
 
 if socket_open(1, "192.168.3.220", 20000) then
-    info(socket_send(1, "Hi, Sunseed!"))
+    if (sample_period_ms > 0) then
+        info(socket_send(1, "Hi, Sunseed! seq,t_ms,force_z,pose_z"))
+    else
+        info(socket_send(1, "Hi, Sunseed!"))
+    end
+    local wait_cycle = (sample_period_ms - loop_cost_ms)
     while true do
         local Force_Flag = get_global_var("starForce")
         if Force_Flag then
             info("ʼɼ")
+            local seq = 0
             while Force_Flag do
                 local tcpPose = get_system_state("tcpPose")
                 local posZ = get_list(tcpPose, 2)
                 local Fz = get_system_state("CartesianForceZ")
-                local all_data = concat_string(Fz, ",", posZ)
+                local all_data = ""
+                if (sample_period_ms > 0) then
+                    all_data = concat_string(seq, ",", (seq * sample_period_ms), ",", Fz, ",", posZ)
+                    seq = (seq + 1)
+                else
+                    all_data = concat_string(Fz, ",", posZ)
+                end
                 socket_send(1, all_data)
-                if not get_global_var("starForce") then
+                Force_Flag = get_global_var("starForce")
+                if not Force_Flag then
                     info("ֹͣɼ")
                     break
                 end
+                if (wait_cycle > 0) then
+                    wait_ms(wait_cycle)
+                end
                 ::loop_label_2::
             end
         end
@@ -1,3 +1,13 @@
+push_mode = false
+max_carry = 4096
+cam_intr_params = '691.6986083984375, 691.6787109375, 642.67529296875, 361.54461669921875, 1280, 720, 0.001'
+cam_extr_params = '0.34559894 -0.41461863 0.83664676 -0.03670967 3.1249094 -0.00345758'
+obj_name = 'Conveyor-SerialPort-1/Vision'
+workspace = {0, 0, 0, 0, 0, 0}
+vision_messages = 0
+vision_objects = 0
+vision_queued = 0
+vision_rejected = 0
 
 function split_string(input, delim)
   local t = {}
@@ -75,6 +85,13 @@ local function update_global_var_coord(var_name, new_tcp_pos, new_coordinate, ne
   set_global_var(var_name, new_var_value)
 end
 
+local function load_workspace()
+  --[[ ѹռǶ pp_workspaceжĿʱÿζȫֱ ]]
+  local cord1 = get_global_var("WorkSpace1")
+  local cord2 = get_global_var("WorkSpace2")
+  workspace = {get_list(cord1, 0), get_list(cord1, 1), get_list(cord1, 2), get_list(cord2, 0), get_list(cord2, 1), get_list(cord2, 2)}
+end
+
 local function enter_silent_mode()
   --[[ 뾲Ĭģʽ ]]
   info("[Vision] Enter Silent Mode")
@@ -87,36 +104,90 @@ local function enter_silent_mode()
   end
 end
 
-local function determine_workspace(obj_x, obj_y, obj_z)
+local function handle_object(obj_value)
   --[[ 
   
-  жĿǷڹռ
+  һĿ "x y z rx ry rz"ڹռڷŽأǵ RecvCoord
   
-  :return: True -> ռ, False -> ڹռ
+  :return: True -> Ž˶
   
    ]]
-  local cord1 = get_global_var("WorkSpace1")
-  local cord2 = get_global_var("WorkSpace2")
-  local cord1_x = get_list(cord1, 0)
-  local cord1_y = get_list(cord1, 1)
-  local cord1_z = get_list(cord1, 2)
-  local cord2_x = get_list(cord2, 0)
-  local cord2_y = get_list(cord2, 1)
-  local cord2_z = get_list(cord2, 2)
-  if ((cord1_x <= obj_x and obj_x <= cord2_x) and (cord1_y <= obj_y and obj_y <= cord2_y) and (cord1_z <= obj_z and obj_z <= cord2_z)) then
-      return false
-  else
+  local obj_str = split_string(obj_value, " ")
+  local obj_x = str_to_number(get_list(obj_str, 0), 10)
+  local obj_y = str_to_number(get_list(obj_str, 1), 10)
+  local obj_z = str_to_number(get_list(obj_str, 2), 10)
+  vision_objects = (vision_objects + 1)
+  local workspace = workspace
+  if ((get_list(workspace, 0) <= obj_x and obj_x <= get_list(workspace, 3)) and (get_list(workspace, 1) <= obj_y and obj_y <= get_list(workspace, 4)) and (get_list(workspace, 2) <= obj_z and obj_z <= get_list(workspace, 5))) then
+      obj_pool_update(obj_name, 8, obj_value, cam_intr_params, cam_extr_params, "flange")
+      vision_queued = (vision_queued + 1)
       return true
   end
+  vision_rejected = (vision_rejected + 1)
+  info("[Vision] Out of workspace")
+  local vision_value = concat_string("[Vision] Obj value: ", obj_value)
+  info(vision_value)
+  local obj_rx = str_to_number(get_list(obj_str, 3), 10)
+  local obj_ry = str_to_number(get_list(obj_str, 4), 10)
+  local obj_rz = str_to_number(get_list(obj_str, 5), 10)
+  update_global_var_coord("RecvCoord", {obj_x, obj_y, obj_z, obj_rx, obj_ry, obj_rz}, {"WORLD", "WORLD_ORIGIN"}, {0, -40, 0, 90, 0, 40, 0}, {1, 2, 3, 4, 5, 6}, "meter")
+  return false
+end
+
+local function publish_stats()
+  set_global_var("ConvVisionStats", {vision_messages, vision_objects, vision_queued, vision_rejected})
 end
 
-local cam_intr_params = "691.6986083984375, 691.6787109375, 642.67529296875, 361.54461669921875, 1280, 720, 0.001"
-local cam_extr_params = "0.34559894 -0.41461863 0.83664676 -0.03670967 3.1249094 -0.00345758"
-local obj_name = "Conveyor-SerialPort-1/Vision"
 local recv_text = ""
 while true do
     if socket_open(1, "192.168.2.50", 30000) then
         info("[Vision] is connected")
+        load_workspace()
+        if push_mode then
+            if not socket_send(1, "Push") then
+                info("[Vision] Send fail")
+                goto loop_label_2
+            end
+            local carry = ""
+            while true do
+                if not socket_connected(1) then
+                    info("[Vision] Loss connection")
+                    break
+                end
+                recv_text = socket_recv(1)
+                if (recv_text == "") then
+                    goto loop_label_3
+                end
+                local lines = split_string(concat_string(carry, recv_text), "\n")
+                local count = #lines
+                carry = get_list(lines, (count - 1))
+                if (#carry > max_carry) then
+                    info("[Vision] Drop unterminated data")
+                    carry = ""
+                end
+                local index = 0
+                while (index < (count - 1)) do
+                    local objects = split_string(get_list(lines, index), ";")
+                    vision_messages = (vision_messages + 1)
+                    local n = 0
+                    while (n < #objects) do
+                        local obj_value = get_list(objects, n)
+                        if (obj_value ~= "") then
+                            handle_object(obj_value)
+                        end
+                        n = (n + 1)
+                        ::loop_label_5::
+                    end
+                    index = (index + 1)
+                    ::loop_label_4::
+                end
+                if (count > 1) then
+                    publish_stats()
+                end
+                ::loop_label_3::
+            end
+            goto loop_label_2
+        end
         while true do
             if not socket_connected(1) then
                 info("[Vision] Loss connection")
@@ -130,24 +201,11 @@ while true do
             if (recv_text ~= "") then
                 local obj_param = split_string(recv_text, ";")
                 local obj_value = obj_param[1]
-                local obj_str = split_string(obj_value, " ")
-                local obj_x = str_to_number(get_list(obj_str, 0), 10)
-                local obj_y = str_to_number(get_list(obj_str, 1), 10)
-                local obj_z = str_to_number(get_list(obj_str, 2), 10)
-                local obj_rx = str_to_number(get_list(obj_str, 3), 10)
-                local obj_ry = str_to_number(get_list(obj_str, 4), 10)
-                local obj_rz = str_to_number(get_list(obj_str, 5), 10)
-                local obj_flag = determine_workspace(obj_x, obj_y, obj_z)
-                if not obj_flag then
-                    obj_pool_update(obj_name, 8, obj_value, cam_intr_params, cam_extr_params, "flange")
-                else
-                    info("[Vision] Out of workspace")
-                    local vision_value = concat_string("[Vision] Obj value: ", obj_value)
-                    info(vision_value)
-                    update_global_var_coord("RecvCoord", {obj_x, obj_y, obj_z, obj_rx, obj_ry, obj_rz}, {"WORLD", "WORLD_ORIGIN"}, {0, -40, 0, 90, 0, 40, 0}, {1, 2, 3, 4, 5, 6}, "meter")
-                end
+                vision_messages = (vision_messages + 1)
+                handle_object(obj_value)
+                publish_stats()
             end
-            ::loop_label_3::
+            ::loop_label_6::
         end
     else
         enter_silent_mode()
@@ -0,0 +1,305 @@
+"""
+按清单把并行程序部署到一台或多台机器人：只重新部署生成的 Lua 有变化的程序，多台机器人同时部署，最后列出每一步的耗时
+
+    # 在 PP_Routine 目录下
+    python deploy_pp.py                          # 默认读 deploy_manifest.json
+    python deploy_pp.py cell_a.json --dry-run    # 只生成、比较，列出会部署到哪里
+    python deploy_pp.py --force                  # 不管有没有变化，全部重新部署
+
+清单是 JSON：robots 是机器人 IP，programs 每项是程序名（写法同 simulator/run_pp.py：MyPP 下的模块名或 模块:类名），或带选项的对象
+    {
+      "robots": ["192.168.3.101", "192.168.3.102"],
+      "programs": [
+        "MyPP.supervisor:Supervisor",
+        {"program": "conv_vision_trigger", "robots": ["192.168.3.101"], "set": {"pp_push_mode": true}, "start": false}
+      ]
+    }
+  robots 只部署到这几台（默认是清单的 robots），set 在 __init__ 之后覆盖 pp_ 属性，start 为 false 时只使能不启动
+  __init__ 里用来算别的状态的属性（Supervisor 的 pp_poll_ms 会抄进 pp_task_periods）和 __init__ 调的方法算出来的属性
+  （UsbSensorPP 的 pp_blocks / pp_sample_chars）不能 set，覆盖了也不会重新算，直接报错；这些在类里改
+
+每个程序先 lint_pp、to_lua（生成到临时目录，不覆盖 PP_Routine 下提交过的 <程序名>/ 文件夹），对生成的 .lua 和 ppConfig.json 算 sha256，
+和清单旁边 .deploy_state.json 里记的这台机器人上次部署成功的哈希比较，一样就跳过；部署成功后才更新记录
+每台机器人一个线程，按清单顺序 disable、assign、enable、start（和 main.py 相同），连不上 gRPC 端口的机器人直接跳过
+记录只知道本工具部署过什么：在示教器上改过程序、换了控制器之后用 --force
+"""
+import argparse
+import ast
+import concurrent.futures
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import socket
+import tempfile
+import textwrap
+import time
+
+from pp.parallel_program import ParallelProgram
+from pp.settings import RobotSetting
+
+from pp_lint import lint_pp
+
+ROUTINE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ================== 配置 ==================
+DEFAULT_MANIFEST = "deploy_manifest.json"
+# 放在清单旁边，记录 {机器人 IP: {程序名: sha256}}
+STATE_FILE = ".deploy_state.json"
+# ppdk 接口的成功返回码
+RET_OK = 110000
+# 和 main.py 相同的部署步骤；disable 对还没有的程序会返回错误码，不检查
+STEPS = ("disable", "assign", "enable", "start")
+CHECKED_STEPS = ("enable", "start")
+
+
+def load_program(spec):
+    module_name, _, class_name = spec.partition(":")
+    if "." not in module_name:
+        module_name = "MyPP." + module_name
+    module = importlib.import_module(module_name)
+    if class_name:
+        return getattr(module, class_name)
+    classes = [c for _, c in inspect.getmembers(module, inspect.isclass)
+               if issubclass(c, ParallelProgram) and c is not ParallelProgram and c.__module__ == module.__name__
+               and any(name.startswith("pp_") for name in vars(c))]
+    if len(classes) != 1:
+        raise SystemExit(f"{module_name}: expected one ParallelProgram subclass, found "
+                         f"{[c.__name__ for c in classes]}; use module:Class")
+    return classes[0]
+
+
+def load_manifest(path):
+    """读清单，每个程序展开成 {program, class, robots, set, start}"""
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    robots = manifest.get("robots", [])
+    entries = []
+    for item in manifest.get("programs", []):
+        if isinstance(item, str):
+            item = {"program": item}
+        unknown = set(item) - {"program", "robots", "set", "start"}
+        if unknown:
+            raise SystemExit(f"{path}: unknown keys {sorted(unknown)} in {item}")
+        entries.append({
+            "program": item["program"],
+            "class": load_program(item["program"]),
+            "robots": item.get("robots", robots),
+            "set": item.get("set", {}),
+            "start": item.get("start", True),
+        })
+    return entries
+
+
+def load_state(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(path, state):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def _method_tree(cls, name):
+    """类上 name 方法的 AST，取不到源码（内置 / 动态生成）时为 None"""
+    method = getattr(cls, name, None)
+    try:
+        source = textwrap.dedent(inspect.getsource(method))
+    except (OSError, TypeError):
+        return None
+    return ast.parse(source).body[0]
+
+
+def init_derived(cls):
+    """
+    {pp_ 属性: 原因}：__init__（含基类的）读过的 pp_ 属性，以及 __init__ 调的 self.xxx() 方法读写的 pp_ 属性
+    这些在 __init__ 之后再改，算出来的状态不会跟着变
+    """
+    derived = {}
+    todo = [(klass.__name__ + ".__init__", klass, "__init__")
+            for klass in cls.__mro__ if klass not in (ParallelProgram, object) and "__init__" in vars(klass)]
+    seen = set()
+    while todo:
+        where, klass, name = todo.pop()
+        if (klass, name) in seen:
+            continue
+        seen.add((klass, name))
+        tree = _method_tree(klass, name)
+        if tree is None:
+            continue
+        helper = name != "__init__"
+        for node in ast.walk(tree):
+            if (isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == "self"
+                    and node.attr.startswith("pp_") and (helper or isinstance(node.ctx, ast.Load))):
+                derived.setdefault(node.attr, where)
+            elif (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                    and isinstance(node.func.value, ast.Name) and node.func.value.id == "self"
+                    and not node.func.attr.startswith(("pp_", "func_", "__"))
+                    and callable(getattr(cls, node.func.attr, None))):
+                todo.append((f"{cls.__name__}.{node.func.attr}", cls, node.func.attr))
+    return derived
+
+
+def make_program(entry, ip=None):
+    pp = entry["class"](setting=RobotSetting(ip=ip)) if ip else entry["class"]()
+    derived = init_derived(entry["class"]) if entry["set"] else {}
+    for name, value in entry["set"].items():
+        if not name.startswith("pp_") or not hasattr(pp, name):
+            raise SystemExit(f"set {name}: {type(pp).__name__} has no attribute {name}")
+        if name in derived:
+            raise SystemExit(f"set {name}: used by {derived[name]} to set up other state, which an override "
+                             f"after __init__ would not update; change it in {type(pp).__name__} instead")
+        setattr(pp, name, value)
+    return pp
+
+
+def build(entry):
+    """
+    lint、to_lua，返回 {程序名: sha256}；程序名和 ppdk 一样是 pp_ 方法名去掉前缀
+    生成到临时目录：set 覆盖过的值不能写进 PP_Routine 下提交过的 GBK 文件；assign 不读这些文件，自己重新生成
+    """
+    pp = make_program(entry)
+    lint_pp(pp)
+    names = [name[3:] for name, _ in inspect.getmembers(pp, inspect.ismethod) if name.startswith("pp_")]
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="deploy_pp_") as out_dir:
+        os.chdir(out_dir)
+        try:
+            pp.to_lua(check=False)
+        finally:
+            os.chdir(cwd)
+        hashes = {}
+        for name in names:
+            digest = hashlib.sha256()
+            # ppConfig.json 里有 auto_booted / auto_looped，改了也要重新部署
+            for filename in (f"{name}.lua", "ppConfig.json"):
+                path = os.path.join(out_dir, name, filename)
+                if not os.path.isfile(path):
+                    raise SystemExit(f"{entry['program']}: to_lua did not write {filename} for {name}")
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+            hashes[name] = digest.hexdigest()
+    return hashes
+
+
+def reachable(ip, timeout_s):
+    """先试连 gRPC 端口：连不上时 ppdk 的调用要等很久才报错"""
+    try:
+        with socket.create_connection((ip, RobotSetting().grpc_port), timeout=timeout_s):
+            return True
+    except OSError:
+        return False
+
+
+def error_text(error):
+    # grpc.RpcError 的 str 是多行的调用详情，details() 才是控制器给的原因
+    details = getattr(error, "details", None)
+    if callable(details):
+        return f"{type(error).__name__}: {details()}"
+    return f"{type(error).__name__}: {error}"
+
+
+def deploy_robot(ip, entries, connect_timeout_s):
+    """在一台机器人上按顺序部署 entries，返回每个程序一行结果 {robot, entry, result, steps}"""
+    if not reachable(ip, connect_timeout_s):
+        return [{"robot": ip, "entry": entry, "result": "unreachable", "steps": {}} for entry in entries]
+    rows = []
+    for entry in entries:
+        steps = {}
+        result = "deployed"
+        try:
+            pp = make_program(entry, ip)
+            for step in STEPS:
+                if step == "start" and not entry["start"]:
+                    continue
+                started = time.perf_counter()
+                try:
+                    returned = getattr(pp, step)()
+                finally:
+                    steps[step] = (time.perf_counter() - started) * 1000
+                if step in CHECKED_STEPS:
+                    for name, ret in returned.items():
+                        if ret.value != RET_OK:
+                            raise RuntimeError(f"{step} {name} returned {ret.value} {ret.info}")
+        except Exception as e:
+            result = f"failed, {error_text(e)}"
+        rows.append({"robot": ip, "entry": entry, "result": result, "steps": steps})
+    return rows
+
+
+def report(rows, entries, wall_s):
+    counts = {}
+    for row in rows:
+        key = row["result"].split(",")[0]
+        counts[key] = counts.get(key, 0) + 1
+    summary = ", ".join(f"{n} {key}" for key, n in counts.items())
+    robots = {row["robot"] for row in rows}
+    lines = [f"[STAT] {len(robots)} robots, {len(entries)} programs: {summary} in {wall_s:.2f}s wall"]
+    for entry in entries:
+        lines.append(f"[STAT] build {entry['program']}: lint + to_lua {entry['build_ms']:.0f} ms")
+    lines.append(f"{'robot':16s} {'program':24s} " + " ".join(f"{step + ' ms':>10s}" for step in STEPS)
+                 + f" {'total ms':>10s}  result")
+    order = {id(entry): i for i, entry in enumerate(entries)}
+    for row in sorted(rows, key=lambda r: (r["robot"], order[id(r["entry"])])):
+        steps = row["steps"]
+        cells = " ".join(f"{steps[step]:10.1f}" if step in steps else f"{'-':>10s}" for step in STEPS)
+        total = f"{sum(steps.values()):10.1f}" if steps else f"{'-':>10s}"
+        lines.append(f"{row['robot']:16s} {','.join(row['entry']['hashes']):24s} {cells} {total}  {row['result']}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deploy the parallel programs in a manifest, skipping unchanged ones")
+    parser.add_argument("manifest", nargs="?", default=os.path.join(ROUTINE_DIR, DEFAULT_MANIFEST))
+    parser.add_argument("--force", action="store_true", help="deploy every program even if its Lua is unchanged")
+    parser.add_argument("--dry-run", action="store_true", help="build and compare only, do not connect to robots")
+    parser.add_argument("--jobs", type=int, default=8, help="robots deployed at the same time")
+    parser.add_argument("--connect-timeout", type=float, default=2.0, help="seconds to wait for a robot's gRPC port")
+    args = parser.parse_args()
+
+    manifest_path = os.path.abspath(args.manifest)
+    state_path = os.path.join(os.path.dirname(manifest_path), STATE_FILE)
+    entries = load_manifest(manifest_path)
+    state = load_state(state_path)
+    started = time.perf_counter()
+
+    rows = []
+    pending = {}    # 机器人 IP -> 要部署的 entries，按清单顺序
+    for entry in entries:
+        build_started = time.perf_counter()
+        entry["hashes"] = build(entry)
+        entry["build_ms"] = (time.perf_counter() - build_started) * 1000
+        for ip in entry["robots"]:
+            deployed = state.get(ip, {})
+            if not args.force and all(deployed.get(name) == digest for name, digest in entry["hashes"].items()):
+                rows.append({"robot": ip, "entry": entry, "result": "unchanged", "steps": {}})
+            elif args.dry_run:
+                rows.append({"robot": ip, "entry": entry, "result": "would deploy", "steps": {}})
+            else:
+                pending.setdefault(ip, []).append(entry)
+
+    if pending:
+        print(f"[INFO] deploying to {len(pending)} robots: " + ", ".join(
+            f"{ip} ({len(items)} programs)" for ip, items in pending.items()))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(args.jobs, len(pending)))) as pool:
+            futures = {pool.submit(deploy_robot, ip, items, args.connect_timeout): ip for ip, items in pending.items()}
+            for future in concurrent.futures.as_completed(futures):
+                ip = futures[future]
+                for row in future.result():
+                    rows.append(row)
+                    if row["result"] == "deployed":
+                        state.setdefault(ip, {}).update(row["entry"]["hashes"])
+                # 每台机器人部署完就写一次，中途中断也不丢已经成功的记录
+                save_state(state_path, state)
+                print(f"[INFO] {ip} done")
+
+    print(report(rows, entries, time.perf_counter() - started))
+    return 1 if any(row["result"].startswith(("failed", "unreachable")) for row in rows) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
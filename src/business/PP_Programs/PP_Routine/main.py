@@ -1,5 +1,7 @@
 from pp.settings import RobotSetting
 
+from pp_lint import lint_pp
+
 from MyPP.clearfault_test import ClearFaultTest
 from MyPP.setting_robot import SettingRobot
 from MyPP.control_gripper import ControlGripper
@@ -11,8 +13,10 @@ from MyPP.pp_motor import USBMotorTxClient
 from MyPP.float_2_n16_to_d32_float import Float_2_N16
 from MyPP.conv_vision_trigger import ConvVisionTrigger
 from MyPP.collect_force import CollectForce
+from MyPP.supervisor import Supervisor
 if __name__ == "__main__":
 
+    # 这里每次只部署一个程序到一台机器人；多台机器人、多个程序、只部署改过的程序用 deploy_pp.py + deploy_manifest.json
     # 机器人的默认地址是192.168.2.100，可以修改为实际IP地址
     # 如果机器人IP是默认的，则不需要定义RobotSetting对象
 
@@ -34,9 +38,13 @@ if __name__ == "__main__":
     # pp = ClearFaultTest(setting=setting)
     # pp = ControlGripper(setting=setting)
     # pp = SecurityZone(setting=setting)
+    # ClearFaultTest / ControlGripper / SecurityZone 合成一个并行程序跑
+    # pp = Supervisor(setting=setting)
     # pp = ControlRobot(setting=setting)
     # pp = ControlRobot_1(setting=setting)
     # pp = RobotSocket(setting=setting)
+    # 生成 Lua 之前做一遍静态性能检查：没有 wait_ms 的空转循环、同一轮里重复的读操作
+    lint_pp(pp)
     # 如果想直接在机器人端运行则可以忽略此步骤
     pp.to_lua(check=False)
     pp.disable()
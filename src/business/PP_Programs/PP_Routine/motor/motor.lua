@@ -1,13 +1,52 @@
-
-function append_list(list, value)
-     table.insert(list, (#list+1), value)
-     return list
+header_sum_a5 = 231
+header_sum_a6 = 236
+header_sum_a8 = 238
+header_sum_94 = 210
+header_sum_19 = 87
+header_sum_88 = 198
+angle_reply_len = 13
+local function read_single_angle(motor_id)
+  local mid = motor_id
+  if (mid == nil) then
+      mid = 1
+  end
+  if ((mid < 1) or (mid > 32)) then
+      info("ID1~32Χ")
+      mid = 1
+  end
+  serial_port_send(1, {62, 148, mid, 0, (math.fmod((header_sum_94 + mid), 256))})
+  local resp = serial_port_recv(1, 10)
+  if (#resp >= 10) then
+      local raw_value = (((resp[6] + (resp[7] * 256)) + (resp[8] * 65536)) + (resp[9] * 16777216))
+      local angle_deg = ((raw_value * 0.01) / 8)
+      return angle_deg
+  end
+  return 0.0
 end
 
-
-function concat_string(...)
-    local args = {...}
-    return table.concat(args, "")
+local function send_angle_v2(angle, direction, speed_percentage, motor_id)
+  --[[  0xA6 Ȧλÿ֡ٶȣ  ]]
+  if not (0.0 <= angle and angle <= 359.99) then
+      info("Ƕ0~359.99Χ")
+  end
+  local mid = motor_id
+  if (mid == nil) then
+      mid = 1
+  end
+  if ((mid < 1) or (mid > 32)) then
+      info("ID1~32Χ")
+      mid = 1
+  end
+  local value = math.floor(((angle * 8) * 100.0))
+  local a0 = (math.fmod(value, 256))
+  local a1 = (math.fmod(math.floor((value / 256)), 256))
+  local a2 = (math.fmod(math.floor((value / 65536)), 256))
+  local speed = math.floor((600000 * (speed_percentage / 100.0)))
+  local s0 = (math.fmod(speed, 256))
+  local s1 = (math.fmod(math.floor((speed / 256)), 256))
+  local s2 = (math.fmod(math.floor((speed / 65536)), 256))
+  local s3 = (math.fmod(math.floor((speed / 16777216)), 256))
+  return {62, 166, mid, 8, (math.fmod((header_sum_a6 + mid), 256)), direction, a0, a1, a2, s0, s1, s2, s3, (math.fmod((((((((direction + a0) + a1) + a2) + s0) + s1) + s2) + s3), 256))}
 end
 
 local function connect()
@@ -20,48 +59,25 @@ local function connect()
   return false
 end
 
-local function send_angle(angle, direction)
-  --[[  send angle to motor
-  
-  :param angle:
-  
-   ]]
-  if not (0.0 <= angle and angle <= 359.99) then
-      info("Ƕ0~359.99Χ")
+local function move_to_angle_v2(target_angle, speed_percentage, motor_id)
+  local current_angle = read_single_angle(motor_id)
+  local cw = (math.fmod(((target_angle - current_angle) + 360.0), 360.0))
+  local ccw = (math.fmod(((current_angle - target_angle) + 360.0), 360.0))
+  local direction = 0
+  local delta = cw
+  if (cw <= ccw) then
+      direction = 0
+      delta = cw
+  else
+      direction = 1
+      delta = ccw
   end
-  local frame_list = {}
-  local angleIncrement = ((angle * 8) * 100.0)
-  local frame_header_num = str_to_number("0x3E", 10)
-  local single_turn_cmd_v1_num = str_to_number("0xA5", 10)
-  local default_motor_id_num = str_to_number("0x01", 10)
-  local data_len_num = str_to_number("0x04", 10)
-  append_list(frame_list, frame_header_num)
-  append_list(frame_list, single_turn_cmd_v1_num)
-  append_list(frame_list, default_motor_id_num)
-  append_list(frame_list, data_len_num)
-  local header_sum_low = (math.fmod((((frame_header_num + single_turn_cmd_v1_num) + default_motor_id_num) + data_len_num), 256))
-  append_list(frame_list, header_sum_low)
-  local direction_str = concat_string("0x", number_to_str(direction, 16))
-  local angle_str = concat_string("0x", number_to_str(angleIncrement, 16))
-  info(angle_str)
-  local low_angle_str = concat_string("0x", number_to_str((math.fmod(str_to_number(angle_str, 16), 256)), 16))
-  local high_angle_str = concat_string("0x", number_to_str(math.floor((str_to_number(angle_str, 16) / 256)), 16))
-  local angleControl_str = number_to_str((str_to_number(angle_str, 16) / 65532), 16)
-  local direction_num = str_to_number(direction_str, 10)
-  local low_angle_num = str_to_number(low_angle_str, 10)
-  local high_angle_num = str_to_number(high_angle_str, 10)
-  append_list(frame_list, direction_num)
-  append_list(frame_list, low_angle_num)
-  append_list(frame_list, high_angle_num)
-  append_list(frame_list, angleControl_str)
-  local data_sum_low = (math.fmod((((direction_num + low_angle_num) + high_angle_num) + str_to_number(angleControl_str, 10)), 256))
-  append_list(frame_list, data_sum_low)
-  return frame_list
+  return send_angle_v2(delta, direction, speed_percentage, motor_id)
 end
 
 local connected = connect()
 if connected then
-    local cmd_list = send_angle(300.0, 0)
+    local cmd_list = move_to_angle_v2(20.0, 75)
     info(cmd_list)
     serial_port_send(1, cmd_list)
     local resp = serial_port_recv(1, 16)
@@ -0,0 +1,625 @@
+"""
+PP 程序的静态检查（只看源码，不连机器人）：性能问题和 ppdk 转 Lua 的坑，main.py 在 to_lua() 之前调用
+
+    python pp_lint.py MyPP/control_robot.py MyPP/security_zone.py
+    python pp_lint.py MyPP/*.py --info        # 同时列出每个循环每轮的 I/O 调用数估计
+
+检查 pp_ / func_ 方法里的 while 循环：
+- 空转：存在一条不经过 wait_ms / wait_*_ms / socket_recv 就进入下一轮的路径（包括没等待就 continue）；
+  计数循环（while i < n，循环体顶层 i += 1、没有 continue）跑完就退出，不算空转
+- 重复 I/O：同一轮里用相同参数多次调用 get_* / read_* 这类读操作（self.func_* 展开计入）
+- 每轮 I/O 调用数：按分支取最少 / 最多，内层循环只计一轮
+
+再按 ppdk 转 Lua 的规则检查 pp_ / func_ 方法（这些写法 Python 里能跑，转出来的 Lua 不对）：
+- 变量第一次赋值所在的块里会加 local，块外读到的是 nil 或旧的全局值；参数在内层块里重新赋值同理
+- 不带值的 return、用 Lua 关键字（end、local ...）做变量名
+- else: 里第一条是 if、后面还有语句：ppdk 把它合成 elseif，后面的语句直接丢掉
+- 字符串原样写进 Lua 的 "..."：不能含换行、回车、制表符、双引号，要写成 Lua 转义 "\\n"（Python 里是反斜杠加 n）
+- func 的定义顺序：ppdk 先写 pp_ 直接调用的 func 所调用的 func，再写 pp_ 直接调用的 func，都按 ast.walk 的发现顺序，
+  每个都是 local function；调用的 func 写在调用者后面或根本没写进去（第三层）时，Lua 里调用到的是 nil
+- ppdk 用 Lua 实现的 builtin（get_list、concat_string ...）只为 pp_ 和它直接调用的 func 写进去，
+  只在第二层 func 里用到的 builtin 在 Lua 里是 nil
+"""
+import argparse
+import ast
+import collections
+import inspect
+
+# ================== 配置 ==================
+# pp.core.robot / pp.core.communication 里会访问控制器或外设的调用
+IO_CALLS = {
+    "clear_fault", "fault", "set_system_state", "get_system_state", "set_global_var", "get_global_var",
+    "update_global_var_jpos", "update_global_var_pose", "update_global_var_coord",
+    "get_io", "set_io", "wait_io_ms", "set_io_pulse_ms",
+    "get_system_di", "get_profinet_slave_di", "get_modbustcp_slave_di", "get_anybus_di",
+    "set_system_do", "set_profinet_slave_do", "set_modbustcp_slave_do", "set_anybus_do",
+    "wait_system_di_ms", "wait_profinet_slave_di_ms", "wait_modbustcp_slave_di_ms", "wait_anybus_di_ms",
+    "set_system_do_pulse_ms", "set_profinet_slave_do_pulse_ms", "set_modbustcp_slave_do_pulse_ms",
+    "set_anybus_do_pulse_ms", "read_trajectory_file", "write_trajectory_file",
+    "set_workcoord", "set_tool", "get_workcoord", "get_tool", "clear_object_pool", "update_object_pool",
+    "modbus_tcp_open", "modbus_tcp_close", "modbus_tcp_read", "modbus_tcp_write", "modbus_tcp_connected",
+    "socket_open", "socket_close", "socket_send", "socket_connected", "socket_recv",
+    "modbus_rtu_open", "modbus_rtu_close", "modbus_rtu_write", "modbus_rtu_read",
+    "serial_port_open", "serial_port_close", "serial_port_send", "serial_port_recv",
+    "read_flx_modbus_tcp_bit", "read_flx_modbus_tcp_int", "read_flx_modbus_tcp_float",
+    "write_flx_modbus_tcp_bit", "write_flx_modbus_tcp_int", "write_flx_modbus_tcp_float",
+    "read_modbus_rtu_int32", "read_modbus_rtu_bit", "read_modbus_rtu_float",
+    "write_modbus_rtu_bit", "write_modbus_rtu_int32", "write_modbus_rtu_float",
+}
+# 会让出 CPU 的调用；socket_recv 阻塞到收到数据或超时
+PACING_CALLS = {
+    "wait_ms", "wait_io_ms", "wait_system_di_ms", "wait_profinet_slave_di_ms",
+    "wait_modbustcp_slave_di_ms", "wait_anybus_di_ms", "socket_recv",
+}
+# 同一轮里参数相同的重复调用只对读操作告警，写操作重复多半是有意的（例如脉冲）
+READ_CALLS = {n for n in IO_CALLS if n.startswith(("get_", "read_"))} | {
+    "socket_connected", "modbus_tcp_connected", "modbus_tcp_read", "modbus_rtu_read",
+}
+REPEAT_THRESHOLD = 2
+# 不能做 Lua 变量名的 Python 合法名字
+LUA_KEYWORDS = {"end", "local", "function", "then", "do", "repeat", "until", "nil", "elseif", "goto"}
+# ppdk 的 pp/core/builtins.py 里用 Lua 实现、按需写进生成文件的函数，其余的是控制器自带的
+LUA_BUILTINS = {
+    "append_list", "compare_dict", "compare_list", "concat_string", "create_list", "first_index_string",
+    "float_to_registers", "get_anybus_di", "get_list", "get_modbustcp_slave_di", "get_profinet_slave_di",
+    "get_system_di", "get_tool", "get_workcoord", "insert_list", "int32_to_registers", "join_list",
+    "last_index_string", "read_flx_modbus_tcp_bit", "read_flx_modbus_tcp_float", "read_flx_modbus_tcp_int",
+    "read_modbus_rtu_bit", "read_modbus_rtu_float", "read_modbus_rtu_int32", "registers_to_float",
+    "registers_to_int32", "remove_list", "remove_sub_list", "remove_sub_string", "set_anybus_do",
+    "set_anybus_do_pulse_ms", "set_list", "set_modbustcp_slave_do", "set_modbustcp_slave_do_pulse_ms",
+    "set_profinet_slave_do", "set_profinet_slave_do_pulse_ms", "set_system_do", "set_system_do_pulse_ms",
+    "set_tool", "set_workcoord", "split_string", "sub_list", "sub_string", "update_global_var_coord",
+    "update_global_var_jpos", "update_global_var_pose", "wait_anybus_di_ms", "wait_modbustcp_slave_di_ms",
+    "wait_profinet_slave_di_ms", "wait_system_di_ms", "write_flx_modbus_tcp_bit", "write_flx_modbus_tcp_float",
+    "write_flx_modbus_tcp_int", "write_modbus_rtu_bit", "write_modbus_rtu_float", "write_modbus_rtu_int32",
+}
+# 字符串原样写进 Lua 的 "..."，这些字符要写成转义
+LUA_RAW_CHARS = {"\n": "\\n", "\r": "\\r", "\t": "\\t", '"': '\\"'}
+
+
+def call_name(node):
+    """wait_ms(...) -> "wait_ms"；self.func_x(...) -> "self.func_x"；其他返回 None"""
+    func = node.func
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id == "self":
+        return "self." + func.attr
+    return None
+
+
+def iter_calls(node):
+    """表达式里的所有调用，不进入 lambda / 嵌套函数"""
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        if isinstance(n, (ast.Lambda, ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        if isinstance(n, ast.Call):
+            yield n
+        stack.extend(ast.iter_child_nodes(n))
+
+
+# ================== 路径统计 ==================
+class Span:
+    """一组执行路径的 I/O 调用数范围；unpaced 表示其中至少一条路径没有等待"""
+    __slots__ = ("lo", "hi", "unpaced")
+
+    def __init__(self, lo=0, hi=0, unpaced=True):
+        self.lo, self.hi, self.unpaced = lo, hi, unpaced
+
+    def then(self, other):
+        return Span(self.lo + other.lo, self.hi + other.hi, self.unpaced and other.unpaced)
+
+
+def either(*spans):
+    spans = [s for s in spans if s is not None]
+    if not spans:
+        return None
+    return Span(min(s.lo for s in spans), max(s.hi for s in spans), any(s.unpaced for s in spans))
+
+
+def then(prefix, span):
+    return None if span is None else prefix.then(span)
+
+
+class Paths:
+    """
+    一段语句的出口：fall 顺序执行到末尾，cont 经 continue 进入下一轮，
+    brk 经 break 离开循环，ret 经 return / raise 离开函数
+    """
+    __slots__ = ("fall", "cont", "brk", "ret")
+
+    def __init__(self, fall=None, cont=None, brk=None, ret=None):
+        self.fall, self.cont, self.brk, self.ret = fall, cont, brk, ret
+
+
+class ProgramLinter:
+    def __init__(self, filename, cls_node):
+        self.filename = filename
+        self.cls = cls_node
+        self.methods = {n.name: n for n in cls_node.body if isinstance(n, ast.FunctionDef)}
+        self._summaries = {}
+        self._active = set()
+        self.findings = []      # (level, line, func, message)
+
+    # ---------- 单条表达式 ----------
+    def expr_span(self, node):
+        io = 0
+        paced = False
+        for call in iter_calls(node):
+            name = call_name(call)
+            if name in IO_CALLS:
+                io += 1
+            if name in PACING_CALLS:
+                paced = True
+            elif name and name.startswith("self."):
+                summary = self.summary(name[5:])
+                if summary is not None:
+                    io += summary.lo
+                    paced = paced or not summary.unpaced
+        return Span(io, io, not paced)
+
+    def expr_span_hi(self, node):
+        """同 expr_span，但 self.func_* 按最多的路径计"""
+        io = 0
+        for call in iter_calls(node):
+            name = call_name(call)
+            if name in IO_CALLS:
+                io += 1
+            elif name and name.startswith("self."):
+                summary = self.summary(name[5:])
+                if summary is not None:
+                    io += summary.hi
+        return io
+
+    def leaf(self, node):
+        span = self.expr_span(node)
+        span.hi = self.expr_span_hi(node)
+        return span
+
+    def summary(self, method):
+        """self.func_x() 整个调用的 I/O 范围和是否一定等待（递归调用按 0 计）"""
+        if method not in self.methods:
+            return None
+        if method in self._summaries:
+            return self._summaries[method]
+        if method in self._active:
+            return Span(0, 0, True)
+        self._active.add(method)
+        paths = self.block(self.methods[method].body)
+        self._active.discard(method)
+        result = either(paths.fall, paths.ret) or Span(0, 0, False)
+        self._summaries[method] = result
+        return result
+
+    # ---------- 语句 ----------
+    def block(self, stmts):
+        cur = Span(0, 0, True)
+        out = Paths()
+        for stmt in stmts:
+            p = self.stmt(stmt)
+            out.cont = either(out.cont, then(cur, p.cont))
+            out.brk = either(out.brk, then(cur, p.brk))
+            out.ret = either(out.ret, then(cur, p.ret))
+            if p.fall is None:
+                return out
+            cur = cur.then(p.fall)
+        out.fall = cur
+        return out
+
+    def stmt(self, node):
+        if isinstance(node, ast.Continue):
+            return Paths(cont=Span())
+        if isinstance(node, ast.Break):
+            return Paths(brk=Span())
+        if isinstance(node, (ast.Return, ast.Raise)):
+            return Paths(ret=self.leaf(node))
+        if isinstance(node, ast.If):
+            test = self.leaf(node.test)
+            body, orelse = self.block(node.body), self.block(node.orelse)
+            return Paths(*(then(test, either(getattr(body, k), getattr(orelse, k)))
+                           for k in ("fall", "cont", "brk", "ret")))
+        if isinstance(node, (ast.While, ast.For)):
+            return self.nested_loop(node)
+        if isinstance(node, (ast.With, ast.AsyncWith)):
+            head = Span(0, 0, True)
+            for item in node.items:
+                head = head.then(self.leaf(item.context_expr))
+            body = self.block(node.body)
+            return Paths(*(then(head, getattr(body, k)) for k in ("fall", "cont", "brk", "ret")))
+        if isinstance(node, ast.Try):
+            body = self.block(node.body + node.orelse + node.finalbody)
+            return body
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            return Paths(fall=Span())
+        return Paths(fall=self.leaf(node))
+
+    def nested_loop(self, node):
+        """作为外层的一条语句：条件算一次，循环体最多算一轮；break 接到 fall，continue 留在内层"""
+        head = self.leaf(node.test if isinstance(node, ast.While) else node.iter)
+        body = self.block(node.body)
+        one = either(body.fall, body.cont, body.brk)
+        forever = isinstance(node, ast.While) and _always_true(node.test)
+        if one is None:
+            fall = head
+        else:
+            fall = Span(head.lo + (one.lo if forever else 0), head.hi + one.hi,
+                        head.unpaced and (one.unpaced or not forever))
+        if forever and body.brk is None:
+            fall = None         # 死循环，不会执行到后面
+        return Paths(fall=fall, ret=then(head, body.ret))
+
+    # ---------- 循环检查 ----------
+    def lint(self):
+        for name, method in self.methods.items():
+            if not name.startswith(("pp_", "func_")):
+                continue
+            for node in ast.walk(method):
+                if isinstance(node, ast.While):
+                    self.lint_loop(name, node)
+
+    def lint_loop(self, func, node):
+        head = self.leaf(node.test)
+        body = self.block(node.body)
+        nxt = either(body.fall, body.cont)
+        iteration = either(then(head, nxt), then(head, body.brk), then(head, body.ret)) or head
+        calls = self.iteration_calls(node)
+
+        if nxt is not None and head.unpaced and then(head, nxt).unpaced and not _counter_bounded(node):
+            polled = sorted({call_name(c) for c in iter_calls(node.test)} & IO_CALLS)
+            via_continue = body.cont is not None and body.cont.unpaced and not (
+                body.fall is not None and body.fall.unpaced)
+            self.findings.append(("WARN", node.lineno, func,
+                                  "no wait_ms on some path to the next iteration"
+                                  + (" (via continue)" if via_continue else "")
+                                  + (f", busy-polls {', '.join(polled)}" if polled else "")))
+
+        repeated = collections.Counter(key for key, name in calls if name in READ_CALLS)
+        for key, n in sorted(repeated.items(), key=lambda kv: -kv[1]):
+            if n >= REPEAT_THRESHOLD:
+                self.findings.append(("WARN", node.lineno, func,
+                                      f"{key} called up to {n} times per iteration, read it once into a local"))
+
+        names = collections.Counter(name for _, name in calls)
+        sites = ", ".join(f"{name} x{n}" for name, n in names.most_common(5))
+        self.findings.append(("INFO", node.lineno, func,
+                              f"{iteration.lo}..{iteration.hi} I/O calls per iteration"
+                              + (f"; call sites: {sites}" if sites else "")))
+
+    def iteration_calls(self, loop):
+        """一轮里出现的 I/O 调用 (源码, 名字)：含条件和展开的 self.func_*，不含内层循环体"""
+        out = []
+        self._collect(loop.test, out, set())
+        for stmt in loop.body:
+            self._collect(stmt, out, set())
+        return out
+
+    def _collect(self, node, out, seen):
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            if isinstance(n, (ast.Lambda, ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            if isinstance(n, (ast.While, ast.For)):
+                stack.append(n.test if isinstance(n, ast.While) else n.iter)
+                continue
+            if isinstance(n, ast.Call):
+                name = call_name(n)
+                if name in IO_CALLS:
+                    out.append((ast.unparse(n), name))
+                elif name and name.startswith("self.") and name[5:] in self.methods and name[5:] not in seen:
+                    method = self.methods[name[5:]]
+                    for stmt in method.body:
+                        self._collect(stmt, out, seen | {name[5:]})
+            stack.extend(ast.iter_child_nodes(n))
+
+
+def _always_true(test):
+    return isinstance(test, ast.Constant) and bool(test.value)
+
+
+def _counter_bounded(loop):
+    """while i < n 这类计数循环：条件是变量和界的比较，循环体顶层每轮都改这个变量，没有 continue 跳过它"""
+    test = loop.test
+    if not (isinstance(test, ast.Compare) and len(test.ops) == 1
+            and isinstance(test.ops[0], (ast.Lt, ast.LtE, ast.Gt, ast.GtE))):
+        return False
+    names = {side.id for side in (test.left, test.comparators[0]) if isinstance(side, ast.Name)}
+    stepped = any(isinstance(stmt, ast.AugAssign) and isinstance(stmt.target, ast.Name)
+                  and stmt.target.id in names and isinstance(stmt.op, (ast.Add, ast.Sub))
+                  for stmt in loop.body)
+    if not stepped:
+        return False
+    # 内层循环里的 continue 不影响这一层
+    stack = list(loop.body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Continue):
+            return False
+        if isinstance(node, (ast.While, ast.For, ast.FunctionDef, ast.Lambda)):
+            continue
+        stack.extend(ast.iter_child_nodes(node))
+    return True
+
+
+# ================== 转 Lua 检查 ==================
+class LuaScopeLinter:
+    """
+    按 ppdk 的翻译方式走一遍方法体：变量第一次赋值时在所在块加 local，之后的赋值都不加
+    块用路径（外层到内层的块编号）表示；一次读取前，当前块或某个外层块里要有一次有效的赋值：
+    第一次赋值只在它所在的块（及内层）有效，之后在别处的赋值写的是全局变量，在所在块（及内层）有效
+    """
+
+    def __init__(self, method):
+        self.method = method
+        self.params = {a.arg for a in method.args.args[1:]}
+        self.valid = {name: [()] for name in self.params}     # 名字 -> 赋值有效的块路径
+        self.first = {}         # 名字 -> 第一次赋值的行号
+        self.findings = []      # (line, message)
+        self._blocks = 0
+
+    def lint(self):
+        self.block(self.method.body, ())
+        return self.findings
+
+    def child(self, path):
+        self._blocks += 1
+        return path + (self._blocks,)
+
+    def block(self, stmts, path):
+        for stmt in stmts:
+            self.stmt(stmt, path)
+
+    def stmt(self, node, path):
+        if isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
+            return      # docstring 转成 Lua 注释
+        if isinstance(node, ast.Return) and node.value is None:
+            self.findings.append((node.lineno, "bare return, ppdk cannot translate it; return a value"))
+            return
+        if isinstance(node, ast.Assign):
+            self.read(node.value, path)
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    self.store(target.id, path, node.lineno)
+                else:
+                    self.read(target, path)
+        elif isinstance(node, ast.AugAssign):
+            self.read(node.value, path)
+            self.read(node.target, path)
+        elif isinstance(node, ast.If):
+            if len(node.orelse) > 1 and isinstance(node.orelse[0], ast.If):
+                self.findings.append((node.orelse[1].lineno,
+                                      f"else: starting with an if becomes elseif in Lua and the "
+                                      f"{len(node.orelse) - 1} statements after that if are dropped; "
+                                      f"move them out of the else or put the if after them"))
+            self.read(node.test, path)
+            self.block(node.body, self.child(path))
+            self.block(node.orelse, self.child(path))
+        elif isinstance(node, ast.While):
+            self.read(node.test, path)
+            self.block(node.body, self.child(path))
+        elif isinstance(node, ast.For):
+            self.read(node.iter, path)
+            body = self.child(path)
+            if isinstance(node.target, ast.Name):
+                self.valid[node.target.id] = [body]
+            self.block(node.body, body)
+        elif isinstance(node, ast.Try):
+            for stmts in [node.body] + [h.body for h in node.handlers] + [node.orelse, node.finalbody]:
+                self.block(stmts, self.child(path))
+        else:
+            self.read(node, path)
+
+    def store(self, name, path, line):
+        if name in LUA_KEYWORDS:
+            self.findings.append((line, f"variable {name} is a Lua keyword, rename it"))
+        if name in self.params and name not in self.first:
+            # 参数不在 ppdk 的符号表里，第一次赋值也会加 local，块外还是原来的参数
+            self.first[name] = line
+            if path:
+                self.findings.append((line, f"parameter {name} reassigned inside a block only changes a local of "
+                                            f"that block; copy it to a new variable at the top of the method"))
+            self.valid.setdefault(name, []).append(path)
+            return
+        if name in self.valid:
+            self.valid[name].append(path)
+            return
+        self.first[name] = line
+        self.valid[name] = [path]
+
+    def read(self, node, path):
+        for n in ast.walk(node):
+            if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Load) and n.id in self.valid:
+                if not any(path[:len(p)] == p for p in self.valid[n.id]):
+                    self.findings.append((n.lineno, f"{n.id} is first assigned inside a block (line {self.first[n.id]}) "
+                                                    f"and is nil here in Lua; assign it before the block"))
+                    self.valid[n.id].append(path)     # 同一个变量只报一次
+            elif isinstance(n, ast.Constant) and isinstance(n.value, str):
+                problem = _lua_string_problem(n.value)
+                if problem:
+                    self.findings.append((n.lineno, f"string {n.value!r} goes into Lua as is: {problem}"))
+
+
+def _lua_string_problem(text):
+    """ppdk 把字符串原样放进 Lua 的 "..."，返回第一个问题，没问题返回空字符串"""
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if char == "\\":
+            nxt = text[index + 1:index + 2]
+            if not nxt or not (nxt in "abfnrtvxz\\\"'" or nxt.isdigit()):
+                return "a backslash that is not a Lua escape, write it as \\\\"
+            index += 1
+        elif char in LUA_RAW_CHARS:
+            return f"write {char!r} as the Lua escape {LUA_RAW_CHARS[char]}"
+        index += 1
+    return ""
+
+
+def called_funcs(method):
+    """同 ppdk 的 _get_funcs：方法体里 self.func_* 调用的名字，按 ast.walk 的顺序去重"""
+    names = []
+    for n in ast.walk(ast.Module(body=method.body, type_ignores=[])):
+        if isinstance(n, ast.Call):
+            name = call_name(n)
+            if name and name.startswith("self.func_") and name[5:] not in names:
+                names.append(name[5:])
+    return names
+
+
+def called_builtins(method):
+    """方法体里调用的 LUA_BUILTINS {名字: 第一次调用的行号}"""
+    names = {}
+    for n in ast.walk(ast.Module(body=method.body, type_ignores=[])):
+        if isinstance(n, ast.Call) and isinstance(n.func, ast.Name) and n.func.id in LUA_BUILTINS:
+            names.setdefault(n.func.id, n.lineno)
+    return names
+
+
+def lua_func_order(pp_method, methods):
+    """ppdk 写进 <程序名>.lua 的 func 顺序：先是直接调用的 func 所调用的 func，再是直接调用的 func"""
+    direct = [name for name in called_funcs(pp_method) if name in methods]
+    order = []
+    for name in direct:
+        for inner in called_funcs(methods[name]):
+            if inner in methods and inner not in order:
+                order.append(inner)
+    for name in direct:
+        if name not in order:
+            order.append(name)
+    return order
+
+
+def lint_func_order(pp_method, methods):
+    """调用的 func 在 Lua 里写在调用者后面（或没写）就是调用 nil，返回 [(line, message)]"""
+    order = lua_func_order(pp_method, methods)
+    findings = []
+    for index, name in enumerate(order):
+        for callee in called_funcs(methods[name]):
+            if callee == name or callee not in methods:
+                continue    # local function 里可以递归调用自己；找不到定义的交给 ppdk 报错
+            if callee not in order:
+                where = "does not write it"
+            elif order.index(callee) > index:
+                where = "writes it after the caller"
+            else:
+                continue
+            findings.append((pp_method.lineno, f"{name} calls {callee} but ppdk {where} in "
+                                               f"{pp_method.name[3:]}.lua, so it is nil there; inline it into {name}"))
+    # builtin 只为 pp_ 和它直接调用的 func 写进去
+    written = set(called_builtins(pp_method))
+    direct = [name for name in called_funcs(pp_method) if name in methods]
+    for name in direct:
+        written |= set(called_builtins(methods[name]))
+    for name in order:
+        if name in direct:
+            continue
+        for builtin, line in called_builtins(methods[name]).items():
+            if builtin not in written:
+                findings.append((pp_method.lineno, f"{name} calls builtin {builtin} but ppdk only writes the "
+                                                   f"builtins used by {pp_method.name} and the funcs it calls "
+                                                   f"directly, so it is nil in {pp_method.name[3:]}.lua"))
+    return findings
+
+
+def class_nodes(source, filename):
+    """文件里的类 {类名: ClassDef}"""
+    return {node.name: node for node in ast.parse(source, filename).body if isinstance(node, ast.ClassDef)}
+
+
+def all_methods(node, classes):
+    """类自己的方法加上 classes 里找得到的基类的方法，子类的覆盖基类的"""
+    methods = {}
+    for base in node.bases:
+        name = base.id if isinstance(base, ast.Name) else getattr(base, "attr", None)
+        if name in classes and classes[name] is not node:
+            methods.update(all_methods(classes[name], classes))
+    methods.update({n.name: n for n in node.body if isinstance(n, ast.FunctionDef)})
+    return methods
+
+
+# ================== 入口 ==================
+def lint_source(source, filename, class_name=None, classes=None):
+    """
+    返回 [(level, filename, line, func, message)]
+    class_name 为空时检查所有带 pp_ 方法的类，只有 func_ 的基类（*Task 这类）只做转 Lua 检查
+    classes 是别的文件里的类 {类名: ClassDef}，用来找基类里的 func_
+    """
+    tree = ast.parse(source, filename)
+    known = dict(classes or {})
+    known.update(class_nodes(source, filename))
+    findings = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        if class_name is not None and node.name != class_name:
+            continue
+        prefixes = {n.name.split("_")[0] for n in node.body if isinstance(n, ast.FunctionDef)}
+        if class_name is None and not prefixes & {"pp", "func"}:
+            continue
+        linter = ProgramLinter(filename, node)
+        if class_name is not None or "pp" in prefixes:
+            linter.lint()
+        for name, method in linter.methods.items():
+            if name.startswith(("pp_", "func_")):
+                linter.findings += [("WARN", line, name, msg) for line, msg in LuaScopeLinter(method).lint()]
+        methods = all_methods(node, known)
+        for name, method in linter.methods.items():
+            if name.startswith("pp_"):
+                linter.findings += [("WARN", line, name, msg) for line, msg in lint_func_order(method, methods)]
+        findings += [(level, filename, line, func, msg)
+                     for level, line, func, msg in sorted(linter.findings, key=lambda f: (f[1], f[0] != "WARN"))]
+    return findings
+
+
+def lint_pp(pp, show_info=False):
+    """检查一个 ParallelProgram 实例（或类）及其基类（GripperTask 这类）的源码，打印结果，返回告警条数"""
+    cls = pp if inspect.isclass(pp) else type(pp)
+    sources = []
+    classes = {}
+    for klass in cls.__mro__:
+        if klass.__module__.split(".")[0] in ("pp", "builtins"):
+            continue
+        filename = inspect.getsourcefile(klass)
+        with open(filename, encoding="utf-8") as f:
+            source = f.read()
+        sources.append((source, filename, klass.__name__))
+        classes[klass.__name__] = class_nodes(source, filename)[klass.__name__]
+    findings = []
+    for source, filename, name in sources:
+        findings += lint_source(source, filename, name, classes)
+    return print_findings(findings, show_info)
+
+
+def print_findings(findings, show_info=False):
+    warnings = 0
+    for level, filename, line, func, msg in findings:
+        if level == "WARN":
+            warnings += 1
+        elif not show_info:
+            continue
+        print(f"[{level}] {filename}:{line} {func}: {msg}")
+    if warnings == 0:
+        print("[INFO] pp_lint: no warnings")
+    return warnings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Static performance and Lua translation checks for PP programs")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--info", action="store_true", help="also print I/O calls per iteration for every loop")
+    args = parser.parse_args()
+    sources = []
+    classes = {}
+    for filename in args.files:
+        with open(filename, encoding="utf-8") as f:
+            sources.append((f.read(), filename))
+        classes.update(class_nodes(sources[-1][0], filename))
+    findings = []
+    for source, filename in sources:
+        findings += lint_source(source, filename, classes=classes)
+    return 1 if print_findings(findings, args.info) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,97 @@
+"""
+在虚拟时钟上比较 1KB 应答的解码耗时：MyPP/kv_reply.py 的 kv1 解码 vs 逐字符 sub_string 扫一遍（原 JSON 解析器的下限）
+仿真按调用次数计时，不按字符串长度，split_string 这类一次调用处理整串的 builtin 实际会比这里慢一些
+
+    # 在 PP_Routine 目录下
+    python simulator/bench_kv.py --size 1024 --runs 50
+"""
+import argparse
+import os
+import sys
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(SIM_DIR), "SocketService"))   # socket_main.encode_kv
+sys.path.insert(0, os.path.dirname(SIM_DIR))
+sys.path.insert(0, SIM_DIR)
+
+from sim_runtime import runtime  # noqa: E402
+from pp.core.basic import get_list, sub_string, split_string  # noqa: E402
+from MyPP.kv_reply import KvReply  # noqa: E402
+from socket_main import encode_kv  # noqa: E402
+
+
+def sample_reply(size):
+    """凑一条 size 字节左右的应答：数字、带转义的字符串、列表各占一部分"""
+    record = {}
+    i = 0
+    while len(encode_kv(record).encode()) < size:
+        kind = i % 3
+        if kind == 0:
+            record[f"n{i}"] = i * 0.125
+        elif kind == 1:
+            record[f"s{i}"] = f"item;{i},x"
+        else:
+            record[f"l{i}"] = [i, i + 1, i + 2]
+        i += 1
+    return encode_kv(record) + "\n"
+
+
+class KvBench(KvReply):
+
+    def __init__(self, reply, runs):
+        super().__init__()
+        self.pp_reply = reply
+        self.pp_runs = runs
+
+    def pp_kv_decode(self):
+        """只解码"""
+        run = 0
+        while run < self.pp_runs:
+            self.func_kv_decode(self.pp_reply)
+            run += 1
+
+    def pp_kv_read_all(self):
+        """解码，再按下标把每个值都取出来（字符串还原转义，列表拆开）"""
+        run = 0
+        while run < self.pp_runs:
+            count = self.func_kv_decode(self.pp_reply)
+            index = 0
+            while index < count:
+                key = get_list(self.pp_kv_fields, 2 + index * 2)
+                value = get_list(self.pp_kv_fields, 3 + index * 2)
+                if sub_string(key, 0, 1) == "s":
+                    value = self.func_kv_unescape(value)
+                elif sub_string(key, 0, 1) == "l":
+                    value = split_string(value, ",")
+                index += 1
+            run += 1
+
+    def pp_char_walk(self):
+        """每个字符一次 sub_string，原 func_parse_* 每个字符要比较 2~3 次，实际更慢"""
+        run = 0
+        while run < self.pp_runs:
+            index = 0
+            length = len(self.pp_reply)
+            while index < length:
+                char = sub_string(self.pp_reply, index, index + 1)
+                index += 1
+            run += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PP-side reply decoding on the virtual clock")
+    parser.add_argument("--size", type=int, default=1024, help="reply size in bytes")
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    reply = sample_reply(args.size)
+    runtime.quiet = True
+    runtime.run(KvBench(reply, args.runs), 3600)
+    print(f"[BENCH] reply {len(reply.encode())} bytes, {reply.split(';')[1]} records")
+    for task in runtime.tasks:
+        print(f"[BENCH] {task.name:14s} {task.t / args.runs:8.3f} ms/decode (virtual)"
+              + (f"  error: {task.error}" if task.error else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""
+pp 包的离线替身（只在 simulator/run_pp.py 里用），接口与 ppdk 的 pp 包一致，实现在 sim_runtime
+真机部署（to_lua / assign / start）仍然用 ppdk 的 pp 包
+"""
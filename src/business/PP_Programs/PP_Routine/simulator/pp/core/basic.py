@@ -0,0 +1,253 @@
+"""pp.core.basic 的离线实现，语义照 ppdk builtins 里的 Lua 版本（下标从 0 开始，越界 assert）"""
+import math
+import re
+import struct
+
+from pp.enums import *
+from sim_runtime import LuaList, builtin, enum_value, runtime
+
+_list = list      # 下面的函数沿用 ppdk 的参数名 list，会遮住内置的 list
+
+
+def lua_tostring(value):
+    """Lua 5.3 的 tostring：整数原样，浮点数 %.14g 且整值补 .0"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "inf" if value > 0 else "-inf"
+        if math.isnan(value):
+            return "nan"
+        text = "%.14g" % value
+        return text + ".0" if re.fullmatch(r"-?\d+", text) else text
+    return str(value)
+
+
+def _concat(values, delim=""):
+    for value in values:
+        assert isinstance(value, (str, int, float)) and not isinstance(value, bool), \
+            f"invalid value (a {type(value).__name__}) for 'concat'"
+    return delim.join(lua_tostring(v) for v in values)
+
+
+_LUA_CLASSES = {"d": r"\d", "s": r"\s", "a": "[A-Za-z]", "w": "[A-Za-z0-9]", "l": "[a-z]", "u": "[A-Z]"}
+
+
+def _lua_pattern(pattern):
+    """split_string 用 string.find 按 Lua 模式匹配，这里只转常见写法（%x 转义、字符类、. * + - ?）"""
+    out = []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "%" and i + 1 < len(pattern):
+            nxt = pattern[i + 1]
+            out.append(_LUA_CLASSES.get(nxt, re.escape(nxt)))
+            i += 2
+            continue
+        if ch == "-":
+            out.append("*?")
+        elif ch in ".[]*+?^$":
+            out.append(ch)
+        else:
+            out.append(re.escape(ch))
+        i += 1
+    return re.compile("".join(out))
+
+
+@builtin()
+def wait_ms(duration: int):
+    runtime.sleep(duration)
+
+
+@builtin()
+def create_list(*args):
+    return LuaList(args)
+
+
+@builtin()
+def insert_list(list: list, index: int, value) -> list:
+    assert isinstance(index, (int, float)), "index must be a number"
+    assert 0 <= index <= len(list), "index out of range"
+    list.insert(int(index), value)
+    return list
+
+
+@builtin()
+def remove_list(list: list, index: int) -> object:
+    assert len(list) != 0, "empty list"
+    assert isinstance(index, (int, float)), "index must be a number"
+    assert 0 <= index <= len(list) - 1, "index out of range"
+    return list.pop(int(index))
+
+
+@builtin()
+def get_list(list: list, index: int) -> object:
+    assert len(list) != 0, "empty list"
+    assert isinstance(index, (int, float)), "index must be a number"
+    assert 0 <= index <= len(list) - 1, "index out of range"
+    return _list.__getitem__(list, int(index))
+
+
+@builtin()
+def set_list(list: list, index: int, value) -> list:
+    assert len(list) != 0, "empty list"
+    assert isinstance(index, (int, float)), "index must be a number"
+    assert 0 <= index <= len(list) - 1, "index out of range"
+    _list.__setitem__(list, int(index), value)
+    return list
+
+
+@builtin()
+def first_index_string(string: str, substring: str):
+    return string.find(substring)
+
+
+@builtin()
+def last_index_string(string: str, substring: str):
+    return string.rfind(substring)
+
+
+@builtin()
+def split_string(string: str, delim: str):
+    pattern = _lua_pattern(delim)
+    parts = LuaList()
+    pos = 0
+    while True:
+        match = pattern.search(string, pos)
+        if match is None:
+            parts.append(string[pos:])
+            return parts
+        parts.append(string[pos:match.start()])
+        pos = match.start() + len(delim)
+
+
+@builtin()
+def to_string(value, format: NumberFormatEnum):
+    base = enum_value(format)
+    if base == 10:
+        return lua_tostring(value)
+    spec = {16: "X", 8: "o", 2: "b"}[base]
+    value = int(value)
+    return ("-" if value < 0 else "") + f"{abs(value):{spec}}"
+
+
+@builtin()
+def to_number(string: str, format: NumberFormatEnum):
+    """与 Lua tonumber 一样，转换失败返回 None（nil）"""
+    base = enum_value(format)
+    text = str(string).strip()
+    try:
+        if base == 10:
+            return int(text) if re.fullmatch(r"[+-]?\d+", text) else float(text)
+        return int(text, base)
+    except ValueError:
+        return None
+
+
+@builtin()
+def concat_string(*args):
+    return _concat(args)
+
+
+@builtin()
+def join_list(list: list, delim: str):
+    return _concat(list, delim)
+
+
+@builtin()
+def sub_string(string: str, start: int, end: int):
+    length = len(string)
+    if start < 0:
+        start = length + start
+    if end < 0:
+        end = length + end
+    assert 0 <= start <= length, "Start index out of range"
+    assert 0 <= end <= length, "End index out of range"
+    assert start <= end, "Start index must less equal than end index"
+    return string[start:end]
+
+
+@builtin()
+def int32_to_registers(value: int):
+    if value < 0:
+        value = 4294967296 + value
+    return LuaList([math.floor(value / 65536), value % 65536])
+
+
+@builtin()
+def float_to_registers(value: float):
+    bits = struct.unpack(">I", struct.pack(">f", value))[0]
+    return LuaList([bits // 65536, bits % 65536])
+
+
+@builtin()
+def registers_to_int32(high, low):
+    value = high * 65536 + low
+    if value >= 2147483648:
+        value = value - 4294967296
+    return value
+
+
+@builtin()
+def registers_to_float(high, low):
+    bits = high * 65536 + low
+    if bits == 0:
+        return 0.0
+    sign = -1 if bits >= 0x80000000 else 1
+    exponent = math.floor(bits / 0x800000) % 0x100
+    mantissa = bits % 0x800000
+    return sign * (1 + mantissa / 2 ** 23) * 2.0 ** (exponent - 127)
+
+
+@builtin()
+def sub_list(list: list, start: int, end: int):
+    assert 0 <= start, "Start index error: start must greater equal than 0"
+    assert start <= end, "Index error: end must greater equal than start"
+    assert end <= len(list), "End index error: end must less equal than length of list"
+    return LuaList(_list.__getitem__(list, slice(start, end)))
+
+
+@builtin()
+def append_list(list: list, value: object):
+    list.append(value)
+    return list
+
+
+@builtin()
+def remove_sub_list(list: list, start: int, end: int):
+    assert 0 <= start, "Start index error: start must greater equal than 0"
+    assert start <= end, "Index error: end must greater equal than start"
+    assert end <= len(list), "End index error: end must less equal than length of list"
+    removed = LuaList(_list.__getitem__(list, slice(start, end)))
+    del list[start:end]
+    return removed
+
+
+@builtin()
+def remove_sub_string(string: str, start: int, end: int):
+    assert 0 <= start, "Start index error: start must greater equal than 0"
+    assert start <= end, "Index error: end must greater equal than start"
+    assert end <= len(string), "End index error: end must less equal than length of string"
+    return string[:start] + string[end:]
+
+
+@builtin()
+def compare_list(list1: list, list2: list):
+    if not isinstance(list1, _list) or not isinstance(list2, _list):
+        return False
+    return list1 == list2
+
+
+@builtin()
+def compare_dict(dict1: dict, dict2: dict):
+    return dict1 == dict2
+
+
+@builtin()
+def coord_inverse(coord):
+    raise NotImplementedError("coord_inverse is not simulated")
+
+
+@builtin()
+def coord_multiply(coord1, coord2):
+    raise NotImplementedError("coord_multiply is not simulated")
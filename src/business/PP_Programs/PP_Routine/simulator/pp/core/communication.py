@@ -0,0 +1,376 @@
+"""
+pp.core.communication 的离线实现
+- socket_*：真的连 TCP（默认把地址换成 127.0.0.1，可以直接对接 SocketService 里的服务），耗时按实测计
+- modbus_tcp_* / modbus_rtu_*：每个 master 对应一个内存里的从站（线圈、离散输入、保持寄存器、输入寄存器）
+  rtu 按波特率计请求和应答帧的发送时间；runtime.rtu_faults 里登记了函数就按它注入超时 / CRC 错
+- serial_port_*：默认环回，runtime.serial_responders 里登记了应答函数就按它回
+flx / rtu 的封装函数照 ppdk builtins 的地址映射和 [low, high] 顺序
+"""
+import socket
+import time
+from typing import List
+
+from pp.enums import *
+from pp.core.basic import float_to_registers, int32_to_registers, registers_to_float, registers_to_int32
+from sim_runtime import LuaList, builtin, enum_value, runtime
+
+_READ_TABLES = {0: "coils", 1: "holding", 2: "discrete", 3: "input"}
+_WRITE_TABLES = {0: "coils", 1: "holding"}
+
+
+def _check_ids(master_id, slave_id):
+    assert 1 <= master_id <= 5, "master id must be between 1 and 5"
+    assert 1 <= slave_id <= 247, "slave id must be between 1 and 247"
+
+
+def _read(master, quantity, type, address):
+    name = _READ_TABLES[enum_value(type)]
+    table = runtime.registers[(master, name)]
+    values = [table.get(address + i, 0) for i in range(quantity)]
+    if name in ("coils", "discrete") and runtime.modbus_bits_as_strings:
+        values = [str(int(bool(v))) for v in values]
+    return LuaList(values)
+
+
+def _write(master, quantity, type, address, value):
+    name = _WRITE_TABLES[enum_value(type)]
+    table = runtime.registers[(master, name)]
+    value = list(value)     # LuaList 的下标从 1 开始
+    for i in range(quantity):
+        v = value[i] if i < len(value) else 0
+        table[address + i] = int(bool(v)) if name == "coils" else int(v)
+    return True
+
+
+def _pairs_to_values(data, convert):
+    # data 是 [low0, high0, low1, high1, ...]
+    data = list(data)
+    return LuaList(convert(data[2 * i + 1], data[2 * i]) for i in range(len(data) // 2))
+
+
+def _values_to_pairs(data, convert):
+    values = []
+    for raw in data:
+        high, low = convert(raw)
+        values += [low, high]
+    return values
+
+
+# ================== Modbus TCP ==================
+@builtin(io=True)
+def modbus_tcp_open(master_id: int, ip: str, port: int):
+    if ip in runtime.modbus_offline:
+        return False
+    runtime.modbus_masters[master_id] = ip
+    return True
+
+
+@builtin(io=True)
+def modbus_tcp_close(master_id: int):
+    runtime.modbus_masters.pop(master_id, None)
+
+
+@builtin(io=True)
+def modbus_tcp_connected(master_id: int):
+    ip = runtime.modbus_masters.get(master_id)
+    return ip is not None and ip not in runtime.modbus_offline
+
+
+def _tcp_master(master_id):
+    assert modbus_tcp_connected(master_id), f"modbus tcp master {master_id} is not open"
+    return master_id
+
+
+@builtin(io=True)
+def modbus_tcp_read(master_id: int, slave_id: int, quantity: int, type: ModbusReadTypeEnum, address: int):
+    return _read(_tcp_master(master_id), quantity, type, address)
+
+
+@builtin(io=True)
+def modbus_tcp_write(master_id: int, slave_id: int, quantity: int, type: ModbusWriteTypeEnum, address: int,
+                     value: list):
+    return _write(_tcp_master(master_id), quantity, type, address, value)
+
+
+@builtin(io=True)
+def read_flx_modbus_tcp_bit(master_id: int, slave_id: int, offset: int, length: int):
+    _check_ids(master_id, slave_id)
+    assert 0 <= offset <= 255, "offset must be between 0 and 255"
+    assert 1 <= length <= 256, "length must be between 1 and 256"
+    return modbus_tcp_read(master_id, slave_id, length, 0, offset)
+
+
+@builtin(io=True)
+def read_flx_modbus_tcp_int(master_id: int, slave_id: int, offset: int, length: int):
+    _check_ids(master_id, slave_id)
+    assert 0 <= offset <= 63, "offset must be between 0 and 63"
+    assert 1 <= length <= 64, "length must be between 1 and 64"
+    data = modbus_tcp_read(master_id, slave_id, length * 2, 1, 176 + offset * 2)
+    return _pairs_to_values(data, registers_to_int32)
+
+
+@builtin(io=True)
+def read_flx_modbus_tcp_float(master_id: int, slave_id: int, offset: int, length: int):
+    _check_ids(master_id, slave_id)
+    assert 0 <= offset <= 63, "offset must be between 0 and 63"
+    assert 1 <= length <= 64, "length must be between 1 and 64"
+    data = modbus_tcp_read(master_id, slave_id, length * 2, 1, 304 + offset * 2)
+    return _pairs_to_values(data, registers_to_float)
+
+
+@builtin(io=True)
+def write_flx_modbus_tcp_bit(master_id: int, slave_id: int, offset: int, data: List[bool]):
+    _check_ids(master_id, slave_id)
+    assert 0 <= offset <= 255, "offset must be between 0 and 255"
+    assert 1 <= len(data) <= 256, "length of data must be between 1 and 256"
+    return modbus_tcp_write(master_id, slave_id, len(data), 0, offset, data)
+
+
+@builtin(io=True)
+def write_flx_modbus_tcp_int(master_id: int, slave_id: int, offset: int, data: List[int]):
+    _check_ids(master_id, slave_id)
+    assert 0 <= offset <= 63, "offset must be between 0 and 63"
+    assert 1 <= len(data) <= 64, "length of data must be between 1 and 64"
+    values = _values_to_pairs(data, int32_to_registers)
+    return modbus_tcp_write(master_id, slave_id, len(data) * 2, 1, 16 + offset * 2, values)
+
+
+@builtin(io=True)
+def write_flx_modbus_tcp_float(master_id: int, slave_id: int, offset: int, data: List[float]):
+    _check_ids(master_id, slave_id)
+    assert 0 <= offset <= 63, "offset must be between 0 and 63"
+    assert 1 <= len(data) <= 64, "length of data must be between 1 and 64"
+    values = _values_to_pairs(data, float_to_registers)
+    return modbus_tcp_write(master_id, slave_id, len(data) * 2, 1, 144 + offset * 2, values)
+
+
+# ================== Modbus RTU ==================
+@builtin(io=True)
+def modbus_rtu_open(master_id: int, port: str, baud_rate: BaudRateEnum, parity: PartityEnum,
+                    data_bits: DataBitsEnum = DataBitsEnum.BIT_8, stop_bits: StopBitsEnum = StopBitsEnum.BIT_1):
+    runtime.rtu_masters[master_id] = {"port": port, "baud": enum_value(baud_rate)}
+    return True
+
+
+@builtin(io=True)
+def modbus_rtu_close(master_id: int):
+    runtime.rtu_masters.pop(master_id, None)
+
+
+def _rtu_master(master_id):
+    assert master_id in runtime.rtu_masters, f"modbus rtu master {master_id} is not open"
+    return ("rtu", master_id)
+
+
+def _rtu_transfer(master_id, request_bytes, reply_bytes):
+    """
+    一问一答的总线时间：两帧的字节加上每帧后 3.5 个字符的静默，每字符 10 位
+    返回 None 表示正常，"timeout" / "crc" 表示这次事务按 runtime.rtu_faults 注入的故障处理
+    超时等 runtime.rtu_timeout_ms；CRC 错的应答照样占满总线时间
+    """
+    baud = runtime.rtu_masters[master_id]["baud"]
+    fault = runtime.rtu_faults.get(master_id)
+    fault = fault(runtime.now_s) if fault else None
+    if fault == "timeout":
+        runtime.sleep((request_bytes + 3.5) * 10 / baud * 1000 + runtime.rtu_timeout_ms)
+    else:
+        runtime.sleep((request_bytes + reply_bytes + 7) * 10 / baud * 1000)
+    return fault
+
+
+@builtin(io=True)
+def modbus_rtu_write(master_id: int, slave_id: int, quantity: int, type: ModbusWriteTypeEnum, address: int,
+                     value: list[int]):
+    master = _rtu_master(master_id)
+    data_bytes = (quantity + 7) // 8 if enum_value(type) == 0 else quantity * 2
+    if _rtu_transfer(master_id, 9 + data_bytes, 8) is not None:
+        return False
+    return _write(master, quantity, type, address, value)
+
+
+@builtin(io=True)
+def modbus_rtu_read(master_id: int, slave_id: int, quantity: int, type: ModbusReadTypeEnum, address: int):
+    """超时返回空表；CRC 错返回少最后一个数的表（半截应答）"""
+    master = _rtu_master(master_id)
+    data_bytes = (quantity + 7) // 8 if enum_value(type) in (0, 2) else quantity * 2
+    fault = _rtu_transfer(master_id, 8, 5 + data_bytes)
+    if fault == "timeout":
+        return LuaList()
+    values = _read(master, quantity, type, address)
+    if fault == "crc":
+        return LuaList(values[:-1])
+    return values
+
+
+@builtin(io=True)
+def read_modbus_rtu_int32(master_id: int, slave_id: int, offset: int, type: ModbusReadTypeEnum, length: int):
+    _check_ids(master_id, slave_id)
+    assert 0 <= offset <= 63, "offset must be between 0 and 63"
+    assert 1 <= length <= 64, "length must be between 1 and 64"
+    data = modbus_rtu_read(master_id, slave_id, length * 2, type, offset * 2)
+    return _pairs_to_values(data, registers_to_int32)
+
+
+@builtin(io=True)
+def read_modbus_rtu_bit(master_id: int, slave_id: int, offset: int, type: ModbusReadTypeEnum, length: int):
+    _check_ids(master_id, slave_id)
+    assert 0 <= offset <= 255, "offset must be between 0 and 255"
+    assert 1 <= length <= 256, "length must be between 1 and 256"
+    return modbus_rtu_read(master_id, slave_id, length, type, offset)
+
+
+@builtin(io=True)
+def read_modbus_rtu_float(master_id: int, slave_id: int, offset: int, type: ModbusReadTypeEnum, length: int):
+    _check_ids(master_id, slave_id)
+    assert 0 <= offset <= 63, "offset must be between 0 and 63"
+    assert 1 <= length <= 64, "length must be between 1 and 64"
+    data = modbus_rtu_read(master_id, slave_id, length * 2, type, offset * 2)
+    return _pairs_to_values(data, registers_to_float)
+
+
+@builtin(io=True)
+def write_modbus_rtu_bit(master_id: int, slave_id: int, offset: int, data: List[bool]):
+    _check_ids(master_id, slave_id)
+    assert 0 <= offset <= 255, "offset must be between 0 and 255"
+    assert 1 <= len(data) <= 256, "length of data must be between 1 and 256"
+    return modbus_rtu_write(master_id, slave_id, len(data), 0, offset, data)
+
+
+@builtin(io=True)
+def write_modbus_rtu_int32(master_id: int, slave_id: int, offset: int, data: List[int]):
+    _check_ids(master_id, slave_id)
+    assert 0 <= offset <= 63, "offset must be between 0 and 63"
+    assert 1 <= len(data) <= 64, "length of data must be between 1 and 64"
+    values = _values_to_pairs(data, int32_to_registers)
+    return modbus_rtu_write(master_id, slave_id, len(data) * 2, 1, offset * 2, values)
+
+
+@builtin(io=True)
+def write_modbus_rtu_float(master_id: int, slave_id: int, offset: int, data: List[float]):
+    _check_ids(master_id, slave_id)
+    assert 0 <= offset <= 63, "offset must be between 0 and 63"
+    assert 1 <= len(data) <= 64, "length of data must be between 1 and 64"
+    values = _values_to_pairs(data, float_to_registers)
+    return modbus_rtu_write(master_id, slave_id, len(data) * 2, 1, offset * 2, values)
+
+
+# ================== 串口 ==================
+@builtin(io=True)
+def serial_port_open(master_id: int, port: str, baud_rate: BaudRateEnum, parity: PartityEnum,
+                     data_bits: DataBitsEnum = DataBitsEnum.BIT_8, stop_bits: StopBitsEnum = StopBitsEnum.BIT_1):
+    runtime.serial_ports[master_id] = {"port": port, "baud": enum_value(baud_rate), "rx": bytearray()}
+    return True
+
+
+@builtin(io=True)
+def serial_port_close(master_id: int):
+    runtime.serial_ports.pop(master_id, None)
+
+
+@builtin(io=True)
+def serial_port_send(master_id: int, data: list[int]):
+    port = runtime.serial_ports.get(master_id)
+    if port is None:
+        return False
+    payload = bytes(int(b) & 0xFF for b in data)
+    responder = runtime.serial_responders.get(master_id)
+    port["rx"] += responder(payload) if responder else payload
+    runtime.sleep(len(payload) * 10 / port["baud"] * 1000)     # 1 起始位 + 8 数据位 + 1 停止位
+    return True
+
+
+@builtin(io=True)
+def serial_port_recv(master_id: int, length: int):
+    port = runtime.serial_ports.get(master_id)
+    if port is None:
+        return LuaList()
+    data = port["rx"][:length]
+    del port["rx"][:length]
+    return LuaList(data)
+
+
+# ================== Socket ==================
+@builtin(io=True)
+def socket_open(client_id: int, ip: str, port: int):
+    if client_id in runtime.sockets:
+        return True
+    t0 = time.perf_counter()
+    try:
+        sock = socket.create_connection((runtime.socket_host or ip, port), timeout=runtime.socket_connect_timeout_s)
+    except OSError:
+        runtime.charge_wall(t0)
+        return False
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.settimeout(runtime.socket_recv_timeout_s)
+    runtime.sockets[client_id] = sock
+    runtime.charge_wall(t0)
+    return True
+
+
+@builtin(io=True)
+def socket_close(client_id: int):
+    sock = runtime.sockets.pop(client_id, None)
+    if sock is not None:
+        sock.close()
+
+
+def _drop(client_id):
+    sock = runtime.sockets.pop(client_id, None)
+    if sock is not None:
+        sock.close()
+
+
+@builtin(io=True)
+def socket_send(client_id: int, data: str):
+    sock = runtime.sockets.get(client_id)
+    if sock is None:
+        return False
+    t0 = time.perf_counter()
+    try:
+        sock.sendall((str(data) + runtime.socket_send_suffix).encode("utf-8"))
+    except OSError:
+        _drop(client_id)
+        return False
+    finally:
+        runtime.charge_wall(t0)
+    return True
+
+
+@builtin(io=True)
+def socket_connected(client_id: int):
+    sock = runtime.sockets.get(client_id)
+    if sock is None:
+        return False
+    try:
+        sock.setblocking(False)
+        closed = sock.recv(1, socket.MSG_PEEK) == b""
+    except BlockingIOError:
+        closed = False
+    except OSError:
+        closed = True
+    finally:
+        if client_id in runtime.sockets:
+            sock.settimeout(runtime.socket_recv_timeout_s)
+    if closed:
+        _drop(client_id)
+    return not closed
+
+
+@builtin(io=True)
+def socket_recv(client_id: int):
+    """等 runtime.socket_recv_timeout_s 秒，没有数据返回空字符串"""
+    sock = runtime.sockets.get(client_id)
+    if sock is None:
+        return ""
+    t0 = time.perf_counter()
+    try:
+        data = sock.recv(65536)
+    except socket.timeout:
+        data = None
+    except OSError:
+        data = b""
+    runtime.charge_wall(t0)
+    if data == b"":
+        _drop(client_id)
+        return ""
+    return data.decode("utf-8", errors="replace") if data else ""
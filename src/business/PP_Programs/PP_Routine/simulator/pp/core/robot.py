@@ -0,0 +1,260 @@
+"""pp.core.robot 的离线实现：系统状态、全局变量、GPIO 等都读写 sim_runtime.runtime 里的仿真量"""
+import copy
+import re
+from typing import Union
+
+from pp.enums import *
+from sim_runtime import builtin, enum_key, lua_table, runtime
+
+
+@builtin(io=True)
+def clear_fault():
+    runtime.system_state["IS_FAULT"] = False
+
+
+@builtin(io=True)
+def fault(msg: str = "Trigger fault by PP"):
+    runtime.system_state["IS_FAULT"] = True
+    runtime.warn_once(("fault", msg), f"fault at t={runtime.now_s:.3f}s: {msg}")
+
+
+@builtin(io=True)
+def set_system_state(state: SystemStateEnum, value):
+    runtime.system_state[enum_key(state)] = value
+
+
+@builtin(io=True)
+def get_system_state(state: SystemStateEnum):
+    return runtime.get_state(enum_key(state))
+
+
+@builtin(io=True)
+def set_global_var(name: str, value: object):
+    runtime.global_vars[name] = copy.deepcopy(value)
+
+
+@builtin(io=True)
+def get_global_var(name: str):
+    if name not in runtime.global_vars:
+        runtime.warn_once(("global", name), f"global variable {name!r} is not set in the scenario, reading nil")
+        return None
+    return lua_table(copy.deepcopy(runtime.global_vars[name]))
+
+
+def _update_global(var_name, updates):
+    assert var_name != "", "var name must be set"
+    value = get_global_var(var_name)
+    assert value is not None, f"global variable {var_name} does not exist"
+    value = list(value)
+    for index, item in updates:
+        if item != "":
+            while len(value) <= index:
+                value.append(0)
+            value[index] = item
+    set_global_var(var_name, value)
+
+
+def _scaled_pose(new_tcp_pos, unit):
+    scale = 0.001 if enum_key(unit) == "MILLIMETER" or unit == "millimeter" else 1
+    return [(i, v * scale if i < 3 and v != "" else v) for i, v in enumerate(new_tcp_pos)]
+
+
+@builtin(io=True)
+def update_global_var_jpos(var_name: str, new_jpos: list):
+    assert len(new_jpos) in (3, 7), "new_jpos must 7 items"
+    _update_global(var_name, enumerate(new_jpos))
+
+
+@builtin(io=True)
+def update_global_var_pose(var_name: str, new_tcp_pos: list, unit: MetricSystemEnum):
+    assert len(new_tcp_pos) == 6, "new_tcp_pos must 6 items"
+    _update_global(var_name, _scaled_pose(new_tcp_pos, unit))
+
+
+@builtin(io=True)
+def update_global_var_coord(var_name: str, new_tcp_pos: Union[list, None], new_coordinate: Union[list, None],
+                            new_ref_joint_positions: Union[list, None], new_ext_axis: Union[list, None],
+                            unit: MetricSystemEnum):
+    updates = []
+    if new_tcp_pos:
+        assert len(new_tcp_pos) == 6, "new_tcp_pos must 6 items"
+        updates += _scaled_pose(new_tcp_pos, unit)
+    if new_coordinate:
+        assert len(new_coordinate) == 2, "new_coordinate must 2 items"
+        updates += [(6 + i, v if isinstance(v, str) else enum_key(v)) for i, v in enumerate(new_coordinate)]
+    if new_ref_joint_positions:
+        assert len(new_ref_joint_positions) == 7, "new_ref_joint_positions must 7 items"
+        updates += [(8 + i, v) for i, v in enumerate(new_ref_joint_positions)]
+    if new_ext_axis:
+        assert len(new_ext_axis) == 6, "new_ext_axis must 6 items"
+        updates += [(15 + i, v) for i, v in enumerate(new_ext_axis)]
+    _update_global(var_name, updates)
+
+
+# ================== GPIO ==================
+def _port_key(name):
+    """程序里也可以直接写 Lua 端的端口值（"gpioOut3"），统一成枚举名（GPIO_OUT_3）"""
+    name = enum_key(name)
+    match = re.fullmatch(r"gpio(In|Out)(\d+)", name) if isinstance(name, str) else None
+    if match:
+        return f"GPIO_{match.group(1).upper()}_{match.group(2)}"
+    return name
+
+
+def _io_get(type, name):
+    return runtime.io.get((enum_key(type), _port_key(name)), 0)
+
+
+def _io_set(type, name, value):
+    runtime.io[(enum_key(type), _port_key(name))] = int(value) if isinstance(value, bool) else value
+
+
+@builtin(io=True)
+def get_io(type: GPIOEnum, name: Union[GPIOInPortEnum, ProfinetSlaveInputEnum, ModbusTCPInputEnum, AnyBusSlaveInputEnum]):
+    return _io_get(type, name)
+
+
+@builtin(io=True)
+def set_io(type: GPIOEnum, name: Union[GPIOOutPortEnum, ProfinetSlaveOutputEnum, ModbusTCPOutputEnum, AnyBusSlaveOutputEnum],
+           value: Union[bool, int, float]):
+    _io_set(type, name, value)
+
+
+@builtin(io=True)
+def wait_io_ms(type: GPIOEnum, name: Union[GPIOInPortEnum, ProfinetSlaveInputEnum, ModbusTCPInputEnum, AnyBusSlaveInputEnum],
+               value: bool, timeout: int):
+    return runtime.wait_until(lambda: bool(_io_get(type, name)) == bool(value), timeout)
+
+
+@builtin(io=True)
+def set_io_pulse_ms(type: GPIOEnum, name: Union[GPIOOutPortEnum, ProfinetSlaveOutputEnum, ModbusTCPOutputEnum, AnyBusSlaveOutputEnum],
+                    value: bool, duration: int):
+    """不阻塞：置位后 duration 毫秒由仿真事件恢复"""
+    _io_set(type, name, value)
+    runtime.at(runtime.now_s + duration / 1000, lambda rt: _io_set(type, name, not value))
+
+
+@builtin(io=True)
+def get_system_di(name: GPIOInPortEnum):
+    return get_io(GPIOEnum.SYSTEM, name)
+
+
+@builtin(io=True)
+def get_profinet_slave_di(name: ProfinetSlaveInputEnum):
+    return get_io(GPIOEnum.PROFINET_SLAVE, name)
+
+
+@builtin(io=True)
+def get_modbustcp_slave_di(name: ModbusTCPInputEnum):
+    return get_io(GPIOEnum.MODBUSTCP_SLAVE, name)
+
+
+@builtin(io=True)
+def get_anybus_di(name: AnyBusSlaveInputEnum):
+    return get_io(GPIOEnum.ANYBUS, name)
+
+
+@builtin(io=True)
+def set_system_do(name: GPIOOutPortEnum, value: bool):
+    set_io(GPIOEnum.SYSTEM, name, value)
+
+
+@builtin(io=True)
+def set_profinet_slave_do(name: ProfinetSlaveOutputEnum, value: Union[bool, int, float]):
+    set_io(GPIOEnum.PROFINET_SLAVE, name, value)
+
+
+@builtin(io=True)
+def set_modbustcp_slave_do(name: ModbusTCPOutputEnum, value: Union[bool, int, float]):
+    set_io(GPIOEnum.MODBUSTCP_SLAVE, name, value)
+
+
+@builtin(io=True)
+def set_anybus_do(name: AnyBusSlaveOutputEnum, value: Union[bool, int, float]):
+    set_io(GPIOEnum.ANYBUS, name, value)
+
+
+# Lua 版本的 wait_*_di_ms 没有 return，这里同样返回 None
+@builtin(io=True)
+def wait_system_di_ms(name: GPIOInPortEnum, value: bool, timeout: int):
+    wait_io_ms(GPIOEnum.SYSTEM, name, value, timeout)
+
+
+@builtin(io=True)
+def wait_profinet_slave_di_ms(name: ProfinetSlaveInputEnum, value: bool, timeout: int):
+    wait_io_ms(GPIOEnum.PROFINET_SLAVE, name, value, timeout)
+
+
+@builtin(io=True)
+def wait_modbustcp_slave_di_ms(name: ModbusTCPInputEnum, value: bool, timeout: int):
+    wait_io_ms(GPIOEnum.MODBUSTCP_SLAVE, name, value, timeout)
+
+
+@builtin(io=True)
+def wait_anybus_di_ms(name: AnyBusSlaveInputEnum, value: bool, timeout: int):
+    wait_io_ms(GPIOEnum.ANYBUS, name, value, timeout)
+
+
+@builtin(io=True)
+def set_system_do_pulse_ms(name: GPIOOutPortEnum, value: bool, duration: int):
+    set_io_pulse_ms(GPIOEnum.SYSTEM, name, value, duration)
+
+
+@builtin(io=True)
+def set_profinet_slave_do_pulse_ms(name: ProfinetSlaveOutputEnum, value: bool, duration: int):
+    set_io_pulse_ms(GPIOEnum.PROFINET_SLAVE, name, value, duration)
+
+
+@builtin(io=True)
+def set_modbustcp_slave_do_pulse_ms(name: ModbusTCPOutputEnum, value: bool, duration: int):
+    set_io_pulse_ms(GPIOEnum.MODBUSTCP_SLAVE, name, value, duration)
+
+
+@builtin(io=True)
+def set_anybus_do_pulse_ms(name: AnyBusSlaveOutputEnum, value: bool, duration: int):
+    set_io_pulse_ms(GPIOEnum.ANYBUS, name, value, duration)
+
+
+# ================== 文件 / 坐标系 / 对象池 ==================
+@builtin(io=True)
+def read_trajectory_file(name: str):
+    return runtime.trajectory_files.get(name, "")
+
+
+@builtin(io=True)
+def write_trajectory_file(content: str, name: str):
+    runtime.trajectory_files[name] = content
+
+
+@builtin(io=True)
+def set_workcoord(name: str, value):
+    runtime.workcoords[name] = copy.deepcopy(value)
+
+
+@builtin(io=True)
+def set_tool(name: str, value):
+    runtime.tools[name] = copy.deepcopy(value)
+
+
+@builtin(io=True)
+def get_workcoord(name: str):
+    return lua_table(copy.deepcopy(runtime.workcoords.get(name)))
+
+
+@builtin(io=True)
+def get_tool(name: str):
+    return lua_table(copy.deepcopy(runtime.tools.get(name)))
+
+
+@builtin(io=True)
+def clear_object_pool():
+    runtime.object_pool.clear()
+
+
+@builtin(io=True)
+def update_object_pool(obj_name: str, type: int, data: list, camera_intrinsics: str, camera_extrinsics: str,
+                       mounting: str):
+    runtime.object_pool[obj_name] = {
+        "type": type, "data": data, "camera_intrinsics": camera_intrinsics,
+        "camera_extrinsics": camera_extrinsics, "mounting": mounting, "t": runtime.now_s,
+    }
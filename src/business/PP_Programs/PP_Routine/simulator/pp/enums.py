@@ -0,0 +1,157 @@
+"""
+ppdk pp.enums 的替身
+- 取值有意义的小枚举（GPIO 类型、Modbus 读写类型、串口参数、数字格式、坐标系）照抄
+- 端口和系统状态这几个大枚举按需生成成员：名字与 ppdk 一致，值是由名字推出的 camelCase，
+  不保证和控制器的字符串一样；仿真只按成员名区分，写错的成员名在这里不会报错
+"""
+from enum import Enum
+
+
+class GPIOEnum(Enum):
+    """GPIO type"""
+    SYSTEM = "GPIOSystem"
+    PROFINET_SLAVE = "GPIOProfinetSlave"
+    MODBUSTCP_SLAVE = "GPIOModbusTCPSlave"
+    ANYBUS = "GPIOAnybus"
+
+
+class ModbusReadTypeEnum(Enum):
+    """Modbus read type"""
+    COILS = 0
+    HOLDING_REGISTERS = 1
+    DISCRETE_INPUTS = 2
+    INPUT_REGISTERS = 3
+
+
+class ModbusWriteTypeEnum(Enum):
+    """Modbus write type"""
+    COILS = 0
+    REGISTERS = 1
+
+
+class PartityEnum(Enum):
+    """Parity type"""
+    NONE = 0
+    ODD = 1
+    EVEN = 2
+
+
+class BaudRateEnum(Enum):
+    """Serial BaudRate"""
+    BAUD_115200 = 115200
+    BAUD_57600 = 57600
+    BAUD_38400 = 38400
+    BAUD_19200 = 19200
+    BAUD_9600 = 9600
+
+
+class DataBitsEnum(Enum):
+    """Serial Data bit"""
+    BIT_8 = 8
+    BIT_7 = 7
+    BIT_6 = 6
+    BIT_5 = 5
+
+
+class StopBitsEnum(Enum):
+    """Serial Stop bit"""
+    BIT_2 = 2
+    BIT_1 = 1
+
+
+class NumberFormatEnum(Enum):
+    """Number format type"""
+    HEX = 16
+    DEC = 10
+    OCT = 8
+    BIN = 2
+
+
+class MetricSystemEnum(Enum):
+    """Metric system type"""
+    MILLIMETER = "millimeter"
+    METER = "meter"
+
+
+class CoordinateSystemEnum(Enum):
+    """Coordinate system type"""
+    WORLD = "WORLD"
+    WORK = "WORK"
+
+
+class CoordinateNameEnum(Enum):
+    """Coordinate name"""
+    WORLD_ORIGIN = "WORLD_ORIGIN"
+
+
+# ================== 按需生成成员的枚举 ==================
+def _camel(name):
+    first, *rest = name.lower().split("_")
+    return first + "".join(part.capitalize() for part in rest)
+
+
+class _Member:
+    __slots__ = ("name", "value", "_owner")
+
+    def __init__(self, owner, name):
+        self._owner = owner
+        self.name = name
+        self.value = _camel(name)
+
+    def __repr__(self):
+        return f"<{self._owner}.{self.name}: {self.value!r}>"
+
+
+class _LazyEnumMeta(type):
+    def __getattr__(cls, name):
+        if not name.isupper():
+            raise AttributeError(name)
+        member = _Member(cls.__name__, name)
+        type.__setattr__(cls, name, member)
+        return member
+
+
+class GPIOOutPortEnum(metaclass=_LazyEnumMeta):
+    """GPIO output port"""
+
+
+class GPIOInPortEnum(metaclass=_LazyEnumMeta):
+    """GPIO input port"""
+
+
+class ProfinetSlaveOutputEnum(metaclass=_LazyEnumMeta):
+    """GPIO Profinet output port"""
+
+
+class ModbusTCPOutputEnum(metaclass=_LazyEnumMeta):
+    """GPIO Modbus output port"""
+
+
+class AnyBusSlaveOutputEnum(metaclass=_LazyEnumMeta):
+    """GPIO AnyBus output port"""
+
+
+class ProfinetSlaveInputEnum(metaclass=_LazyEnumMeta):
+    """GPIO Profinet input port"""
+
+
+class ModbusTCPInputEnum(metaclass=_LazyEnumMeta):
+    """GPIO Modbus input port"""
+
+
+class AnyBusSlaveInputEnum(metaclass=_LazyEnumMeta):
+    """GPIO AnyBus input port"""
+
+
+class SystemStateEnum(metaclass=_LazyEnumMeta):
+    """System state"""
+
+
+__all__ = [
+    "GPIOEnum", "GPIOOutPortEnum", "GPIOInPortEnum",
+    "ProfinetSlaveOutputEnum", "ModbusTCPOutputEnum", "AnyBusSlaveOutputEnum",
+    "ProfinetSlaveInputEnum", "ModbusTCPInputEnum", "AnyBusSlaveInputEnum",
+    "ModbusReadTypeEnum", "ModbusWriteTypeEnum", "PartityEnum", "BaudRateEnum",
+    "DataBitsEnum", "StopBitsEnum", "NumberFormatEnum", "SystemStateEnum",
+    "MetricSystemEnum", "CoordinateSystemEnum", "CoordinateNameEnum",
+]
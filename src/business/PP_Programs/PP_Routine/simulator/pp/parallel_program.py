@@ -0,0 +1,25 @@
+from pp.settings import RobotSetting
+
+
+class ParallelProgram:
+    """
+    离线替身：只保存配置，pp_ 函数由 sim_runtime.Runtime.run() 调度
+    to_lua / assign / enable / start 这些部署接口在离线运行时没有意义，调用直接报错
+    """
+
+    def __init__(
+            self,
+            setting: RobotSetting = RobotSetting(),
+            port: int = 18001,
+            auto_booted: bool = False,
+            auto_looped: bool = False,
+    ):
+        self._robot_ip = setting.ip
+        self._robot_port = port
+        self._auto_booted = auto_booted
+        self._auto_looped = auto_looped
+
+    def _offline(self, *args, **kwargs):
+        raise RuntimeError("offline simulator: deploy with the ppdk pp package (main.py)")
+
+    to_lua = assign = enable = disable = start = stop = remove = _offline
@@ -0,0 +1,24 @@
+import os
+
+
+class RobotSetting:
+    """与 ppdk 的 RobotSetting 参数相同，离线运行不校验也不连接"""
+
+    def __init__(self,
+                 ip: str = "192.168.2.100",
+                 telnet_port: int = 23,
+                 nanomsg_port: int = 15001,
+                 grpc_port: int = 18001,
+                 username: str = "root",
+                 password: str = "root",
+                 root_dir: str = "/root/mnt",
+                 force_validate: bool = False):
+        self.ip = ip
+        self.telnet_port = telnet_port
+        self.nanomsg_port = nanomsg_port
+        self.grpc_port = grpc_port
+        self.username = username
+        self.password = password
+        self.root_dir = root_dir
+        self.base_dir = str(os.path.dirname(os.path.abspath(__file__)))
+        self.force_validate = force_validate
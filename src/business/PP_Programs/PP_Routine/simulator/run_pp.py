@@ -0,0 +1,85 @@
+"""
+离线运行 MyPP 里的并行程序，报告每个循环的迭代速率和每次迭代的 I/O 调用数
+
+    # 在 PP_Routine 目录下
+    python simulator/run_pp.py collect_force --duration 10 --scenario simulator/scenarios/collect_force.py
+    python simulator/run_pp.py MyPP.control_robot:ControlRobot --duration 30 --quiet
+    python simulator/run_pp.py conv_vision_trigger --set pp_push_mode=True --scenario simulator/scenarios/conv_vision_trigger.py
+
+程序名可以是 MyPP 下的模块名（自动找里面的 ParallelProgram 子类），也可以写成 模块:类名
+场景脚本是一个 .py 文件，定义 setup(rt)：预置全局变量 / IO / 寄存器，用 rt.at(秒, 函数) 安排事件
+socket_open 默认连 127.0.0.1 的同一端口，先在本机起好 SocketService 里对应的服务
+"""
+import argparse
+import ast
+import importlib
+import importlib.util
+import inspect
+import os
+import sys
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(SIM_DIR))   # PP_Routine，给 MyPP 用
+sys.path.insert(0, SIM_DIR)                    # pp 替身优先于装好的 ppdk
+
+from sim_runtime import runtime  # noqa: E402
+from pp.parallel_program import ParallelProgram  # noqa: E402
+
+
+def load_program(spec):
+    module_name, _, class_name = spec.partition(":")
+    if "." not in module_name:
+        module_name = "MyPP." + module_name
+    module = importlib.import_module(module_name)
+    if class_name:
+        return getattr(module, class_name)
+    # 只定义 func_ 的基类（ModbusSnapshot、*Task）不算程序
+    classes = [c for _, c in inspect.getmembers(module, inspect.isclass)
+               if issubclass(c, ParallelProgram) and c is not ParallelProgram and c.__module__ == module.__name__
+               and any(name.startswith("pp_") for name in vars(c))]
+    if len(classes) != 1:
+        raise SystemExit(f"{module_name}: expected one ParallelProgram subclass, found "
+                         f"{[c.__name__ for c in classes]}; use module:Class")
+    return classes[0]
+
+
+def load_scenario(path):
+    spec = importlib.util.spec_from_file_location("pp_scenario", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.setup(runtime)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run MyPP parallel programs offline on a virtual clock")
+    parser.add_argument("program", help="MyPP module name (collect_force) or module:Class")
+    parser.add_argument("--duration", type=float, default=10.0, help="virtual seconds to run")
+    parser.add_argument("--scenario", help="python file defining setup(rt)")
+    parser.add_argument("--only", action="append", help="run only this pp_ function (repeatable)")
+    parser.add_argument("--keep-host", action="store_true", help="connect sockets to the original IPs, not 127.0.0.1")
+    parser.add_argument("--quiet", action="store_true", help="drop the programs' print output")
+    parser.add_argument("--set", action="append", default=[], metavar="pp_name=value",
+                        help="override a pp_ attribute after __init__, value is a python literal (repeatable)")
+    parser.add_argument("--cpu-load", type=float, default=0.0,
+                        help="fraction of the controller CPU taken by other work (0..0.99), slows every call")
+    args = parser.parse_args()
+
+    cls = load_program(args.program)
+    runtime.quiet = args.quiet
+    runtime.cpu_load = args.cpu_load
+    if args.keep_host:
+        runtime.socket_host = None
+    if args.scenario:
+        load_scenario(args.scenario)
+    pp = cls()
+    for item in args.set:
+        name, _, value = item.partition("=")
+        if not name.startswith("pp_") or not hasattr(pp, name):
+            raise SystemExit(f"--set {item}: {cls.__name__} has no attribute {name}")
+        setattr(pp, name, ast.literal_eval(value))
+    wall = runtime.run(pp, args.duration, only=args.only)
+    print(runtime.report(wall))
+
+
+if __name__ == "__main__":
+    main()
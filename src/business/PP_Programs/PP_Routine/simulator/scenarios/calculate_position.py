@@ -0,0 +1,17 @@
+"""
+CalculatePosition：10 行 x 10 列 x 30 层 = 3000 个点位，比较生成耗时看 [STAT] 的虚拟时间和 pp_calculate_position 的 I/O 调用数
+CACHED = True 时预置与参数一致的 ArrDataKey，模拟参数未变时的再次运行
+"""
+CACHED = False
+
+
+def setup(rt):
+    rt.global_vars.update(
+        BaseX=0.5, BaseY=-0.2, BaseZ=0.1,
+        Row=10, Col=10, Layer=30,
+        RowSpacing=0.05, ColSpacing=0.05, LayerSpacing=0.02,
+        ReferencePose=[0, -40, 0, 90, 0, 40, 0, 0, 0, 0, 0, 0, 0],
+        ArrData=[], ArrDataKey="",
+    )
+    if CACHED:
+        rt.global_vars["ArrDataKey"] = "0.5,-0.2,0.1,10,10,30,0.05,0.05,0.02,0,-40,0,90,0,40,0,0,0,0,0,0,0"
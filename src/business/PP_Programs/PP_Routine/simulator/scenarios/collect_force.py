@@ -0,0 +1,14 @@
+"""
+CollectForce：1 秒后置 starForce 开始采集，6 秒后停止
+Fz 在接触段按 10Hz 正弦变化，TCP z 从 0.30m 匀速下压
+配合本机的 SocketService/socket_service_force.py（HOST 改成 127.0.0.1）或任意 20000 端口的服务
+"""
+import math
+
+
+def setup(rt):
+    rt.global_vars["starForce"] = False
+    rt.system_state["CARTESIAN_FORCE_Z"] = lambda t: -5.0 + 3.0 * math.sin(2 * math.pi * 10 * t)
+    rt.system_state["TCP_POSE"] = lambda t: [0.5, 0.0, 0.30 - 0.002 * t, 0.0, 0.0, 1.0, 0.0]
+    rt.at(1.0, lambda rt: rt.global_vars.update(starForce=True))
+    rt.at(6.0, lambda rt: rt.global_vars.update(starForce=False))
@@ -0,0 +1,46 @@
+"""
+ControlGripper：方案运行中，主程序每 0.3~0.7 秒（随机）切一次 ToolState 1 / 2，第 6 秒暂停 1 秒
+场景每 0.05ms 看一次 GPIO_OUT_0，记下 ToolState 变化到 IO 跟上的真实延迟，结束时和 PP 发布的名义轮询间隔 GripperPollGap 对比
+    python simulator/run_pp.py control_gripper --scenario simulator/scenarios/control_gripper.py --duration 10 --quiet
+"""
+import atexit
+import random
+
+from pp.enums import GPIOEnum
+
+PORT = (GPIOEnum.SYSTEM.name, "GPIO_OUT_0")
+
+
+def setup(rt):
+    rng = random.Random(7)
+    rt.system_state["PROJECT_RUNNING"] = True
+    rt.global_vars["ToolState"] = 0
+    rt.global_vars["GripperPollGap"] = [0, 0, 0]
+    state = {"since": None, "latency": []}
+
+    def toggle(rt):
+        if rt.system_state["PROJECT_RUNNING"]:
+            rt.global_vars["ToolState"] = 2 if rt.global_vars["ToolState"] == 1 else 1
+            state["since"] = rt.now_ms
+        rt.at(rt.now_s + rng.uniform(0.3, 0.7), toggle)
+
+    def check(rt):
+        want = {1: 1, 2: 0}.get(rt.global_vars["ToolState"])
+        if state["since"] is not None and rt.io.get(PORT) == want:
+            state["latency"].append(rt.now_ms - state["since"])
+            state["since"] = None
+
+    rt.at(0.2, toggle)
+    rt.every(0.00005, check, start_s=0.1)
+    rt.at(6.0, lambda rt: rt.system_state.update(PROJECT_RUNNING=False))
+    rt.at(7.0, lambda rt: rt.system_state.update(PROJECT_RUNNING=True))
+
+    def report():
+        lat = sorted(state["latency"])
+        if lat:
+            print(f"[STAT] measured: {len(lat)} changes, latency mean {sum(lat) / len(lat):.2f} ms, "
+                  f"p99 {lat[max(0, -(-len(lat) * 99 // 100) - 1)]:.2f} ms, max {lat[-1]:.2f} ms")
+        events, last, widest = rt.global_vars["GripperPollGap"]
+        print(f"[STAT] GripperPollGap (nominal, excludes call time): {events} changes, last {last} ms, max {widest} ms")
+
+    atexit.register(report)
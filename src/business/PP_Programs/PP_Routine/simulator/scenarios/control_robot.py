@@ -0,0 +1,12 @@
+"""
+ControlRobot：2 秒后按下启动（GPIO_IN_1），从站报告电机已开、程序请求、方案 ID 回读为 1
+"""
+from pp.enums import GPIOEnum, GPIOInPortEnum
+
+
+def setup(rt):
+    # 线圈 0 运行 / 1 暂停 / 3 电机可上电 / 4 电机已开 / 5 程序请求 / 6 故障
+    rt.set_flx_bits(0, [0, 0, 0, 1, 1, 1, 0])
+    rt.set_flx_ints(4, [1])
+    rt.at(2.0, lambda rt: rt.io.update({(GPIOEnum.SYSTEM.name, GPIOInPortEnum.GPIO_IN_1.name): 1,
+                                        (GPIOEnum.SYSTEM.name, GPIOInPortEnum.GPIO_IN_2.name): 1}))
@@ -0,0 +1,78 @@
+"""
+ConvVisionTrigger：本机 30000 端口起一个假的视觉端，每帧 CAMERA_MS 毫秒、每帧 OBJECTS_PER_FRAME 个目标
+  收到 Trigger：等一帧，回一个目标 "x y z rx ry rz;序号"
+  收到 Push：之后每帧推一行 "x y z rx ry rz;..."
+结束时按 ConvVisionStats 打印每秒放进对象池的目标数
+    python simulator/run_pp.py conv_vision_trigger --scenario simulator/scenarios/conv_vision_trigger.py --duration 10 --quiet
+    python simulator/run_pp.py conv_vision_trigger --set pp_push_mode=True --scenario simulator/scenarios/conv_vision_trigger.py --duration 10 --quiet
+"""
+import atexit
+import socket
+import threading
+import time
+
+PORT = 30000
+CAMERA_MS = 50
+OBJECTS_PER_FRAME = 3
+# 每 OUT_EVERY 个目标有一个落在工作空间外
+OUT_EVERY = 10
+
+
+def make_object(seq):
+    x = 2.0 if seq % OUT_EVERY == 0 else 0.4 + 0.001 * (seq % 100)
+    return f"{x:.4f} 0.1000 0.0500 0.0 180.0 {seq % 360}.0"
+
+
+def serve(conn):
+    seq = 0
+    pushing = False
+    conn.settimeout(CAMERA_MS / 1000)
+    with conn:
+        while True:
+            try:
+                data = conn.recv(4096)
+                if not data:
+                    return
+            except socket.timeout:
+                data = b""
+            try:
+                if b"Push" in data:
+                    pushing = True
+                if pushing:
+                    # 按帧推送，recv 超时就是一帧
+                    if not data:
+                        objects = [make_object(seq + i) for i in range(OBJECTS_PER_FRAME)]
+                        seq += OBJECTS_PER_FRAME
+                        conn.sendall((";".join(objects) + "\n").encode())
+                elif b"Trigger" in data:
+                    for _ in range(data.count(b"Trigger")):
+                        time.sleep(CAMERA_MS / 1000)
+                        conn.sendall(f"{make_object(seq)};{seq}\n".encode())
+                        seq += 1
+            except OSError:
+                return
+
+
+def listen():
+    server = socket.socket()
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind(("127.0.0.1", PORT))
+    server.listen()
+    while True:
+        conn, _ = server.accept()
+        threading.Thread(target=serve, args=(conn,), daemon=True).start()
+
+
+def setup(rt):
+    threading.Thread(target=listen, daemon=True).start()
+    rt.global_vars["WorkSpace1"] = [0.0, -0.5, 0.0]
+    rt.global_vars["WorkSpace2"] = [1.0, 0.5, 0.5]
+    rt.global_vars["ConvVisionStats"] = [0, 0, 0, 0]
+    rt.global_vars["RecvCoord"] = [0.0] * 6
+
+    def report():
+        messages, objects, queued, rejected = rt.global_vars["ConvVisionStats"]
+        print(f"[STAT] {messages} messages, {objects} objects, {queued} queued, {rejected} out of workspace, "
+              f"{queued / rt.now_s:.1f} objects/s queued over {rt.now_s:.1f}s")
+
+    atexit.register(report)
@@ -0,0 +1,14 @@
+"""
+CrispyMeat：方案运行中，等待位（线圈 11）每 2 秒拉高 0.5 秒，每个上升沿应只拍一次
+配合本机 20000 端口的视觉服务（收到 "1" 回一行结果）；回复慢时看 pp_crispy_meat 内层循环的 max ms
+"""
+
+
+def setup(rt):
+    rt.system_state["PROJECT_RUNNING"] = True
+    rt.global_vars["CrispyVision"] = ""
+    rt.global_vars["CrispyVisionStats"] = [0, 0, 0, 0, 0]
+    rt.set_flx_bits(10, [1, 0, 0, 0, 0, 0, 0])
+    for t in range(1, 10, 2):
+        rt.at(t, lambda rt: rt.set_flx_bits(11, [1]))
+        rt.at(t + 0.5, lambda rt: rt.set_flx_bits(11, [0]))
@@ -0,0 +1,39 @@
+"""
+USBMotorTxClient：串口 1 上挂一组假电机，按命令回应答帧
+  0x94 读单圈角度：回 10 字节，角度按电机当前位置；0xA6 / 0xA8：回 13 字节，同时更新电机位置
+  帧头、数据校验不对的帧不应答，并打一条 [WARN]
+    python simulator/run_pp.py pp_motor --scenario simulator/scenarios/pp_motor.py --duration 1
+"""
+import struct
+
+# 电机 ID -> 输出轴角度（度）
+MOTORS = {i: 0.0 for i in range(1, 33)}
+
+
+def frame(cmd, motor_id, data):
+    header = [0x3E, cmd, motor_id, len(data)]
+    return bytes(header + [sum(header) % 256] + list(data) + [sum(data) % 256])
+
+
+def setup(rt):
+    def respond(payload):
+        if len(payload) < 5 or payload[0] != 0x3E or sum(payload[:4]) % 256 != payload[4]:
+            rt.warn_once(("motor", "header"), f"bad motor frame header: {payload.hex(' ')}")
+            return b""
+        cmd, motor_id, length = payload[1], payload[2], payload[3]
+        data = payload[5:5 + length]
+        if length and (len(payload) != 6 + length or sum(data) % 256 != payload[5 + length]):
+            rt.warn_once(("motor", "data"), f"bad motor frame data: {payload.hex(' ')}")
+            return b""
+        if cmd == 0xA6:
+            MOTORS[motor_id] = (data[1] + data[2] * 256 + data[3] * 65536) / 800
+        elif cmd == 0xA8:
+            MOTORS[motor_id] = (MOTORS[motor_id] + struct.unpack("<i", data[:4])[0] / 800) % 360
+        elif cmd == 0x94:
+            return frame(cmd, motor_id, struct.pack("<I", round(MOTORS[motor_id] * 800)))
+        else:
+            return frame(cmd, motor_id, b"")
+        # 温度、转矩电流、速度、编码器位置，这里只关心长度
+        return frame(cmd, motor_id, bytes(7))
+
+    rt.serial_responders[1] = respond
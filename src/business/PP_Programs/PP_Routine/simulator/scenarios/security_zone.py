@@ -0,0 +1,65 @@
+"""
+SecurityZone：TCP 沿 x 在 0.30 ~ 0.70m 之间往返（0.2 m/s），穿过一个球区和一个盒区
+场景按同样的滞回阈值每 0.1ms 判一次"应有状态"，记下 GPIO 跟上所用的时间，结束时打印检测延迟
+    python simulator/run_pp.py security_zone --scenario simulator/scenarios/security_zone.py --duration 20 --quiet --cpu-load 0.5
+"""
+import atexit
+import math
+
+from pp.enums import GPIOEnum
+
+SPEED = 0.2
+LOW, HIGH = 0.30, 0.70
+BAND = 0.005
+ZONES = [
+    # 球：球心 (0.5, 0, 0.3) 半径 0.1 → OUT_0，进入置位
+    0, 0, 0.5, 0.0, 0.3, 0.1, 0, 0, BAND, 1,
+    # 盒：x 0.60~0.80，y/z 包住轨迹 → OUT_1，离开置位
+    1, 1, 0.60, -0.1, 0.2, 0.80, 0.1, 0.4, BAND, 0,
+]
+
+
+def tcp_x(t):
+    span = HIGH - LOW
+    phase = (t * SPEED) % (2 * span)
+    return LOW + (phase if phase < span else 2 * span - phase)
+
+
+def expected(states, x):
+    """与 PP 相同的滞回判定（轨迹上 y=0、z=0.3，只看 x）"""
+    sphere, box = states
+    d = abs(x - 0.5)
+    sphere = d <= 0.1 + BAND if sphere else d < 0.1 - BAND
+    box = 0.60 - BAND <= x <= 0.80 + BAND if box else 0.60 + BAND <= x <= 0.80 - BAND
+    return [sphere, box]
+
+
+def setup(rt):
+    rt.global_vars["SecZones"] = ZONES
+    rt.system_state["TCP_POSE"] = lambda t: [tcp_x(t), 0.0, 0.3, 0.0, 0.0, 1.0, 0.0]
+    ports = [(GPIOEnum.SYSTEM.name, f"GPIO_OUT_{ZONES[i + 1]}") for i in (0, 10)]
+    levels = [ZONES[i + 9] for i in (0, 10)]
+    state = {"truth": [False, False], "since": [None, None], "latency": [[], []]}
+
+    def check(rt):
+        state["truth"] = truth = expected(state["truth"], tcp_x(rt.now_s))
+        for i, port in enumerate(ports):
+            want = int(truth[i] == bool(levels[i]))
+            if rt.io.get(port) == want:
+                if state["since"][i] is not None:
+                    state["latency"][i].append(rt.now_ms - state["since"][i])
+                    state["since"][i] = None
+            elif state["since"][i] is None:
+                state["since"][i] = rt.now_ms
+
+    rt.every(0.0001, check, start_s=0.05)
+
+    def report():
+        for name, lat in zip(("sphere", "box"), state["latency"]):
+            lat = sorted(lat[1:])      # 第一次是启动时的初始写入
+            if lat:
+                print(f"[STAT] {name}: {len(lat)} transitions, latency mean {sum(lat) / len(lat):.2f} ms, "
+                      f"p99 {lat[max(0, math.ceil(0.99 * len(lat)) - 1)]:.2f} ms, max {lat[-1]:.2f} ms "
+                      f"(cpu load {rt.cpu_load:.0%})")
+
+    atexit.register(report)
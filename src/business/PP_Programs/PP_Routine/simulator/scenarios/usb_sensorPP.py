@@ -0,0 +1,30 @@
+"""
+UsbSensorPP：RTU 主站 1 上的传感器，保持寄存器 512 起按 2Hz 正弦变化（0~1000）
+每 50 个事务注入一次超时、每 80 个注入一次 CRC 错
+    python simulator/run_pp.py usb_sensorPP --scenario simulator/scenarios/usb_sensorPP.py --duration 10
+    python simulator/run_pp.py usb_sensorPP --scenario simulator/scenarios/usb_sensorPP.py --set pp_baud=115200
+"""
+import itertools
+import math
+
+
+def setup(rt):
+    holding = rt.registers[("rtu", 1), "holding"]
+
+    def update(rt):
+        for i in range(8):
+            holding[512 + i] = int(500 + 500 * math.sin(2 * math.pi * 2 * rt.now_s + i))
+
+    rt.every(0.001, update)
+
+    transactions = itertools.count(1)
+
+    def fault(t_s):
+        n = next(transactions)
+        if n % 50 == 0:
+            return "timeout"
+        if n % 80 == 0:
+            return "crc"
+        return None
+
+    rt.rtu_faults[1] = fault
@@ -0,0 +1,619 @@
+"""
+MyPP 离线运行时：配合同目录下的 pp 替身包，在桌面 Python 里跑 ParallelProgram 子类
+
+- 每个 pp_ 函数是一个协作任务，同一时刻只有一个任务在跑，总是先跑虚拟时间最小的那个
+- 虚拟时钟：wait_ms 推进等长时间；每次 builtin 调用按 CALL_COST_MS 计时，程序每执行一行按
+  LINE_COST_MS 计时；真实 socket 收发按实测耗时计
+- cpu_load 模拟控制器被其他任务占用的比例：builtin 和逐行耗时按 1 / (1 - cpu_load) 放大，wait_ms 不变
+- 系统状态、全局变量、GPIO、Modbus 寄存器、串口都是内存里的仿真量，场景脚本可以预置或按时间改
+- 统计每个 pp_/func_ 里每个 while/for 循环的迭代次数、迭代速率和每次迭代的 I/O 调用数
+- pp_/func_ 里的字符串和 pp_ 字符串变量按 Lua 转义解释（ppdk 原样写进 Lua），"\\n" 在两边都是换行
+
+CALL_COST_MS 里的数是估计值，不是控制器实测；用来比较同一程序改动前后、不同程序之间的相对开销
+"""
+import ast
+import builtins
+import collections
+import copy
+import functools
+import heapq
+import inspect
+import struct
+import sys
+import threading
+import time
+import traceback
+
+# ================== 配置 ==================
+DEFAULT_COST_MS = 0.002         # 纯计算 builtin（get_list、concat_string ...）
+LINE_COST_MS = 0.001            # 程序里每执行一行（Lua 解释执行）
+YIELD_EVERY_LINES = 10000       # 不调 builtin 的纯计算循环也定期让出，避免饿死其他任务
+WAIT_POLL_MS = 1.0              # wait_io_ms 等条件时的轮询步长
+
+# 每次调用的虚拟耗时（ms），不在表里的按 DEFAULT_COST_MS
+# socket_* 是下限，实际按真实收发耗时计
+CALL_COST_MS = {
+    "print": 0.01,
+    "get_system_state": 0.02,
+    "set_system_state": 0.02,
+    "get_global_var": 0.05,
+    "set_global_var": 0.05,
+    "update_global_var_jpos": 0.05,
+    "update_global_var_pose": 0.05,
+    "update_global_var_coord": 0.05,
+    "get_io": 0.02,
+    "set_io": 0.02,
+    "set_io_pulse_ms": 0.02,
+    "wait_io_ms": 0.02,
+    "clear_fault": 1.0,
+    "fault": 1.0,
+    "read_trajectory_file": 2.0,
+    "write_trajectory_file": 2.0,
+    "update_object_pool": 0.5,
+    "clear_object_pool": 0.1,
+    "modbus_tcp_open": 0.05,
+    "modbus_tcp_connected": 0.01,
+    "modbus_tcp_close": 0.05,
+    "modbus_tcp_read": 2.0,     # 一次 Modbus TCP 事务的往返
+    "modbus_tcp_write": 2.0,
+    "modbus_rtu_open": 0.05,
+    "modbus_rtu_close": 0.05,
+    "modbus_rtu_read": 0.05,    # 另按波特率加请求和应答的发送时间
+    "modbus_rtu_write": 0.05,
+    "serial_port_open": 0.05,
+    "serial_port_close": 0.05,
+    "serial_port_send": 0.05,   # 另按波特率加发送时间
+    "serial_port_recv": 0.05,
+    "socket_open": 0.1,
+    "socket_close": 0.05,
+    "socket_send": 0.02,
+    "socket_recv": 0.02,
+    "socket_connected": 0.01,
+}
+
+# 没有在场景里设置的系统状态取这里的值，再没有就是 0
+DEFAULT_SYSTEM_STATE = {
+    "TCP_POSE": [0.5, 0.0, 0.3, 0.0, 0.0, 1.0, 0.0],
+    "JPOS": [0.0, -40.0, 0.0, 90.0, 0.0, 40.0, 0.0],
+    "JOINT_POS": [0.0, -40.0, 0.0, 90.0, 0.0, 40.0, 0.0],
+    "PROJECT_RUNNING": False,
+    "PROJECT_PAUSED": False,
+    "IS_FAULT": False,
+    "IS_SERVO_ON": True,
+    "SPEED_RATIO": 100,
+}
+
+
+class SimulationEnd(BaseException):
+    """仿真时间到，在任务里抛出来结束 pp_ 函数（不会被程序里的 except Exception 吃掉）"""
+
+
+class LuaList(list):
+    """
+    builtin 返回的 Lua 表：程序里直接写下标时和 Lua 一样从 1 开始，越界得到 None（nil）
+    get_list / set_list 这些 builtin 仍按 0 开始
+    """
+
+    def __getitem__(self, index):
+        if isinstance(index, int):
+            return list.__getitem__(self, index - 1) if 1 <= index <= len(self) else None
+        return list.__getitem__(self, index)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, int):
+            if index == len(self) + 1:
+                self.append(value)
+            else:
+                list.__setitem__(self, index - 1, value)
+        else:
+            list.__setitem__(self, index, value)
+
+
+def lua_table(value):
+    """list / tuple 递归转成 LuaList，其他原样返回"""
+    if isinstance(value, (list, tuple)):
+        return LuaList(lua_table(v) for v in value)
+    return value
+
+
+LUA_ESCAPES = {"a": "\a", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v",
+               "\\": "\\", '"': '"', "'": "'"}
+
+
+def lua_unescape(text):
+    """
+    ppdk 把程序里的字符串原样写进 Lua 的 "..."，控制器上按 Lua 的转义解释：
+    Python 源码里的 "\\n"（反斜杠加 n）在 Lua 里是换行，这里照样换成换行
+    """
+    if "\\" not in text:
+        return text
+    out = []
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if char != "\\" or index + 1 >= len(text):
+            out.append(char)
+            index += 1
+            continue
+        nxt = text[index + 1]
+        if nxt in LUA_ESCAPES:
+            out.append(LUA_ESCAPES[nxt])
+            index += 2
+        elif nxt == "x":
+            out.append(chr(int(text[index + 2:index + 4], 16)))
+            index += 4
+        elif nxt.isdigit():
+            end = index + 1
+            while end < len(text) and end < index + 4 and text[end].isdigit():
+                end += 1
+            out.append(chr(int(text[index + 1:end])))
+            index = end
+        else:
+            out.append(char)
+            index += 1
+    return "".join(out)
+
+
+def enum_key(value):
+    """枚举成员取名字（GPIO_IN_1），已经是字符串 / 数字的原样返回"""
+    return getattr(value, "name", value)
+
+
+def enum_value(value):
+    return getattr(value, "value", value)
+
+
+# ================== 统计 ==================
+class LoopStats:
+    """一个 while/for 循环：header 行每执行一次算一次迭代，两次之间的虚拟时间算一个周期"""
+
+    def __init__(self, filename, func, node):
+        self.filename = filename
+        self.func = func
+        self.kind = "while" if isinstance(node, ast.While) else "for"
+        self.start = node.lineno
+        self.end = node.end_lineno
+        self.header = node.test.lineno if isinstance(node, ast.While) else node.lineno
+        self.iterations = 0
+        self.periods = 0
+        self.active_ms = 0.0
+        self.max_period_ms = 0.0
+        self.io_calls = 0
+        self.calls = collections.Counter()
+        self.last_t = None
+
+    @property
+    def label(self):
+        return f"{self.func}:{self.start} {self.kind}"
+
+    def hit(self, t):
+        if self.last_t is not None:
+            period = t - self.last_t
+            self.active_ms += period
+            self.periods += 1
+            if period > self.max_period_ms:
+                self.max_period_ms = period
+        self.iterations += 1
+        self.last_t = t
+
+    def leave(self, exit_test):
+        """离开循环；exit_test 表示最后一次 header 是条件不成立的那次判断，不算迭代"""
+        if exit_test:
+            self.iterations -= 1
+        self.last_t = None
+
+    def rate_hz(self):
+        return self.periods / self.active_ms * 1000 if self.active_ms > 0 else None
+
+
+class Task:
+    def __init__(self, name, func, looped):
+        self.name = name
+        self.func = func
+        self.looped = looped
+        self.t = 0.0                # 虚拟时间（ms）
+        self.go = threading.Semaphore(0)
+        self.done = False
+        self.error = None
+        self.returned = False       # pp_ 函数自己返回了（不是仿真时间到被停下）
+        self.io_calls = 0
+        self.calls = collections.Counter()
+        self.depth = 0              # builtin 嵌套深度，只在最外层记 I/O
+        self.lines = 0
+        self.thread = None
+
+
+# ================== 运行时 ==================
+class Runtime:
+    def __init__(self):
+        self.tasks = []
+        self.clock_ms = 0.0
+        self.duration_ms = 0.0
+        self.quiet = False
+        self.cpu_load = 0.0
+        self.slowdown = 1.0
+        self._local = threading.local()
+        self._back = threading.Semaphore(0)
+        self._horizon = 0.0
+        self._events = []
+        self._event_seq = 0
+        self._stopping = False
+        self._loops_by_code = collections.defaultdict(list)
+        self._traced_files = set()
+        self._real_print = builtins.print
+        self._warned = set()
+
+        # ---------- 仿真状态 ----------
+        self.system_state = {}          # 枚举名 -> 值，或 f(t_s) 按时间给值
+        self.global_vars = {}
+        self.io = {}                    # (GPIOEnum 名, 端口名) -> 值
+        self.registers = collections.defaultdict(dict)  # (master, 表名) -> {地址: 值}
+        self.modbus_masters = {}        # master_id -> ip
+        self.modbus_offline = set()     # 这些 ip 上的从站连不上
+        self.modbus_bits_as_strings = True  # 线圈读回 "1"/"0"，和 ControlRobot 里的比较方式一致
+        self.rtu_masters = {}           # master_id -> {"port": ..., "baud": ...}
+        self.rtu_faults = {}            # master_id -> f(t_s) -> None / "timeout" / "crc"，每次 rtu 事务问一次
+        self.rtu_timeout_ms = 100.0     # rtu 从站不应答时主站等多久
+        self.serial_ports = {}          # master_id -> {"baud": ..., "rx": bytearray()}
+        self.serial_responders = {}     # master_id -> f(bytes) -> bytes，没有就原样环回
+        self.sockets = {}               # client_id -> socket.socket
+        self.socket_host = "127.0.0.1"  # socket_open 的地址一律换成它，None 保持原地址
+        self.socket_send_suffix = "\n"  # 服务端按行切分
+        self.socket_connect_timeout_s = 1.0
+        self.socket_recv_timeout_s = 1.0
+        self.object_pool = {}
+        self.trajectory_files = {}
+        self.workcoords = {}
+        self.tools = {}
+
+    # ================== 时间 ==================
+    def task(self):
+        return getattr(self._local, "task", None)
+
+    @property
+    def now_ms(self):
+        task = self.task()
+        return task.t if task is not None else self.clock_ms
+
+    @property
+    def now_s(self):
+        return self.now_ms / 1000
+
+    def advance(self, ms):
+        """当前任务的虚拟时间前进 ms，超过其他任务 / 下一个事件就把执行权交回调度器"""
+        task = self._local.task
+        task.t += ms
+        if task.t >= self._horizon:
+            self._back.release()
+            task.go.acquire()
+            if self._stopping:
+                raise SimulationEnd()
+
+    def sleep(self, ms):
+        self.advance(max(ms, 0.0))
+
+    def wait_until(self, predicate, timeout_ms):
+        """按 WAIT_POLL_MS 轮询，条件成立返回 True，超时返回 False"""
+        deadline = self.now_ms + timeout_ms
+        while not predicate():
+            if self.now_ms >= deadline:
+                return False
+            self.sleep(min(WAIT_POLL_MS, deadline - self.now_ms))
+        return True
+
+    def charge_wall(self, t0):
+        """真实 I/O：按从 t0（perf_counter）到现在的实测耗时计入虚拟时间"""
+        self.sleep((time.perf_counter() - t0) * 1000)
+
+    def at(self, t_s, func):
+        """场景事件：虚拟时间到 t_s 秒时调用 func(runtime)"""
+        t_ms = t_s * 1000
+        self._event_seq += 1
+        heapq.heappush(self._events, (t_ms, self._event_seq, func))
+        if t_ms < self._horizon:
+            self._horizon = t_ms
+
+    def every(self, period_s, func, start_s=0.0):
+        def fire(rt):
+            func(rt)
+            rt.at(rt.now_s + period_s, fire)
+        self.at(start_s, fire)
+
+    def _fire_events(self, t_ms):
+        while self._events and self._events[0][0] <= t_ms:
+            ev_t, _, func = heapq.heappop(self._events)
+            self.clock_ms = ev_t
+            func(self)
+
+    # ================== 调用记录 ==================
+    def record_io(self, task, name):
+        task.io_calls += 1
+        task.calls[name] += 1
+        frame = sys._getframe(2)
+        while frame is not None:
+            loops = self._loops_by_code.get((frame.f_code.co_filename, frame.f_code.co_name))
+            if loops:
+                line = frame.f_lineno
+                for stats in loops:
+                    if stats.start <= line <= stats.end:
+                        stats.io_calls += 1
+                        stats.calls[name] += 1
+            frame = frame.f_back
+
+    def warn_once(self, key, message):
+        if key not in self._warned:
+            self._warned.add(key)
+            self._real_print(f"[WARN] {message}")
+
+    # ================== 仿真状态 ==================
+    def get_state(self, name):
+        value = self.system_state.get(name, DEFAULT_SYSTEM_STATE.get(name, 0))
+        if callable(value):
+            value = value(self.now_s)
+        return lua_table(copy.deepcopy(value))
+
+    def set_flx_bits(self, offset, bits, master_id=1):
+        """Flexiv Modbus TCP 线圈，offset 与 read/write_flx_modbus_tcp_bit 相同"""
+        table = self.registers[(master_id, "coils")]
+        for i, bit in enumerate(bits):
+            table[offset + i] = int(bool(bit))
+
+    def flx_bits(self, offset, length, master_id=1):
+        table = self.registers[(master_id, "coils")]
+        return [table.get(offset + i, 0) for i in range(length)]
+
+    def set_flx_ints(self, offset, values, master_id=1):
+        """机器人 → PP 的 int 区（read_flx_modbus_tcp_int 读的地址 176 + offset*2），按 [low, high] 存"""
+        self._set_pairs(master_id, 176 + offset * 2, [_int32_pair(v) for v in values])
+
+    def set_flx_floats(self, offset, values, master_id=1):
+        """机器人 → PP 的 float 区（地址 304 + offset*2）"""
+        self._set_pairs(master_id, 304 + offset * 2, [_float_pair(v) for v in values])
+
+    def flx_ints(self, offset, length, master_id=1):
+        """PP → 机器人的 int 区（write_flx_modbus_tcp_int 写的地址 16 + offset*2）"""
+        return [_pair_int32(*p) for p in self._get_pairs(master_id, 16 + offset * 2, length)]
+
+    def flx_floats(self, offset, length, master_id=1):
+        """PP → 机器人的 float 区（地址 144 + offset*2）"""
+        return [_pair_float(*p) for p in self._get_pairs(master_id, 144 + offset * 2, length)]
+
+    def _set_pairs(self, master_id, address, pairs):
+        table = self.registers[(master_id, "holding")]
+        for i, (low, high) in enumerate(pairs):
+            table[address + 2 * i] = low
+            table[address + 2 * i + 1] = high
+
+    def _get_pairs(self, master_id, address, length):
+        table = self.registers[(master_id, "holding")]
+        return [(table.get(address + 2 * i, 0), table.get(address + 2 * i + 1, 0)) for i in range(length)]
+
+    # ================== 调度 ==================
+    def instrument(self, cls):
+        """找出程序类（及其基类）源文件里 pp_/func_ 方法中的循环，后面逐行跟踪这些文件"""
+        for klass in cls.__mro__:
+            if klass.__module__.split(".")[0] in ("pp", "builtins"):
+                continue
+            filename = inspect.getsourcefile(klass)
+            if filename in self._traced_files:
+                continue
+            self._traced_files.add(filename)
+            with open(filename, encoding="utf-8") as f:
+                tree = ast.parse(f.read(), filename)
+            module = sys.modules[klass.__module__]
+            for node in tree.body:
+                if isinstance(node, ast.ClassDef) and isinstance(getattr(module, node.name, None), type):
+                    self._lua_strings(getattr(module, node.name), node, filename)
+            for func in ast.walk(tree):
+                if not isinstance(func, ast.FunctionDef) or not func.name.startswith(("pp_", "func_")):
+                    continue
+                for node in ast.walk(func):
+                    if isinstance(node, (ast.While, ast.For)):
+                        self._loops_by_code[(filename, func.name)].append(LoopStats(filename, func.name, node))
+
+    def _lua_strings(self, klass, class_node, filename):
+        """pp_/func_ 里带反斜杠的字符串按 Lua 转义换掉，重新编译这个方法（行号不变，逐行跟踪照常）"""
+        for func in class_node.body:
+            if not isinstance(func, ast.FunctionDef) or not func.name.startswith(("pp_", "func_")):
+                continue
+            method = klass.__dict__.get(func.name)
+            changed = False
+            for node in ast.walk(func):
+                if isinstance(node, ast.Constant) and isinstance(node.value, str) and "\\" in node.value:
+                    node.value = lua_unescape(node.value)
+                    changed = True
+            if not changed or method is None:
+                continue
+            code = compile(ast.Module(body=[func], type_ignores=[]), filename, "exec")
+            method.__code__ = next(c for c in code.co_consts if getattr(c, "co_name", None) == func.name)
+
+    def loops(self):
+        return [s for loops in self._loops_by_code.values() for s in loops]
+
+    def _trace(self, frame, event, arg):
+        code = frame.f_code
+        if code.co_filename not in self._traced_files:
+            return None
+        task = self._local.task
+        loops = self._loops_by_code.get((code.co_filename, code.co_name), ())
+        prev = [None]
+
+        def local(frame, event, arg):
+            if event == "line":
+                line = frame.f_lineno
+                last, prev[0] = prev[0], line
+                for stats in loops:
+                    if line == stats.header:
+                        stats.hit(task.t)
+                    elif last is not None and stats.start <= last <= stats.end \
+                            and not stats.start <= line <= stats.end:
+                        stats.leave(last == stats.header)
+                task.lines += 1
+                task.t += LINE_COST_MS * self.slowdown
+                if task.lines % YIELD_EVERY_LINES == 0:
+                    self.advance(0.0)
+            elif event == "return":
+                for stats in loops:
+                    stats.last_t = None
+            return local
+
+        return local
+
+    def _task_main(self, task):
+        self._local.task = task
+        task.go.acquire()
+        sys.settrace(self._trace)
+        try:
+            while not self._stopping:
+                task.func()
+                if not task.looped:
+                    task.returned = True
+                    break
+                self.advance(DEFAULT_COST_MS)
+        except SimulationEnd:
+            pass
+        except Exception:
+            task.error = traceback.format_exc()
+            self._real_print(f"[ERROR] {task.name} stopped at t={task.t / 1000:.3f}s\n{task.error}")
+        finally:
+            sys.settrace(None)
+            task.done = True
+            self._back.release()
+
+    def _print(self, *args, **kwargs):
+        task = self.task()
+        if task is None or kwargs.get("file") not in (None, sys.stdout):
+            return self._real_print(*args, **kwargs)
+        if not self.quiet:
+            self._real_print(f"[{task.t / 1000:9.3f}s {task.name}]", *args, **kwargs)
+        self.advance(CALL_COST_MS["print"] * self.slowdown)
+
+    def run(self, program, duration_s, only=None):
+        """运行 program 的所有 pp_ 函数（或 only 里列出的），直到虚拟时间 duration_s"""
+        self.instrument(type(program))
+        for name, value in vars(program).items():
+            if name.startswith("pp_") and isinstance(value, str):
+                setattr(program, name, lua_unescape(value))
+        self.duration_ms = duration_s * 1000
+        self.slowdown = 1.0 / (1.0 - min(max(self.cpu_load, 0.0), 0.99))
+        for name, func in inspect.getmembers(program, inspect.ismethod):
+            if not name.startswith("pp_") or (only and name not in only):
+                continue
+            param = inspect.signature(func).parameters.get("auto_looped")
+            looped = param.default if param is not None else getattr(program, "_auto_looped", False)
+            task = Task(name, func, bool(looped))
+            task.thread = threading.Thread(target=self._task_main, args=(task,), name=name, daemon=True)
+            self.tasks.append(task)
+        if not self.tasks:
+            raise ValueError(f"{type(program).__name__} has no pp_ functions to run")
+
+        builtins.print = self._print
+        wall0 = time.perf_counter()
+        try:
+            for task in self.tasks:
+                task.thread.start()
+            while True:
+                live = [t for t in self.tasks if not t.done]
+                if not live:
+                    break
+                task = min(live, key=lambda t: t.t)
+                if task.t >= self.duration_ms:
+                    break
+                self._fire_events(task.t)
+                self.clock_ms = task.t
+                self._horizon = min([t.t for t in live if t is not task]
+                                    + ([self._events[0][0]] if self._events else [])
+                                    + [self.duration_ms])
+                task.go.release()
+                self._back.acquire()
+            self._stopping = True
+            for task in self.tasks:
+                if not task.done:
+                    task.go.release()
+                    self._back.acquire()
+        finally:
+            builtins.print = self._real_print
+            self.close_sockets()
+        self.clock_ms = min(self.duration_ms, max(t.t for t in self.tasks))
+        return time.perf_counter() - wall0
+
+    def close_sockets(self):
+        for sock in self.sockets.values():
+            sock.close()
+        self.sockets.clear()
+
+    # ================== 报告 ==================
+    def report(self, wall_s):
+        lines = [f"[STAT] virtual {self.clock_ms / 1000:.3f}s in {wall_s:.2f}s wall"
+                 + (f", cpu load {self.cpu_load:.0%}" if self.cpu_load else "")]
+        for task in self.tasks:
+            status = "error" if task.error else ("returned" if task.returned else "running")
+            top = ", ".join(f"{name}={n}" for name, n in task.calls.most_common(6))
+            lines.append(f"[STAT] {task.name}: {status}, {task.io_calls} I/O calls ({top})")
+        lines.append(f"{'loop':40s} {'iters':>9s} {'rate Hz':>10s} {'max ms':>9s} {'io/iter':>8s}  per-iteration calls")
+        for stats in self.loops():
+            if stats.iterations <= 0:
+                continue
+            rate = stats.rate_hz()
+            per_iter = stats.io_calls / stats.iterations
+            calls = ", ".join(f"{name}={n / stats.iterations:.2f}" for name, n in stats.calls.most_common(6))
+            lines.append(f"{stats.label:40s} {stats.iterations:9d} "
+                         f"{(f'{rate:,.1f}' if rate is not None else '-'):>10s} "
+                         f"{stats.max_period_ms:9.2f} {per_iter:8.2f}  {calls}")
+        return "\n".join(lines)
+
+
+# ================== 寄存器编码（与 builtin 一致） ==================
+def _int32_pair(value):
+    value = int(value)
+    if value < 0:
+        value += 1 << 32
+    return value % 65536, value // 65536      # [low, high]
+
+
+def _pair_int32(low, high):
+    value = high * 65536 + low
+    return value - (1 << 32) if value >= 1 << 31 else value
+
+
+def _float_pair(value):
+    bits = struct.unpack(">I", struct.pack(">f", value))[0]
+    return bits % 65536, bits // 65536
+
+
+def _pair_float(low, high):
+    return struct.unpack(">f", struct.pack(">I", high * 65536 + low))[0]
+
+
+runtime = Runtime()
+
+
+def builtin(io=False):
+    """
+    pp 替身函数的装饰器：调用后按 CALL_COST_MS 推进虚拟时间
+    io=True 的（机器人状态 / 通信）计入 I/O 调用数，builtin 里再调 builtin 只算最外层那次
+    不在仿真任务里调用（例如 import 时）就直接执行
+    """
+
+    def wrap(func):
+        name = func.__name__
+        cost = CALL_COST_MS.get(name, DEFAULT_COST_MS)
+
+        @functools.wraps(func)
+        def call(*args, **kwargs):
+            task = runtime.task()
+            if task is None:
+                return func(*args, **kwargs)
+            if io and task.depth == 0:
+                runtime.record_io(task, name)
+            task.depth += 1
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                task.depth -= 1
+            runtime.advance(cost * runtime.slowdown)
+            return result
+
+        return call
+
+    return wrap
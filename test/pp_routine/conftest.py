@@ -0,0 +1,16 @@
+"""
+PP_Routine 下的脚本都按所在目录平铺 import（SocketService 里 from line_framer import ...，MyPP 从 PP_Routine 导入）
+这里照 simulator/run_pp.py 的做法把目录放进 sys.path，pp 用 simulator 里的替身，不需要装 ppdk、不连机器人
+
+    python -m pytest -q test/pp_routine
+"""
+import os
+import sys
+
+ROUTINE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "src", "business",
+                                           "PP_Programs", "PP_Routine"))
+
+for sub in ("SocketService", "simulator", ""):
+    path = os.path.normpath(os.path.join(ROUTINE_DIR, sub))
+    if path not in sys.path:
+        sys.path.insert(0, path)
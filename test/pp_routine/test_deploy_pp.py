@@ -0,0 +1,28 @@
+import pytest
+
+import deploy_pp
+from MyPP.supervisor import Supervisor
+from MyPP.usb_sensorPP import UsbSensorPP
+
+
+def entry(cls, overrides):
+    return {"program": cls.__name__, "class": cls, "robots": [], "set": overrides, "start": True}
+
+
+def test_attributes_consumed_by_init_are_found():
+    assert {"pp_poll_ms", "pp_task_periods"} <= set(deploy_pp.init_derived(Supervisor))
+    # declare_block 在 __init__ 里算出的总线字符数
+    assert "pp_sample_chars" in deploy_pp.init_derived(UsbSensorPP)
+
+
+def test_override_of_consumed_attribute_is_rejected():
+    with pytest.raises(SystemExit, match="pp_poll_ms: used by Supervisor.__init__"):
+        deploy_pp.make_program(entry(Supervisor, {"pp_poll_ms": 5}))
+
+
+def test_plain_override_is_applied():
+    # pp_baud 在 pp_usb_sensor 里才用来估算总线时间，__init__ 之后改也有效
+    pp = deploy_pp.make_program(entry(UsbSensorPP, {"pp_baud": 115200}))
+    assert pp.pp_baud == 115200
+    pp = deploy_pp.make_program(entry(Supervisor, {"pp_tick_ms": 4}))
+    assert pp.pp_tick_ms == 4
@@ -0,0 +1,101 @@
+import threading
+import time
+
+from disk_sink import FSYNC_BATCH, DiskSink
+
+
+class GatedWriter:
+    """write_batch 在 gate 打开之前一直卡住，用来把队列填满"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.items = []
+
+    def __call__(self, items):
+        self.gate.wait(5)
+        self.items += items
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_drop_mode_discards_new_data_when_full():
+    writer = GatedWriter()
+    sink = DiskSink("t", writer, max_samples=10, on_full="drop")
+    assert sink.put("first", 4)
+    wait_until(lambda: sink.batches == 0 and not sink._items)   # 写线程已取走 first，卡在 gate
+    assert sink.put("a", 5)
+    assert not sink.put("b", 5)         # 4 + 5 + 5 > 10
+    assert sink.put("c", 1)
+    writer.gate.set()
+    sink.close(5)
+    assert writer.items == ["first", "a", "c"]
+    stats = sink.stats()
+    assert (stats["dropped"], stats["written"], stats["queued"], stats["high_water"]) == (5, 10, 0, 10)
+
+
+def test_block_mode_waits_for_the_writer():
+    writer = GatedWriter()
+    sink = DiskSink("t", writer, max_samples=4, on_full="block")
+    sink.put("a", 4)
+    done = threading.Event()
+    threading.Thread(target=lambda: (sink.put("b", 2), done.set()), daemon=True).start()
+    assert not done.wait(0.2)           # 队列满，put 卡住而不是丢
+    writer.gate.set()
+    assert done.wait(5)
+    sink.close(5)
+    assert writer.items == ["a", "b"]
+    assert sink.stats()["dropped"] == 0
+
+
+
+def test_block_mode_admits_oversized_item_once_queue_drains():
+    writer = GatedWriter()
+    sink = DiskSink("t", writer, max_samples=4, on_full="block")
+    sink.put("a", 3)
+    done = threading.Event()
+    threading.Thread(target=lambda: (sink.put("big", 10), done.set()), daemon=True).start()
+    assert not done.wait(0.2)           # 比整个队列还大：先等队列清空
+    writer.gate.set()
+    assert done.wait(5)
+    sink.close(5)
+    assert writer.items == ["a", "big"]
+    assert sink.stats()["dropped"] == 0
+
+def test_writer_survives_unexpected_exceptions():
+    written = []
+
+    def flaky(items):
+        if "bad" in items:
+            raise RuntimeError("boom")
+        written.extend(items)
+
+    sink = DiskSink("t", flaky, max_samples=4, on_full="block", max_batch=1)
+    done = threading.Event()
+
+    def produce():
+        for item in ("bad", "x", "y", "z", "w", "v"):
+            sink.put(item)
+        done.set()
+
+    threading.Thread(target=produce, daemon=True).start()
+    assert done.wait(5), "put blocked: the writer thread stopped draining the queue"
+    sink.close(5)
+    assert not sink._thread.is_alive()
+    assert written == ["x", "y", "z", "w", "v"]
+    stats = sink.stats()
+    assert (stats["errors"], stats["written"], stats["queued"]) == (1, 5, 0)
+
+
+def test_batch_fsync_after_each_write():
+    synced = []
+    sink = DiskSink("t", lambda items: None, sync=lambda: synced.append(1), fsync=FSYNC_BATCH, max_batch=1)
+    sink.put("a")
+    wait_until(lambda: sink.batches == 1)
+    sink.put("b")
+    sink.close(5)
+    assert sink.stats()["fsyncs"] == len(synced) == 2
@@ -0,0 +1,76 @@
+import math
+import random
+import struct
+
+import pytest
+
+from MyPP.float32_codec import Float32Codec
+
+
+def ref_registers(values, high_first=True):
+    """struct 给出的 float32 寄存器对，作为对照"""
+    out = []
+    for value in values:
+        high, low = struct.unpack(">HH", struct.pack(">f", value))
+        out += [high, low] if high_first else [low, high]
+    return out
+
+
+def f32(bits):
+    return struct.unpack(">f", struct.pack(">I", bits))[0]
+
+
+@pytest.fixture(scope="module")
+def codec():
+    return Float32Codec()
+
+
+EDGE_VALUES = [
+    0.0, 1.0, -1.0, 0.1, -2.5, 3.14159, 65504.0, 1e-3, 123456.789,
+    f32(0x00000001), f32(0x007FFFFF), f32(0x00800000), f32(0x7F7FFFFF), -f32(0x7F7FFFFF),
+    1 + 2 ** -24, 1 + 3 * 2 ** -24,      # 平局：舍到偶数
+    2 ** -149 / 2, 2 ** -149 * 1.5,     # 非规格化数的平局
+    float("inf"), float("-inf"),
+]
+
+
+@pytest.mark.parametrize("high_first", [True, False])
+def test_encode_matches_struct(codec, high_first):
+    assert list(codec.func_floats_to_registers(EDGE_VALUES, high_first)) == ref_registers(EDGE_VALUES, high_first)
+
+
+def test_encode_random_doubles_round_like_hardware(codec):
+    rng = random.Random(47)
+    values = [rng.uniform(-1, 1) * 10 ** rng.randint(-40, 38) for _ in range(2000)]
+    assert list(codec.func_floats_to_registers(values, True)) == ref_registers(values)
+
+
+def test_encode_special_cases(codec):
+    # 超出 float32 范围的变成 inf；NaN 用 quiet NaN；-0.0 按 +0.0
+    assert list(codec.func_floats_to_registers([1e39, -1e39], True)) == [0x7F80, 0, 0xFF80, 0]
+    assert list(codec.func_floats_to_registers([float("nan")], True)) == [0x7FC0, 0]
+    assert list(codec.func_floats_to_registers([-0.0], True)) == [0, 0]
+
+
+@pytest.mark.parametrize("high_first", [True, False])
+def test_decode_matches_struct(codec, high_first):
+    rng = random.Random(7)
+    bits = [rng.getrandbits(32) for _ in range(2000)] + [0x00000001, 0x80000000, 0x7F800000, 0xFF800000]
+    bits = [b for b in bits if (b >> 23) & 0xFF != 0xFF or b & 0x7FFFFF == 0]     # NaN 单独测
+    values = [f32(b) for b in bits]
+    assert list(codec.func_registers_to_floats(ref_registers(values, high_first), high_first)) == values
+
+
+def test_decode_signed_registers_and_nan(codec):
+    # 有的从站按有符号 int16 读回寄存器
+    high, low = ref_registers([-123.5])
+    assert list(codec.func_registers_to_floats([high - 65536, low], True)) == [-123.5]
+    assert math.isnan(codec.func_registers_to_floats([0x7FC0, 0], True)[0])
+
+
+def test_round_trip_is_exact_for_float32_values(codec):
+    rng = random.Random(3)
+    values = [f32(rng.getrandbits(31)) for _ in range(500)]
+    values = [v for v in values if math.isfinite(v)]
+    registers = codec.func_floats_to_registers(values, False)
+    assert list(codec.func_registers_to_floats(registers, False)) == values
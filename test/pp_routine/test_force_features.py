@@ -0,0 +1,32 @@
+import pytest
+
+from force_features import SUMMARY_HEADER, GroupFeatures
+
+
+def press(features, times):
+    """基线 0，第 2~5 个采样压到 10 N"""
+    forces = [0.0, 10.0, 10.0, 10.0, 10.0, 0.0]
+    for i, (ts, fz) in enumerate(zip(times, forces)):
+        features.update(ts, fz, 100.0 - i)
+
+
+def test_sample_times_give_the_integral():
+    features = GroupFeatures(1, time_base="t_ms")
+    press(features, [i * 0.004 for i in range(6)])
+    record = features.summary()
+    # 梯形：两段斜边各 0.02 N·s，中间 3 段各 0.04 N·s
+    assert record["Impulse_Ns"] == pytest.approx(0.16)
+    assert record["Duration_s"] == pytest.approx(0.02)
+    assert record["Contact_Duration_s"] == pytest.approx(0.016)
+    assert record["Contact_PoseZ"] == 99.0
+    assert record["Time_Base"] == "t_ms"
+    assert list(record) == SUMMARY_HEADER
+
+
+def test_chunked_arrival_times_lose_the_integral():
+    # 同一次 recv 的行几乎同时到达：按到达时刻积分，块内 dt≈0，只剩块边界上的大 dt
+    features = GroupFeatures(1)
+    press(features, [0.0, 0.0, 0.0, 0.012, 0.012, 0.012])
+    record = features.summary()
+    assert record["Impulse_Ns"] != pytest.approx(0.16)
+    assert record["Time_Base"] == "arrival"
@@ -0,0 +1,61 @@
+import bisect
+
+import numpy as np
+import pytest
+
+from ingest_metrics import LATENCY_BUCKETS, ConnectionMetrics
+
+
+def feed(conn, seq, period_s, nominal_ms=4, batch=1, late=None):
+    """按实际周期 period_s 到达的定频流，每 batch 行一次 recv；late 为 {seq: 额外延迟秒}"""
+    seq = np.asarray(seq, dtype=np.int64)
+    t_ms = seq * nominal_ms
+    late = late or {}
+    for i in range(0, len(seq), batch):
+        chunk = seq[i:i + batch]
+        last = int(chunk[-1])
+        conn.on_sequence(chunk, t_ms[i:i + batch], 100.0 + last * period_s + late.get(last, 0.0))
+
+
+def bucket(seconds):
+    return bisect.bisect_left(LATENCY_BUCKETS, seconds)
+
+
+def test_regular_stream_off_nominal_has_no_jitter():
+    # 名义 4 ms、实际 4.5 ms：和 t_ms 比会累积出几百 ms 的漂移，但到达本身是均匀的
+    conn = ConnectionMetrics("robot")
+    feed(conn, range(1000), 0.0045)
+    assert conn.seq_samples == 1000
+    assert conn.seq_period == pytest.approx(0.0045)
+    assert conn.jitter_counts[0] == 1000
+    assert conn.jitter_sum / 1000 < 1e-6
+
+
+def test_one_late_sample_is_one_jitter_sample():
+    conn = ConnectionMetrics("robot")
+    feed(conn, range(1000), 0.0045, late={500: 0.015})
+    assert sum(conn.jitter_counts) == 1000
+    assert conn.jitter_counts[bucket(0.015)] == 1
+    assert conn.jitter_counts[0] == 999
+
+
+def test_batched_recv_counts_the_wait_in_the_batch():
+    # 5 行一次 recv：前面的行等了 1..4 个周期
+    conn = ConnectionMetrics("robot")
+    feed(conn, range(1000), 0.004, batch=5)
+    assert conn.seq_period == pytest.approx(0.004)
+    assert sum(conn.jitter_counts[bucket(0.016) + 1:]) == 0
+    assert conn.jitter_sum == pytest.approx(200 * (0.004 + 0.008 + 0.012 + 0.016), rel=1e-3)
+
+
+def test_gaps_and_restarts():
+    conn = ConnectionMetrics("robot")
+    feed(conn, [0, 1, 2, 5, 6], 0.004)
+    assert conn.seq_dropped == 2
+    # PP 开始新一轮：seq 回到 0，周期和抖动零点都重新估算
+    conn.on_sequence([0, 1, 2], [0, 4, 8], 200.0)
+    assert conn.seq_resets == 1
+    assert conn.seq_period is None
+    conn.on_sequence([3], [12], 200.005)
+    assert conn.seq_period == pytest.approx(0.005)
+    assert conn.seq_samples == 9
@@ -0,0 +1,49 @@
+import pytest
+
+from MyPP.kv_reply import KvReply
+from pp.core.basic import split_string
+from sim_runtime import runtime
+from socket_main import encode_kv
+
+
+@pytest.fixture(scope="module")
+def kv():
+    # 和 run_pp 一样把 func_ 里的字符串按 Lua 转义解释（"\\n" 是换行）
+    runtime.instrument(KvReply)
+    return KvReply()
+
+
+def test_round_trip_with_escapes(kv):
+    record = {"name": "张三", "age": 30, "note": "a;b,c\\d\r\ne", "skills": ["Python", "数据;分析", "a,b"]}
+    assert kv.func_kv_decode(encode_kv(record)) == 4
+    assert kv.func_kv_unescape(kv.func_kv_get("name")) == "张三"
+    assert kv.func_kv_get("age") == "30"
+    assert kv.func_kv_unescape(kv.func_kv_get("note")) == record["note"]
+    skills = [kv.func_kv_unescape(s) for s in split_string(kv.func_kv_get("skills"), ",")]
+    assert skills == record["skills"]
+
+
+def test_nested_keys_bool_and_none(kv):
+    reply = encode_kv({"robot": {"ip": "192.168.3.101", "online": True}, "error": None})
+    assert reply == "kv1;3;robot.ip;192.168.3.101;robot.online;1;error;"
+    assert kv.func_kv_decode(reply) == 3
+    assert kv.func_kv_get("robot.online") == "1"
+    assert kv.func_kv_get("error") == ""
+    assert kv.func_kv_get("missing") == ""
+
+
+def test_only_first_line_is_decoded(kv):
+    text = encode_kv({"name": "a"}) + "\n" + encode_kv({"name": "b", "age": 1})[:8]
+    assert kv.func_kv_decode(text) == 1
+    assert kv.func_kv_get("name") == "a"
+
+
+@pytest.mark.parametrize("text", ["", "kv1", "kv2;1;name;a", "kv1;2;name;a", "kv1;1;name;a;age"])
+def test_rejects_other_formats_and_half_replies(kv, text):
+    assert kv.func_kv_decode(text) == -1
+
+
+def test_unescape_leaves_plain_values_and_drops_lone_backslash(kv):
+    assert kv.func_kv_unescape("plain") == "plain"
+    assert kv.func_kv_unescape("a\\sb\\cc\\bd") == "a;b,c\\d"
+    assert kv.func_kv_unescape("end\\") == "end"
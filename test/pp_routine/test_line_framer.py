@@ -0,0 +1,93 @@
+import struct
+
+import pytest
+
+from line_framer import FrameTooLarge, LineFramer
+
+
+class ChunkSocket:
+    """按给定的分块逐次交给 recv_into，一块放不下就分几次；没有数据了返回 0（对端关闭）"""
+
+    def __init__(self, chunks):
+        self.chunks = [bytes(c) for c in chunks]
+
+    def recv_into(self, view):
+        if not self.chunks:
+            return 0
+        chunk = self.chunks[0]
+        n = min(len(view), len(chunk))
+        view[:n] = chunk[:n]
+        if n == len(chunk):
+            self.chunks.pop(0)
+        else:
+            self.chunks[0] = chunk[n:]
+        return n
+
+
+def read_lines(framer):
+    lines = []
+    while framer.fill():
+        lines += [bytes(line) for line in framer.lines()]
+    return lines
+
+
+def test_lines_split_across_recvs():
+    framer = LineFramer(ChunkSocket([b"ab", b"c\r\nde", b"f\n\n", b"gh\n"]))
+    assert read_lines(framer) == [b"abc", b"def", b"", b"gh"]
+    assert framer.pending == 0
+
+
+def test_partial_line_stays_pending():
+    framer = LineFramer(ChunkSocket([b"1,2\n3,"]))
+    framer.fill()
+    assert [bytes(line) for line in framer.lines()] == [b"1,2"]
+    assert framer.pending == 2
+    assert bytes(framer.peek()) == b"3,"
+
+
+def test_block_returns_complete_lines_only():
+    framer = LineFramer(ChunkSocket([b"1,2\n3,4\n5,", b"6\n"]))
+    framer.fill()
+    assert bytes(framer.block()) == b"1,2\n3,4\n"
+    assert bytes(framer.block()) == b""
+    framer.fill()
+    assert bytes(framer.block()) == b"5,6\n"
+
+
+def test_discard_lines_counts_without_copying():
+    framer = LineFramer(ChunkSocket([b"a\nb\nc", b"\nd"]))
+    framer.fill()
+    assert framer.discard_lines() == 2
+    framer.fill()
+    assert framer.discard_lines() == 1
+    assert framer.pending == 1
+
+
+def test_small_buffer_compacts_and_grows_for_long_lines():
+    long_line = b"x" * 100
+    framer = LineFramer(ChunkSocket([b"ab\n", long_line, b"\ncd\n"]), buffer_size=8, max_size=1024)
+    assert read_lines(framer) == [b"ab", long_line, b"cd"]
+
+
+def test_line_longer_than_max_size_raises():
+    framer = LineFramer(ChunkSocket([b"x" * 64]), buffer_size=8, max_size=16)
+    with pytest.raises(FrameTooLarge):
+        while framer.fill():
+            list(framer.lines())
+
+
+def test_length_prefixed_frames_across_recvs():
+    payloads = [b"hello", b"", b"y" * 40]
+    stream = b"".join(struct.pack(">I", len(p)) + p for p in payloads)
+    framer = LineFramer(ChunkSocket([stream[i:i + 3] for i in range(0, len(stream), 3)]), buffer_size=8)
+    frames = []
+    while framer.fill():
+        frames += [bytes(f) for f in framer.frames()]
+    assert frames == payloads
+
+
+def test_frame_header_over_max_size_raises():
+    framer = LineFramer(ChunkSocket([struct.pack(">I", 1 << 20)]), max_size=1024)
+    framer.fill()
+    with pytest.raises(FrameTooLarge):
+        list(framer.frames())
@@ -0,0 +1,26 @@
+from ingest_metrics import IngestMetrics, start_metrics_server
+from load_generator import counter_delta, scrape_metrics
+
+
+def test_loss_counters_come_from_the_service_metrics():
+    metrics = IngestMetrics("force")
+    server = start_metrics_server(metrics, "127.0.0.1", 0)
+    url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+    try:
+        ours = metrics.open("127.0.0.1")
+        other = metrics.open("192.168.3.101")
+        ours.on_lines(5)
+        other.on_lines(100)
+        before = scrape_metrics(url)
+
+        ours.on_lines(40, bad=2)
+        other.on_lines(7)
+        metrics.close(ours)     # 关闭的连接并入累计，差值不受影响
+        after = scrape_metrics(url)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert counter_delta(before, after, "ingest_lines_total", {"127.0.0.1"}) == 40
+    assert counter_delta(before, after, "ingest_parse_errors_total", {"127.0.0.1"}) == 2
+    assert counter_delta(before, after, "ingest_lines_total") == 47
@@ -0,0 +1,276 @@
+import textwrap
+
+from pp_lint import class_nodes, lint_source
+
+
+def lint(body):
+    """把方法体包进一个 ParallelProgram 类，返回 [(level, line, func, message)]"""
+    source = "class Demo(ParallelProgram):\n" + textwrap.indent(textwrap.dedent(body), "    ")
+    return [(level, line, func, msg) for level, _, line, func, msg in lint_source(source, "demo.py")]
+
+
+def warnings(body):
+    return [msg for level, _, _, msg in lint(body) if level == "WARN"]
+
+
+# ================== 性能检查 ==================
+def test_busy_loop_is_reported():
+    found = warnings("""
+        def pp_demo(self):
+            while True:
+                if get_io(GPIOEnum.SYSTEM, 1):
+                    set_io(GPIOEnum.SYSTEM, 1, True)
+    """)
+    assert found == ["no wait_ms on some path to the next iteration"]
+
+
+def test_paced_loop_is_clean():
+    assert warnings("""
+        def pp_demo(self):
+            while True:
+                if get_io(GPIOEnum.SYSTEM, 1):
+                    set_io(GPIOEnum.SYSTEM, 1, True)
+                wait_ms(10)
+    """) == []
+
+
+def test_continue_before_wait_is_reported():
+    found = warnings("""
+        def pp_demo(self):
+            while get_global_var("run"):
+                if get_io(GPIOEnum.SYSTEM, 1):
+                    continue
+                wait_ms(10)
+    """)
+    assert found == ["no wait_ms on some path to the next iteration (via continue), busy-polls get_global_var"]
+
+
+def test_counter_loop_is_not_a_busy_loop():
+    # 跑完就退出的计数循环，哪怕每轮有 I/O，也不需要 wait_ms
+    assert warnings("""
+        def pp_demo(self):
+            index = 0
+            while index < 4:
+                set_io(GPIOEnum.SYSTEM, index, True)
+                index += 1
+    """) == []
+
+
+def test_counter_loop_with_continue_is_still_checked():
+    # continue 跳过了 index += 1，可能永远停在同一个值上
+    found = warnings("""
+        def pp_demo(self):
+            index = 0
+            while index < 4:
+                if get_io(GPIOEnum.SYSTEM, index):
+                    continue
+                index += 1
+    """)
+    assert found == ["no wait_ms on some path to the next iteration"]
+
+
+def test_wait_inside_func_counts_as_pacing():
+    assert warnings("""
+        def func_tick(self):
+            wait_ms(10)
+            return 0
+
+        def pp_demo(self):
+            while True:
+                self.func_tick()
+    """) == []
+
+
+def test_repeated_read_is_reported_once_per_key():
+    found = warnings("""
+        def func_running(self):
+            return get_system_state(SystemStateEnum.PROJECT_RUNNING)
+
+        def pp_demo(self):
+            while True:
+                if self.func_running() and get_system_state(SystemStateEnum.PROJECT_RUNNING):
+                    set_io(GPIOEnum.SYSTEM, 1, True)
+                    set_io(GPIOEnum.SYSTEM, 1, True)
+                wait_ms(10)
+    """)
+    # 写操作重复不报
+    assert found == ["get_system_state(SystemStateEnum.PROJECT_RUNNING) called up to 2 times per iteration, "
+                     "read it once into a local"]
+
+
+def test_io_range_per_iteration():
+    info = [msg for level, _, _, msg in lint("""
+        def pp_demo(self):
+            while True:
+                if get_io(GPIOEnum.SYSTEM, 1):
+                    set_io(GPIOEnum.SYSTEM, 1, True)
+                wait_ms(10)
+    """) if level == "INFO"]
+    assert info[0].startswith("1..2 I/O calls per iteration")
+
+
+# ================== 转 Lua 检查 ==================
+def test_variable_first_assigned_in_block():
+    found = warnings("""
+        def func_demo(self, x):
+            if x > 0:
+                y = 1
+            else:
+                y = 2
+            return y
+    """)
+    assert found == ["y is first assigned inside a block (line 5) and is nil here in Lua; assign it before the block"]
+
+
+def test_variable_assigned_before_block_is_clean():
+    assert warnings("""
+        def func_demo(self, x):
+            y = 2
+            if x > 0:
+                y = 1
+            return y
+    """) == []
+
+
+def test_parameter_reassigned_in_block():
+    found = warnings("""
+        def func_demo(self, x):
+            if x < 0:
+                x = 0
+            return x
+    """)
+    assert len(found) == 1 and found[0].startswith("parameter x reassigned inside a block")
+
+
+def test_bare_return_and_keyword_name():
+    found = warnings("""
+        def func_demo(self):
+            end = 1
+            return
+    """)
+    assert found == ["variable end is a Lua keyword, rename it",
+                     "bare return, ppdk cannot translate it; return a value"]
+
+
+def test_raw_string_characters():
+    found = warnings('''
+        def func_demo(self):
+            a = "ok\\\\n"
+            b = "line\\n"
+            c = "C:\\\\path"
+            return a + b + c
+    ''')
+    assert found == ["string 'line\\n' goes into Lua as is: write '\\n' as the Lua escape \\n",
+                     "string 'C:\\\\path' goes into Lua as is: a backslash that is not a Lua escape, "
+                     "write it as \\\\"]
+
+
+
+def test_else_starting_with_if_drops_the_rest():
+    found = warnings("""
+        def func_demo(self, shape, was_inside):
+            base = 0
+            inside = False
+            if shape == 0:
+                inside = True
+            else:
+                if was_inside:
+                    base = 6
+                inside = base > 3
+            return inside
+    """)
+    assert found == ["else: starting with an if becomes elseif in Lua and the 1 statements after that if are "
+                     "dropped; move them out of the else or put the if after them"]
+
+
+def test_elif_and_else_with_single_if_are_clean():
+    assert warnings("""
+        def func_demo(self, a, b):
+            x = 0
+            if a:
+                x = 1
+            elif b:
+                x = 2
+            else:
+                if a == b:
+                    x = 3
+            return x
+    """) == []
+
+def test_func_written_after_its_caller():
+    # pp 先发现 func_idle，ppdk 先写 func_idle 调用的 func_light，func_light 调用的 func_bit 写在后面
+    found = warnings("""
+        def func_bit(self, name):
+            return name
+
+        def func_light(self):
+            return self.func_bit("running")
+
+        def func_idle(self):
+            return self.func_light()
+
+        def pp_demo(self):
+            self.func_idle()
+            if self.func_bit("fault"):
+                self.func_light()
+    """)
+    assert found == ["func_light calls func_bit but ppdk writes it after the caller in demo.lua, "
+                     "so it is nil there; inline it into func_light"]
+
+
+def test_func_three_levels_deep_is_not_written():
+    found = warnings("""
+        def func_c(self):
+            return 1
+
+        def func_b(self):
+            return self.func_c()
+
+        def func_a(self):
+            return self.func_b()
+
+        def pp_demo(self):
+            self.func_a()
+    """)
+    assert found == ["func_b calls func_c but ppdk does not write it in demo.lua, so it is nil there; "
+                     "inline it into func_b"]
+
+
+def test_func_order_uses_base_class_in_other_file():
+    # func_bit 在另一个文件的基类里（ModbusSnapshot 这类），lint_pp / 命令行把别的文件的类传进来
+    classes = class_nodes("class Base(ParallelProgram):\n    def func_bit(self, name):\n        return name\n",
+                          "base.py")
+    source = textwrap.dedent("""
+        class Demo(Base):
+            def func_light(self):
+                return self.func_bit("running")
+
+            def func_idle(self):
+                return self.func_light()
+
+            def pp_demo(self):
+                self.func_idle()
+                self.func_bit("fault")
+    """)
+    found = [msg for _, _, _, _, msg in lint_source(source, "demo.py", classes=classes)]
+    assert found == ["func_light calls func_bit but ppdk writes it after the caller in demo.lua, "
+                     "so it is nil there; inline it into func_light"]
+
+
+def test_builtin_only_used_by_nested_func():
+    found = warnings("""
+        def func_angle(self, resp):
+            return get_list(resp, 5)
+
+        def func_move(self, resp):
+            return self.func_angle(resp)
+
+        def func_send(self, frame):
+            return concat_string(frame, "x")
+
+        def pp_demo(self):
+            self.func_move(self.pp_resp)
+            self.func_send("a")
+    """)
+    assert found == ["func_angle calls builtin get_list but ppdk only writes the builtins used by pp_demo "
+                     "and the funcs it calls directly, so it is nil in demo.lua"]
@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+from session_archive import SessionArchive, find_segments, open_segment, query, read_index
+
+HEADER = ["Index", "Time", "Fz"]
+
+
+def rows(start, times):
+    return [[start + i, t, float(i)] for i, t in enumerate(times)]
+
+
+def test_active_segment_is_queryable(tmp_path):
+    archive = SessionArchive(str(tmp_path), "192.168.3.102", HEADER, compression="none")
+    archive.write_rows(rows(0, ["2026-01-01-10:00:00.000"] * 2), "2026-01-01-10:00:00.000", now=0)
+    archive.write_rows(rows(2, ["2026-01-01-10:00:02.000"]), "2026-01-01-10:00:02.000", now=1)
+    archive.sync()
+    # 段还没关：index 里有一行 End 为空，查询照样能读到最新数据
+    (seg,) = read_index(str(tmp_path))
+    assert seg["End"] == ""
+    found = list(query(str(tmp_path), "2026-01-01-10:00:01.000", "2026-01-01-10:00:03.000"))
+    assert [r[0] for r in found] == ["2"]
+
+    archive.close()
+    (seg,) = read_index(str(tmp_path))
+    assert (seg["Start"], seg["End"], seg["Rows"]) == ("2026-01-01-10:00:00.000", "2026-01-01-10:00:02.000", "3")
+    assert not find_segments(str(tmp_path), "2026-01-01-10:00:03.000", "2026-01-01-10:00:04.000")
+
+
+def test_segment_rolls_on_written_bytes(tmp_path):
+    archive = SessionArchive(str(tmp_path), "r", HEADER, max_bytes=100, compression="none")
+    counted = {}
+    for i in range(10):
+        archive.write_rows(rows(i, ["2026-01-01-10:00:00.000"]), "2026-01-01-10:00:00.000", now=0)
+        counted[archive._path] = archive._bytes
+    archive.close()
+    segments = read_index(str(tmp_path))
+    assert len(segments) > 1
+    for path, n in counted.items():
+        # 自己累计的字节数就是文件大小；超过 max_bytes 之后的下一批才切段，每段最多多出一批
+        assert os.path.getsize(path) == n
+        assert n < 100 + 40
+    assert sum(int(seg["Rows"]) for seg in segments) == 10
+
+
+def test_open_segment_missing_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        open_segment(str(tmp_path / "gone.csv"))
@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+from multiprocessing import shared_memory
+
+from shm_ring import _H_WRITING_SEQ, RingReader, SampleRing
+
+def make_ring(name, capacity=8):
+    return SampleRing(name, ["x", "y"], capacity)
+
+
+def test_reader_follows_and_reports_overrun():
+    ring = make_ring(f"pp_test_{os.getpid()}_a")
+    try:
+        reader = RingReader(ring.name, start="oldest")
+        ring.publish(np.array([[1.0, 2.0], [3.0, 4.0]]))
+        seq, rows, lost = reader.read()
+        assert (seq, lost) == (0, 0)
+        assert rows.tolist() == [[1.0, 2.0], [3.0, 4.0]]
+        # 落后超过 capacity：被覆盖的行记为丢失，从还有效的最早一行接着读
+        ring.publish(np.arange(20, dtype=float).reshape(10, 2))
+        seq, rows, lost = reader.read()
+        assert lost == 2
+        assert seq == 4 and rows[0].tolist() == [4.0, 5.0]
+        del rows    # 视图还在时 close 会报 BufferError
+        reader.close()
+    finally:
+        ring.close()
+
+
+def test_reader_process_exit_keeps_ring():
+    # 读进程退出时 resource_tracker 不能把写端的共享内存删掉
+    ring = make_ring(f"pp_test_{os.getpid()}_b")
+    try:
+        code = ("import sys; from shm_ring import RingReader; "
+                f"r = RingReader({ring.name!r}); print(r.fields); r.close()")
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, timeout=30)
+        assert out.returncode == 0, out.stderr
+        assert "['x', 'y']" in out.stdout
+        shm = shared_memory.SharedMemory(name=ring.name)
+        shm.close()
+    finally:
+        ring.close()
+
+
+def test_write_in_progress_invalidates_rows():
+    ring = make_ring(f"pp_test_{os.getpid()}_c", capacity=4)
+    try:
+        ring.publish(np.arange(8, dtype=float).reshape(4, 2))
+        reader = RingReader(ring.name, start="oldest")
+        seq, rows, lost = reader.read()
+        assert (seq, len(rows), lost) == (0, 4, 0)
+        assert reader.still_valid(seq)
+        # 写端刚声明要写 1 行（覆盖第 0 行），数据和 write_seq 还没动
+        ring._header[_H_WRITING_SEQ] = 5
+        assert not reader.still_valid(seq)
+        # 这时从最早开始读的读端跳过正在被覆盖的那行
+        late = RingReader(ring.name, start="oldest")
+        assert late.next_seq == 1
+        seq, rows, lost = late.read()
+        assert (seq, len(rows)) == (1, 3)
+        del rows
+        late.close()
+        reader.close()
+    finally:
+        ring.close()
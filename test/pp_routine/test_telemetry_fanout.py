@@ -0,0 +1,75 @@
+import json
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pytest
+
+from telemetry_fanout import (
+    DEFAULT_QUEUE_SIZE,
+    DEFAULT_RATE_HZ,
+    MAX_QUEUE_SIZE,
+    MAX_RATE_HZ,
+    Subscriber,
+    TelemetryHub,
+    start_fanout_server,
+    stream_options,
+)
+
+
+def test_stream_options_defaults():
+    assert stream_options({}) == (DEFAULT_RATE_HZ, DEFAULT_QUEUE_SIZE)
+
+
+def test_stream_options_clamps_rate_and_queue():
+    assert stream_options({"rate": ["1e9"], "queue": ["0"]}) == (MAX_RATE_HZ, 1)
+    assert stream_options({"rate": ["inf"], "queue": ["-5"]}) == (MAX_RATE_HZ, 1)
+    assert stream_options({"rate": ["0.5"], "queue": ["100000"]}) == (0.5, MAX_QUEUE_SIZE)
+
+
+@pytest.mark.parametrize("query", [
+    {"rate": ["0"]},
+    {"rate": ["-1"]},
+    {"rate": ["nan"]},
+    {"rate": ["fast"]},
+    {"queue": ["big"]},
+    {"queue": ["1.5"]},
+])
+def test_stream_options_rejects_bad_input(query):
+    with pytest.raises(ValueError):
+        stream_options(query)
+
+
+def test_stream_endpoint_answers_400_on_bad_query():
+    server = start_fanout_server(TelemetryHub(["a"]), "127.0.0.1", 0)
+    try:
+        port = server.server_address[1]
+        for query in ("rate=0", "rate=abc", "queue=x"):
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/stream?{query}", timeout=5)
+            assert error.value.code == 400
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/stats", timeout=5) as reply:
+            assert json.load(reply) == []
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_subscriber_drops_oldest_when_full():
+    sub = Subscriber(rate_hz=10, queue_size=2)
+    for i in range(5):
+        sub.offer(i)
+    assert sub.dropped == 3
+    assert [sub.queue.get_nowait(), sub.queue.get_nowait()] == [3, 4]
+
+
+def test_hub_sends_latest_row_and_respects_rate():
+    hub = TelemetryHub(["force_z", "pose_z"])
+    sub = hub.subscribe(rate_hz=1, queue_size=4)
+    hub.publish(np.array([[1.0, 2.0], [3.0, 4.0]]), source="robot")
+    hub.publish(np.array([[5.0, 6.0]]))      # 1 Hz 还没到期
+    frame = sub.queue.get_nowait()
+    assert (frame["force_z"], frame["pose_z"], frame["src"]) == (3.0, 4.0, "robot")
+    assert sub.queue.empty()
+    hub.unsubscribe(sub)
+    assert hub.stats() == []
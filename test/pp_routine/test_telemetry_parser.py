@@ -0,0 +1,72 @@
+import numpy as np
+
+from telemetry_parser import ChunkParser, parse_block
+
+
+def test_parse_block_reads_every_complete_row():
+    values, bad = parse_block(b"1,2\n3.5,-4e-3\n", 2)
+    assert bad == 0
+    assert values.tolist() == [[1.0, 2.0], [3.5, -0.004]]
+
+
+def test_parse_block_ignores_blank_lines_and_crlf():
+    values, bad = parse_block(b"1,2\r\n\r\n\n3,4\r\n", 2)
+    assert bad == 0
+    assert values.tolist() == [[1.0, 2.0], [3.0, 4.0]]
+
+
+def test_parse_block_counts_wrong_field_count_and_keeps_good_rows():
+    values, bad = parse_block(b"1,2\n1,2,3\n4\n5,6\n", 2)
+    assert bad == 2
+    assert values.tolist() == [[1.0, 2.0], [5.0, 6.0]]
+
+
+def test_parse_block_counts_non_numeric_fields():
+    values, bad = parse_block(b"1,2\n3,x\n4,5\n", 2)
+    assert bad == 1
+    assert values.tolist() == [[1.0, 2.0], [4.0, 5.0]]
+
+
+def test_parse_block_rejects_empty_and_blank_fields():
+    for block in (b"1,\n", b",1\n", b"1, \n", b"1,\t\n", b" ,2\n"):
+        values, bad = parse_block(block, 2)
+        assert (values.shape, bad) == ((0, 2), 1), block
+    values, bad = parse_block(b"1,,2\n7,8,9\n", 3)
+    assert bad == 1
+    assert values.tolist() == [[7.0, 8.0, 9.0]]
+
+
+def test_parse_block_accepts_spaces_around_numbers():
+    values, bad = parse_block(b" 1 , 2 \n3,4\n", 2)
+    assert bad == 0
+    assert values.tolist() == [[1.0, 2.0], [3.0, 4.0]]
+
+
+def test_parse_block_without_newline_returns_nothing():
+    values, bad = parse_block(b"1,2", 2)
+    assert (values.shape, bad) == ((0, 2), 0)
+
+
+def test_chunk_parser_keeps_partial_line_for_next_feed():
+    parser = ChunkParser(n_fields=2, skip_lines=0)
+    assert len(parser.feed(b"1,2\n3,")) == 1
+    rows = parser.feed(b"4\n5,6")
+    assert rows.tolist() == [[3.0, 4.0]]
+    assert parser.tail == b"5,6"
+    assert parser.rows == 2
+
+
+def test_chunk_parser_skips_greeting_line():
+    parser = ChunkParser(n_fields=2, skip_lines=1)
+    rows = parser.feed(b"Hi, Sunseed!\n1,2\n")
+    assert rows.tolist() == [[1.0, 2.0]]
+    assert parser.bad_rows == 0
+
+
+def test_chunk_parser_matches_float_for_wide_rows():
+    rng = np.random.default_rng(1)
+    expected = rng.normal(size=(50, 12))
+    text = "".join(",".join(repr(float(v)) for v in row) + "\n" for row in expected).encode()
+    parser = ChunkParser(n_fields=12, skip_lines=0)
+    rows = np.vstack([parser.feed(text[i:i + 100]) for i in range(0, len(text), 100)])
+    assert np.array_equal(rows, expected)